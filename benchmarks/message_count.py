@@ -0,0 +1,71 @@
+"""Compares per message puts against the buffered message counter.
+
+Usage:
+    python -m benchmarks.message_count [messages] [members]
+"""
+
+import random
+import struct
+import sys
+import tempfile
+import time
+
+import plyvel
+
+from cogs.utils.database import BufferedCounter
+
+FLUSH_EVERY = 5_000
+COUNT = struct.Struct("<q")
+
+
+def per_message_put(db, keys):
+    start = time.perf_counter()
+
+    for key in keys:
+        count = db.get(key)
+        db.put(key, COUNT.pack(COUNT.unpack(count)[0] + 1 if count else 1))
+
+    return time.perf_counter() - start
+
+
+def buffered(db, keys):
+    counter = BufferedCounter(db)
+    start = time.perf_counter()
+
+    for i, key in enumerate(keys, start=1):
+        counter.increment(key)
+
+        if not i % FLUSH_EVERY:
+            counter.flush()
+
+    counter.flush()
+    return time.perf_counter() - start
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    members = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+
+    guild = 815732601302155275
+    authors = [f"{guild}-{random.getrandbits(60)}".encode() for _ in range(members)]
+    keys = random.choices(authors, k=messages)
+
+    results = {}
+
+    for name, func in (("per message put", per_message_put), ("buffered", buffered)):
+        with tempfile.TemporaryDirectory() as path:
+            db = plyvel.DB(path, create_if_missing=True)
+            prefixed = db.prefixed_db(b"message_count-")
+
+            elapsed = func(prefixed, keys)
+            results[name] = {key: COUNT.unpack(value)[0] for key, value in prefixed}
+
+            db.close()
+
+        print(f"{name:<16} {messages / elapsed:>12,.0f} messages/sec")
+
+    assert results["per message put"] == results["buffered"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Replays a synthetic message flood through the old cooldown mapping spam
+checks and the sliding window spam checker.
+
+Usage:
+    python -m benchmarks.spam [messages] [members]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from discord.ext import commands
+
+from cogs.utils.spam import SpamChecker
+
+
+class CooldownByContent(commands.CooldownMapping):
+    def _bucket_key(self, message):
+        return (message.channel.id, message.content)
+
+
+def cooldowns(messages):
+    by_content = CooldownByContent.from_cooldown(15, 17.0, commands.BucketType.member)
+    by_user = commands.CooldownMapping.from_cooldown(10, 12.0, commands.BucketType.user)
+    spam = 0
+
+    for message in messages:
+        current = message.created_at
+        if by_user.get_bucket(message, current).update_rate_limit(current):
+            spam += 1
+        elif by_content.get_bucket(message, current).update_rate_limit(current):
+            spam += 1
+
+    return spam, len(by_user._cache) + len(by_content._cache)
+
+
+def windows(messages):
+    checker = SpamChecker()
+    spam = 0
+
+    for message in messages:
+        spam += checker.check(
+            message.guild.id,
+            message.channel.id,
+            message.author.id,
+            message.content,
+            0,
+            message.created_at,
+        )
+
+    return spam, len(checker.windows)
+
+
+def flood(count, members):
+    guild = SimpleNamespace(id=815732601302155275)
+    channels = [SimpleNamespace(id=i) for i in range(20)]
+    authors = [SimpleNamespace(id=random.getrandbits(60)) for _ in range(members)]
+    spammers = authors[:10]
+    now = time.time()
+
+    for i in range(count):
+        now += 0.01
+
+        if random.random() < 0.1:
+            author, content = random.choice(spammers), "buy cheap nitro"
+        else:
+            author = random.choice(authors)
+            content = f"message {random.getrandbits(64):x} " * random.randint(1, 20)
+
+        # CooldownMapping only reads created_at when no current time is passed
+        yield SimpleNamespace(
+            guild=guild,
+            channel=random.choice(channels),
+            author=author,
+            content=content,
+            created_at=now,
+        )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    members = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    messages = list(flood(count, members))
+
+    for name, func in (("cooldowns", cooldowns), ("windows", windows)):
+        tracemalloc.start()
+        start = time.perf_counter()
+
+        spam, buckets = func(messages)
+
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(
+            f"{name:<10} {count / elapsed:>12,.0f} messages/sec"
+            f" {buckets:>9,} buckets {peak / 2**20:>8.1f} MiB peak"
+            f" {spam:>7,} flagged"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,11 @@ from discord.ext import commands
 from discord.gateway import DiscordWebSocket
 
 import config
-from cogs.utils.database import Database
+from cogs.utils.cache import Cache
+from cogs.utils.database import AsyncDatabase, Database
+from cogs.utils.http import CachedSession, ResilientSession
+from cogs.utils.logs import LogSink
+from cogs.utils.valuation import Valuation
 
 log = logging.getLogger()
 log.setLevel(50)
@@ -44,8 +48,12 @@ class Bot(commands.Bot):
         super().__init__(*args, **kwargs)
 
         self.client_session = None
-        self.cache = {}
+        self.http_cache = None
+        self.cache = Cache()
         self.DB = Database()
+        self.ADB = AsyncDatabase(self.DB)
+        self.valuation = Valuation(self.DB)
+        self.log_sink = LogSink()
 
     async def get_prefix(self, message: discord.Message) -> str:
         default = "."
@@ -53,12 +61,7 @@ class Bot(commands.Bot):
         if not message.guild:
             return default
 
-        prefix = self.DB.main.get(f"{message.guild.id}-prefix".encode())
-
-        if not prefix:
-            return default
-
-        return prefix.decode()
+        return self.DB.settings.prefix(message.guild.id) or default
 
     @classmethod
     def create(cls) -> commands.Bot:
@@ -89,19 +92,12 @@ class Bot(commands.Bot):
                 print(f"Failed to load extension {extension}.\n{e} \n")
 
     async def get_json(self, url: str) -> dict:
-        """Gets and loads json from a url.
+        """Gets and loads json from a url through the http cache.
 
         url: str
             The url to fetch the json from.
         """
-        try:
-            async with self.client_session.get(url) as response:
-                return await response.json()
-        except (
-            asyncio.exceptions.TimeoutError,
-            aiohttp.client_exceptions.ContentTypeError,
-        ):
-            return None
+        return await self.http_cache.get_json(url)
 
     async def run_process(self, command, raw=False) -> list | str:
         """Runs a shell command and returns the output.
@@ -127,18 +123,8 @@ class Bot(commands.Bot):
 
         return "".join([output.decode() for output in result]).split()
 
-    def remove_from_cache(self, search):
-        """Deletes a search from the cache.
-
-        search: str
-        """
-        try:
-            self.cache.pop(search)
-        except KeyError:
-            return
-
     async def close(self) -> None:
-        """Close the Discord connection and the aiohttp session."""
+        """Close the Discord connection, the aiohttp session and flush the db."""
         for ext in list(self.extensions):
             with suppress(Exception):
                 self.unload_extension(ext)
@@ -147,16 +133,27 @@ class Bot(commands.Bot):
             with suppress(Exception):
                 self.remove_cog(cog)
 
+        # Queued log embeds need the connection to be sent
+        await self.log_sink.close()
         await super().close()
 
         if self.client_session:
             await self.client_session.close()
 
+        # Waiting for queued db calls would otherwise block the event loop
+        await asyncio.to_thread(self.ADB.close)
+        self.DB.flush()
+
     async def login(self, *args, **kwargs) -> None:
         """Setup the client_session before logging in."""
-        self.client_session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=10)
+        self.client_session = ResilientSession(
+            aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, limit_per_host=16),
+                timeout=aiohttp.ClientTimeout(total=10),
+            )
         )
+        self.http_cache = CachedSession(self.client_session)
+        self.cache.add("http", self.http_cache.store)
 
         await super().login(*args, **kwargs)
 
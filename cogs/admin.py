@@ -4,6 +4,7 @@ import discord
 import orjson
 from discord.ext import commands
 
+from cogs.utils.spam import Thresholds
 from cogs.utils.time import parse_time
 
 
@@ -89,18 +90,36 @@ class admin(commands.Cog):
             )
 
     @commands.command()
-    async def antispam(self, ctx):
-        """Toggles antispam on or off."""
-        key = f"anti_spam-{ctx.guild.id}".encode()
-        anti_spam = self.DB.main.get(key)
+    async def antispam(
+        self, ctx, kind: str = None, limit: int = None, seconds: float = None
+    ):
+        """Toggles antispam on or off or changes one of its thresholds.
+
+        kind: str
+            user, content or mentions.
+        limit: int
+            How many messages or mentions are allowed.
+        seconds: float
+            The window the limit applies to.
+        """
         embed = discord.Embed(color=discord.Color.blurple())
 
-        if anti_spam:
-            self.DB.main.delete(key)
+        if kind:
+            if kind not in Thresholds._fields or not limit or not seconds:
+                embed.description = (
+                    f"```Usage: {ctx.prefix}antispam [user/content/mentions]"
+                    " [limit] [seconds]```"
+                )
+                return await ctx.send(embed=embed)
+
+            self.DB.settings.set_spam_threshold(ctx.guild.id, kind, limit, seconds)
+            embed.title = f"Set the {kind} spam threshold to {limit} per {seconds}s"
+            return await ctx.send(embed=embed)
+
+        if not self.DB.settings.toggle_anti_spam(ctx.guild.id):
             embed.title = "Turned off anti spam"
             return await ctx.send(embed=embed)
 
-        self.DB.main.put(key, b"1")
         embed.title = "Turned on anti spam"
         await ctx.send(embed=embed)
 
@@ -178,13 +197,11 @@ class admin(commands.Cog):
         prefix: str
         """
         embed = discord.Embed(color=discord.Color.blurple())
-        key = f"{ctx.guild.id}-prefix".encode()
         if not prefix:
-            embed.description = (
-                f"```xl\nCurrent prefix is: {self.DB.main.get(key, b'.').decode()}```"
-            )
+            current = self.DB.settings.prefix(ctx.guild.id) or "."
+            embed.description = f"```xl\nCurrent prefix is: {current}```"
             return await ctx.send(embed=embed)
-        self.DB.main.put(key, prefix.encode())
+        self.DB.settings.set_prefix(ctx.guild.id, prefix)
         embed.description = f"```prolog\nChanged prefix to {prefix}```"
         await ctx.send(embed=embed)
 
@@ -229,18 +246,31 @@ class admin(commands.Cog):
     @commands.command()
     async def togglelog(self, ctx):
         """Toggles logging to the logs channel."""
-        key = f"{ctx.guild.id}-logging".encode()
-        if self.DB.main.get(key):
-            self.DB.main.delete(key)
-            state = "Enabled"
-        else:
-            self.DB.main.put(key, b"1")
+        if self.DB.settings.toggle_logging(ctx.guild.id):
             state = "Disabled"
+        else:
+            state = "Enabled"
 
         embed = discord.Embed(color=discord.Color.blurple())
         embed.description = f"```{state} logging```"
         await ctx.send(embed=embed)
 
+    @commands.command()
+    async def logchannel(self, ctx, channel: discord.TextChannel = None):
+        """Sets the channel logs are sent to, defaulting to the one named logs.
+
+        channel: discord.TextChannel
+            Leave empty to go back to the channel named logs.
+        """
+        self.DB.settings.set_log_channel(ctx.guild.id, channel and channel.id)
+
+        embed = discord.Embed(color=discord.Color.blurple())
+        if channel:
+            embed.description = f"```Logs will be sent to #{channel.name}```"
+        else:
+            embed.description = "```Logs will be sent to the channel named logs```"
+        await ctx.send(embed=embed)
+
     @commands.command(name="removerule")
     async def remove_rule(self, ctx, number: int):
         """Removes a rule from the server rules.
@@ -248,22 +278,18 @@ class admin(commands.Cog):
         number: int
             The number of the rule to delete starting from 1.
         """
-        key = f"{ctx.guild.id}-rules".encode()
-        rules = self.DB.main.get(key)
+        rules = self.DB.rules(ctx.guild.id)
         embed = discord.Embed(color=discord.Color.blurple())
 
         if not rules:
             embed.description = "```No rules added yet.```"
             return await ctx.send(embed=embed)
 
-        rules = orjson.loads(rules)
-
-        if 0 < number - 1 < len(rules):
+        if number not in range(1, len(rules) + 1):
             embed.description = "```No rule found.```"
             return await ctx.send(embed=embed)
 
         rule = rules.pop(number - 1)
-        self.DB.main.put(key, orjson.dumps(rules))
         embed.description = f"```Removed rule {rule}.```"
         await ctx.send(embed=embed)
 
@@ -274,22 +300,13 @@ class admin(commands.Cog):
         rule: str
             The rule to add.
         """
-        key = f"{ctx.guild.id}-rules".encode()
-        rules = self.DB.main.get(key)
-
-        if not rules:
-            rules = []
-        else:
-            rules = orjson.loads(rules)
-
-        rules.append(rule)
+        number = self.DB.rules(ctx.guild.id).append(rule)
         await ctx.send(
             embed=discord.Embed(
                 color=discord.Color.blurple(),
-                description=f"```Added rule {len(rules)}\n{rule}```",
+                description=f"```Added rule {number}\n{rule}```",
             )
         )
-        self.DB.main.put(key, orjson.dumps(rules))
 
     @commands.command(aliases=["disablech", "disablechannel"])
     async def disable_channel(self, ctx, channel: discord.TextChannel = None):
@@ -298,28 +315,16 @@ class admin(commands.Cog):
         channel: discord.TextChannel
         """
         channel = channel or ctx.channel
-        guild = str(ctx.guild.id)
-        key = f"{guild}-disabled_channels".encode()
-
-        disabled = self.DB.main.get(key)
 
-        if not disabled:
-            disabled = []
+        if self.DB.settings.toggle_channel(ctx.guild.id, channel.id):
+            state = "disabled"
         else:
-            disabled = orjson.loads(disabled)
-
-        if channel.id in disabled:
-            disabled.remove(channel.id)
             state = "enabled"
-        else:
-            disabled.append(channel.id)
-            state = "disabled"
 
         embed = discord.Embed(color=discord.Color.blurple())
         embed.description = f"```Commands {state} in {channel}```"
 
         await ctx.send(embed=embed)
-        self.DB.main.put(key, orjson.dumps(disabled))
 
     @commands.command()
     async def lockall(self, ctx, toggle: bool = True):
@@ -381,40 +386,26 @@ class admin(commands.Cog):
             embed.description = "```Command not found.```"
             return await ctx.send(embed=embed)
 
-        key = f"{ctx.guild.id}-t-{command}".encode()
-        state = self.DB.main.get(key)
-
-        if not state:
-            self.DB.main.put(key, b"1")
+        if self.DB.settings.toggle_command(ctx.guild.id, command):
             embed.description = f"```Disabled the {command} command```"
             return await ctx.send(embed=embed)
 
-        self.DB.main.delete(key)
         embed.description = f"```Enabled the {command} command```"
         return await ctx.send(embed=embed)
 
     @commands.command()
     async def emojis(self, ctx):
         """Shows a list of the current emojis being voted on."""
-        emojis = self.DB.main.get(b"emoji_submissions")
-
         embed = discord.Embed(color=discord.Color.blurple())
+        msg = ""
 
-        if not emojis:
-            embed.description = "```No emojis found```"
-            return await ctx.send(embed=embed)
-
-        emojis = orjson.loads(emojis)
+        for name, users in self.DB.emoji_submissions:
+            msg += f"{name.decode()}: {orjson.loads(users)}\n"
 
-        if not emojis:
+        if not msg:
             embed.description = "```No emojis found```"
             return await ctx.send(embed=embed)
 
-        msg = ""
-
-        for name, users in emojis.items():
-            msg += f"{name}: {users}\n"
-
         embed.description = f"```{msg}```"
         await ctx.send(embed=embed)
 
@@ -425,19 +416,12 @@ class admin(commands.Cog):
         message_id: str
             Id of the message to remove from the db.
         """
-        emojis = self.DB.main.get(b"emoji_submissions")
-
-        if not emojis:
-            emojis = {}
-        else:
-            emojis = orjson.loads(emojis)
+        key = message_id.encode()
 
-        try:
-            emojis.pop(message_id)
-        except KeyError:
-            await ctx.send(f"Message {message_id} not found in emojis")
+        if self.DB.emoji_submissions.get(key) is None:
+            return await ctx.send(f"Message {message_id} not found in emojis")
 
-        self.DB.main.put(b"emoji_submissions", orjson.dumps(emojis))
+        self.DB.emoji_submissions.delete(key)
 
     @commands.command(aliases=["aemoji", "addemoji"])
     async def add_emoji(self, ctx, message_id, name):
@@ -446,16 +430,9 @@ class admin(commands.Cog):
         message_id: int
             Id of the message you are adding the emoji of.
         """
-        emojis = self.DB.main.get(b"emoji_submissions")
-
-        if not emojis:
-            emojis = {}
-        else:
-            emojis = orjson.loads(emojis)
-
-        emojis[message_id] = {"name": name, "users": []}
-
-        self.DB.main.put(b"emoji_submissions", orjson.dumps(emojis))
+        self.DB.emoji_submissions.put(
+            str(message_id).encode(), orjson.dumps({"name": name, "users": []})
+        )
 
     @commands.command()
     async def edit(self, ctx, message: discord.Message, *, content):
@@ -516,14 +493,8 @@ class admin(commands.Cog):
         embed = discord.Embed(color=discord.Color.blurple())
 
         if not member:
-            for member_id in self.DB.blacklist.iterator(include_value=False):
-                member_id = member_id.decode().split("-")
-
-                if len(member_id) > 1:
-                    guild, member_id = member_id
-                    guild = self.bot.get_guild(int(guild))
-                else:
-                    guild, member_id = "Global", member_id[0]
+            for guild, member_id, _ in self.DB.blacklist_index.entries():
+                guild = self.bot.get_guild(guild) if guild else "Global"
 
                 embed.add_field(
                     name="User:",
@@ -540,10 +511,10 @@ class admin(commands.Cog):
             embed.description = "Bots cannot be added to the downvote list"
             return await ctx.send(embed=embed)
 
-        member_id = f"{ctx.guild.id}-{str(member.id)}".encode()
+        blacklist = self.DB.blacklist_index
 
-        if self.DB.blacklist.get(member_id):
-            self.DB.blacklist.delete(member_id)
+        if blacklist.get_exact(member.id, ctx.guild.id):
+            blacklist.delete(member.id, ctx.guild.id)
 
             embed.title = "User Undownvoted"
             embed.description = (
@@ -554,7 +525,7 @@ class admin(commands.Cog):
         await member.edit(voice_channel=None)
 
         if not duration:
-            self.DB.blacklist.put(member_id, b"1")
+            blacklist.put(member.id, b"1", ctx.guild.id)
             embed.title = "User Downvoted"
             embed.description = f"**{member}** has been added to the downvote list"
             return await ctx.send(embed=embed)
@@ -565,8 +536,8 @@ class admin(commands.Cog):
             embed.description = "```Invalid duration. Example: '3d 5h 10m'```"
             return await ctx.send(embed=embed)
 
-        self.DB.blacklist.put(member_id, b"1")
-        self.loop.call_later(seconds, self.DB.blacklist.delete, member_id)
+        blacklist.put(member.id, b"1", ctx.guild.id)
+        self.loop.call_later(seconds, blacklist.delete, member.id, ctx.guild.id)
 
         embed.title = "User Undownvoted"
         embed.description = f"***{member}*** has been added from the downvote list"
@@ -581,14 +552,8 @@ class admin(commands.Cog):
         """
         embed = discord.Embed(color=discord.Color.blurple())
         if not user:
-            for member_id in self.DB.blacklist.iterator(include_value=False):
-                member_id = member_id.decode().split("-")
-
-                if len(member_id) > 1:
-                    guild, member_id = member_id
-                    guild = self.bot.get_guild(int(guild))
-                else:
-                    guild, member_id = "Global", member_id[0]
+            for guild, member_id, _ in self.DB.blacklist_index.entries():
+                guild = self.bot.get_guild(guild) if guild else "Global"
 
                 embed.add_field(
                     name="User:",
@@ -601,15 +566,16 @@ class admin(commands.Cog):
             embed.title = "Blacklisted users"
             return await ctx.send(embed=embed)
 
-        user_id = f"{ctx.guild.id}-{str(user.id)}".encode()
-        if self.DB.blacklist.get(user_id):
-            self.DB.blacklist.delete(user_id)
+        blacklist = self.DB.blacklist_index
+
+        if blacklist.get_exact(user.id, ctx.guild.id):
+            blacklist.delete(user.id, ctx.guild.id)
 
             embed.title = "User Unblacklisted"
             embed.description = f"***{user}*** has been unblacklisted"
             return await ctx.send(embed=embed)
 
-        self.DB.blacklist.put(user_id, b"2")
+        blacklist.put(user.id, b"2", ctx.guild.id)
         embed.title = "User Blacklisted"
         embed.description = f"**{user}** has been added to the blacklist"
 
@@ -6,48 +6,127 @@ from io import BytesIO
 import discord
 from discord.ext import commands
 
+from cogs.utils.hedge import Hedger
+from cogs.utils.prefetch import Pool
+
+CATS = (
+    ("https://api.thecatapi.com/v1/images/search", 0, "url"),
+    ("https://cataas.com/cat?json=true", "url", None, "https://cataas.com"),
+    ("https://thatcopy.pw/catapi/rest", "webpurl"),
+    ("http://shibe.online/api/cats", 0),
+    ("https://aws.random.cat/meow", "file"),
+)
+DOGS = (
+    ("https://dog.ceo/api/breeds/image/random", "message"),
+    ("https://random.dog/woof.json", "url"),
+    ("https://api.thedogapi.com/v1/images/search?sub_id=demo-3d4325", 0, "url"),
+)
+FOXES = (
+    ("https://randomfox.ca/floof", "image"),
+    ("https://wohlsoft.ru/images/foxybot/randomfox.php", "file"),
+    ("https://some-random-api.ml/img/fox", "link"),
+)
+
 
 class animals(commands.Cog):
     """For commands related to animals."""
 
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
+        self.hedger = Hedger()
+        self.pools = {
+            "cat": Pool(lambda: self.fetch_multiple(CATS)),
+            "dog": Pool(lambda: self.fetch_multiple(DOGS)),
+            "fox": Pool(lambda: self.fetch_multiple(FOXES)),
+            "duck": Pool(
+                lambda: self.fetch("https://random-d.uk/api/v2/random", "url")
+            ),
+            "shibe": Pool(lambda: self.fetch("http://shibe.online/api/shibes", 0)),
+        }
+
+    def cog_unload(self):
+        for pool in self.pools.values():
+            pool.close()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Fills the image pools so the first commands don't wait on the apis."""
+        for pool in self.pools.values():
+            pool.refill()
+
+    async def fetch(self, url: str, key, subkey=None, prefix: str = None) -> str | None:
+        """Returns the image url in a json response or None if it failed.
+
+        url: str
+        key: str | int
+        subkey: str | int
+        prefix: str
+            Prepended to relative urls.
+        """
+        resp = await self.bot.get_json(url)
+
+        if not resp:
+            return None
+
+        try:
+            image = resp[key] if subkey is None else resp[key][subkey]
+        except (KeyError, IndexError, TypeError):
+            return None
+
+        return (prefix or "") + image
+
+    async def fetch_multiple(self, arg_tuples) -> str | None:
+        """Returns the first image url any of the fallback apis returns.
+
+        The apis are raced with a Hedger, so a slow or dead one doesn't
+        hold up the others.
+
+        arg_tuples: tuple[tuple]
+            The arguments of fetch for each api.
+        """
+        apis = {args[0]: args for args in arg_tuples}
+        return await self.hedger.run(list(apis), lambda url: self.fetch(*apis[url]))
+
+    async def send_image(self, ctx, image: str | None, many: bool = False):
+        """Sends an image url or an error embed if there isn't one."""
+        if image:
+            return await ctx.send(image)
+
+        api = "any api" if many else "api"
+        await ctx.send(
+            embed=discord.Embed(
+                color=discord.Color.dark_red(), description=f"Failed to reach {api}"
+            ).set_footer(
+                text=f"{'apis' if many else 'api'} may be temporarily down"
+                " or experiencing high trafic"
+            )
+        )
 
     async def get(self, ctx, url: str, key: str | int, subkey: str | int = None):
-        """Returns json response from url or sends error embed."""
+        """Sends the image url from a json response or an error embed."""
         with ctx.typing():
-            resp = await self.bot.get_json(url)
+            image = await self.fetch(url, key, subkey)
 
-        if not resp:
-            return await ctx.send(
-                embed=discord.Embed(
-                    color=discord.Color.dark_red(), description="Failed to reach api"
-                ).set_footer(
-                    text="api may be temporarily down or experiencing high trafic"
-                )
-            )
-        await ctx.send(resp[key] if not subkey else resp[key][subkey])
+        await self.send_image(ctx, image)
 
     async def get_multiple(self, ctx, arg_tuples):
+        """Sends the first image url any of the fallback apis returns."""
         with ctx.typing():
-            for args in arg_tuples:
-                url, key, subkey, prefix = *args, *((None,) * abs(len(args) - 4))
-                resp = await self.bot.get_json(url)
-
-                if resp:
-                    break
-            else:
-                return await ctx.send(
-                    embed=discord.Embed(
-                        color=discord.Color.dark_red(),
-                        description="Failed to reach any api",
-                    ).set_footer(
-                        text="apis may be temporarily down or experiencing high trafic"
-                    )
-                )
-        return await ctx.send(
-            prefix if prefix else "" + (resp[key] if not subkey else resp[key][subkey])
-        )
+            image = await self.fetch_multiple(arg_tuples)
+
+        await self.send_image(ctx, image, True)
+
+    async def get_pooled(self, ctx, name: str, many: bool = False):
+        """Sends an image from a prefetched pool, only waiting if it is empty."""
+        pool = self.pools[name]
+
+        if len(pool):
+            image = await pool.get()
+        else:
+            with ctx.typing():
+                image = await pool.get()
+
+        await self.send_image(ctx, image, many)
 
     @commands.command()
     async def horse(self, ctx):
@@ -66,7 +145,7 @@ class animals(commands.Cog):
     @commands.command()
     async def duck(self, ctx):
         """Gets a random duck image."""
-        await self.get(ctx, "https://random-d.uk/api/v2/random", "url")
+        await self.get_pooled(ctx, "duck")
 
     @commands.command(name="duckstatus")
     async def duck_status(self, ctx, status=404):
@@ -137,28 +216,12 @@ class animals(commands.Cog):
     @commands.command()
     async def fox(self, ctx):
         """Gets a random fox image."""
-        await self.get_multiple(
-            ctx,
-            (
-                ("https://randomfox.ca/floof", "image"),
-                ("https://wohlsoft.ru/images/foxybot/randomfox.php", "file"),
-                ("https://some-random-api.ml/img/fox", "link"),
-            ),
-        )
+        await self.get_pooled(ctx, "fox", True)
 
     @commands.command()
     async def cat(self, ctx):
         """Gets a random cat image."""
-        await self.get_multiple(
-            ctx,
-            (
-                ("https://api.thecatapi.com/v1/images/search", 0, "url"),
-                ("https://cataas.com/cat?json=true", "url", None, "https://cataas.com"),
-                ("https://thatcopy.pw/catapi/rest", "webpurl"),
-                ("http://shibe.online/api/cats", "0"),
-                ("https://aws.random.cat/meow", "file"),
-            ),
-        )
+        await self.get_pooled(ctx, "cat", True)
 
     @commands.command()
     async def catstatus(self, ctx, status=404):
@@ -175,18 +238,7 @@ class animals(commands.Cog):
             url = f"https://dog.ceo/api/breed/{breed}/images/random"
             return await self.get(ctx, url, "message")
 
-        await self.get_multiple(
-            ctx,
-            (
-                ("https://dog.ceo/api/breeds/image/random", "message"),
-                ("https://random.dog/woof.json", "url"),
-                (
-                    "https://api.thedogapi.com/v1/images/search?sub_id=demo-3d4325",
-                    0,
-                    "url",
-                ),
-            ),
-        )
+        await self.get_pooled(ctx, "dog", True)
 
     @commands.command()
     async def dogstatus(self, ctx, status=404):
@@ -199,7 +251,7 @@ class animals(commands.Cog):
     @commands.command()
     async def shibe(self, ctx):
         """Gets a random dog image."""
-        await self.get(ctx, "http://shibe.online/api/shibes", 0)
+        await self.get_pooled(ctx, "shibe")
 
 
 def setup(bot: commands.Bot) -> None:
@@ -9,6 +9,9 @@ from datetime import datetime
 import discord
 from discord.ext import commands
 
+from cogs.utils.cache import RandomPool
+from cogs.utils.prefetch import Pool
+
 URBAN_REGEX = re.compile(r"\[(.*?)\]")
 
 
@@ -39,21 +42,13 @@ class AnswerButton(discord.ui.Button["Trivia"]):
 
         if view.player == user:
             key = str(user.id).encode()
-            stats = view.db.trivia_wins.get(key)
-
-            if not stats:
-                wins, losses = 0, 0
-            else:
-                wins, losses = map(int, stats.decode().split(":"))
 
             if self.answer == view.answer:
                 style = discord.ButtonStyle.success
-                wins += 1
+                view.db.trivia_counter.increment(key, 1, 0)
             else:
                 style = discord.ButtonStyle.danger
-                losses += 1
-
-            view.db.trivia_wins.put(key, f"{wins}:{losses}".encode())
+                view.db.trivia_counter.increment(key, 0, 1)
 
             for button in view.children:
                 button.disabled = True
@@ -87,7 +82,66 @@ class apis(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         self.DB = bot.DB
+        self.ADB = bot.ADB
         self.loop = bot.loop
+        self.reddit_posts = bot.cache.namespace("reddit", ttl=300, max_size=256)
+        self.urban_results = bot.cache.namespace("urban", ttl=300, max_size=512)
+        self.pools = {
+            "fact": Pool(self.fetch_fact),
+            "kanye": Pool(self.fetch_kanye),
+            "quote": Pool(self.fetch_quote),
+            "inspiro": Pool(self.fetch_inspiro),
+        }
+
+    def cog_unload(self):
+        for pool in self.pools.values():
+            pool.close()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Fills the pools of random quotes and images."""
+        for pool in self.pools.values():
+            pool.refill()
+
+    async def fetch_fact(self) -> str:
+        url = "https://uselessfacts.jsph.pl/random.json?language=en"
+        return (await self.bot.get_json(url))["text"]
+
+    async def fetch_kanye(self) -> str:
+        return (await self.bot.get_json("https://api.kanye.rest"))["quote"]
+
+    async def fetch_quote(self) -> tuple[str, str]:
+        url = "https://quote-garden.herokuapp.com/api/v3/quotes/random"
+        quote = (await self.bot.get_json(url))["data"][0]
+        return quote["quoteText"], quote["quoteAuthor"]
+
+    async def fetch_inspiro(self) -> str:
+        url = "https://inspirobot.me/api?generate=true"
+
+        async with self.bot.client_session.get(url) as resp:
+            return await resp.text()
+
+    async def get_pooled(self, ctx, name: str):
+        """Returns a prefetched result or sends an error embed if there isn't one.
+
+        name: str
+        """
+        pool = self.pools[name]
+
+        if len(pool):
+            item = await pool.get()
+        else:
+            with ctx.typing():
+                item = await pool.get()
+
+        if item:
+            return item
+
+        await ctx.send(
+            embed=discord.Embed(
+                color=discord.Color.dark_red(), description="Failed to reach api"
+            )
+        )
 
     @commands.command(aliases=["qod"])
     async def qotd(self, ctx):
@@ -230,16 +284,9 @@ class apis(commands.Cog):
         """
         subreddit = subreddit.lstrip("r/")
 
-        subreddit_cache = f"reddit-{subreddit}"
-        cache = self.bot.cache
+        post = self.reddit_posts.take(subreddit)
 
-        if subreddit_cache in cache:
-            post = random.choice(cache[subreddit_cache])
-            cache[subreddit_cache].remove(post)
-
-            if not cache[subreddit_cache]:
-                cache.pop(subreddit_cache)
-        else:
+        if not post:
             url = f"https://old.reddit.com/r/{subreddit}/hot/.json"
 
             with ctx.typing():
@@ -263,8 +310,6 @@ class apis(commands.Cog):
                 )
 
             posts = resp["data"]["children"]
-            post = random.choice(posts)
-
             clean_posts = []
 
             for post in posts:
@@ -313,10 +358,11 @@ class apis(commands.Cog):
                     )
                 )
 
-            cache[subreddit_cache] = clean_posts
-            self.loop.call_later(300, self.bot.remove_from_cache, subreddit_cache)
+            clean_posts = RandomPool(clean_posts)
+            post = clean_posts.pop()
 
-            post = random.choice(clean_posts)
+            if clean_posts:
+                self.reddit_posts.put(subreddit, clean_posts)
 
         text = post.get("text")
         if text:
@@ -399,17 +445,17 @@ class apis(commands.Cog):
     @commands.command()
     async def inspiro(self, ctx):
         """Gets images from inspirobot.me an ai quote generator."""
-        url = "https://inspirobot.me/api?generate=true"
+        if not (image := await self.get_pooled(ctx, "inspiro")):
+            return
 
-        async with self.bot.client_session.get(url) as quote:
-            await ctx.send(
-                embed=discord.Embed(color=discord.Color.random())
-                .set_image(url=(await quote.text()))
-                .set_footer(
-                    icon_url="https://inspirobot.me/website/images/inspirobot-dark-green.png",
-                    text="inspirobot.me",
-                )
+        await ctx.send(
+            embed=discord.Embed(color=discord.Color.random())
+            .set_image(url=image)
+            .set_footer(
+                icon_url="https://inspirobot.me/website/images/inspirobot-dark-green.png",
+                text="inspirobot.me",
             )
+        )
 
     @commands.command()
     async def wikipath(self, ctx, source: str, *, target: str):
@@ -543,41 +589,32 @@ class apis(commands.Cog):
     @commands.command()
     async def fact(self, ctx):
         """Gets a random fact."""
-        url = "https://uselessfacts.jsph.pl/random.json?language=en"
-
-        with ctx.typing():
-            data = await self.bot.get_json(url)
+        if not (fact := await self.get_pooled(ctx, "fact")):
+            return
 
-            await ctx.send(
-                embed=discord.Embed(
-                    color=discord.Color.blurple(), description=f"> {data['text']}"
-                )
-            )
+        await ctx.send(
+            embed=discord.Embed(color=discord.Color.blurple(), description=f"> {fact}")
+        )
 
     @commands.command()
     async def kanye(self, ctx):
         """Gets a random Kanye West quote."""
-        url = "https://api.kanye.rest"
+        if not (quote := await self.get_pooled(ctx, "kanye")):
+            return
 
-        quote = await self.bot.get_json(url)
-        embed = discord.Embed(
-            color=discord.Color.blurple(), description="> " + quote["quote"]
-        )
+        embed = discord.Embed(color=discord.Color.blurple(), description="> " + quote)
         embed.set_footer(text="― Kayne West")
         await ctx.send(embed=embed)
 
     @commands.command()
     async def quote(self, ctx):
         """Gets a random quote."""
-        url = "https://quote-garden.herokuapp.com/api/v3/quotes/random"
-
-        quote = await self.bot.get_json(url)
-        quote = quote["data"][0]
+        if not (quote := await self.get_pooled(ctx, "quote")):
+            return
 
-        embed = discord.Embed(
-            color=discord.Color.blurple(), description="> " + quote["quoteText"]
-        )
-        embed.set_footer(text=f"― {quote['quoteAuthor']}")
+        text, author = quote
+        embed = discord.Embed(color=discord.Color.blurple(), description="> " + text)
+        embed.set_footer(text=f"― {author}")
         await ctx.send(embed=embed)
 
     @commands.command()
@@ -739,8 +776,9 @@ class apis(commands.Cog):
     async def board(self, ctx):
         """Shows the top 10 trivia players."""
         users = []
-        for user, stats in self.DB.trivia_wins:
-            wins, losses = map(int, stats.decode().split(":"))
+        stats = self.DB.trivia_counter.iterator()
+
+        async for user, (wins, losses) in self.ADB.iterate(stats):
             user = self.bot.get_user(int(user.decode()))
             if not user:
                 continue
@@ -773,14 +811,12 @@ class apis(commands.Cog):
         key = str(user.id).encode()
         embed = discord.Embed(color=discord.Color.blurple())
 
-        stats = self.DB.trivia_wins.get(key)
+        wins, losses = self.DB.trivia_counter.get(key)
 
-        if not stats:
+        if not wins and not losses:
             embed.title = "You haven't played trivia yet"
             return await ctx.send(embed=embed)
 
-        wins, losses = map(int, stats.decode().split(":"))
-
         embed.title = f"{user.display_name}'s Trivia Stats"
         embed.description = (
             f"**Win Rate:** {(wins / (wins + losses)) * 100:.2f}%\n"
@@ -982,17 +1018,11 @@ class apis(commands.Cog):
         search: str
             The term to search for.
         """
-        cache_search = f"urban-{search}"
-        cache = self.bot.cache
-
         embed = discord.Embed(colour=discord.Color.blurple())
 
-        if cache_search in cache:
-            item = cache[cache_search].pop()
+        item = self.urban_results.take(search)
 
-            if not cache[cache_search]:
-                cache.pop(cache_search)
-        else:
+        if not item:
             url = f"https://api.urbandictionary.com/v0/define?term={search}"
 
             urban = await self.bot.get_json(url)
@@ -1008,9 +1038,9 @@ class apis(commands.Cog):
             urban["list"].sort(key=lambda item: item["thumbs_up"] - item["thumbs_down"])
 
             item = urban["list"].pop()
-            cache[cache_search] = urban["list"]
 
-            self.loop.call_later(300, self.bot.remove_from_cache, cache_search)
+            if urban["list"]:
+                self.urban_results.put(search, urban["list"])
 
         embed.title = search.title()
         embed.add_field(
@@ -1,5 +1,6 @@
 import asyncio
 import os
+import time
 from datetime import datetime
 
 import discord
@@ -7,6 +8,9 @@ import lxml.html
 import orjson
 from discord.ext import commands, tasks
 
+from cogs.utils.ingest import ArrayStream
+from cogs.utils.valuation import to_float
+
 
 class background_tasks(commands.Cog):
     """Commands related to the background tasks of the bot."""
@@ -14,6 +18,7 @@ class background_tasks(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         self.DB = bot.DB
+        self.ADB = bot.ADB
         self.start_tasks()
 
     def cog_unload(self):
@@ -189,6 +194,9 @@ class background_tasks(commands.Cog):
         get_stocks          0h  30m 0s   True     False   161
         update_bot          0h  5m  0s   True     False   970
         backup              6h  0m  0s   True     False   13
+        compact_history     24h 0m  0s   True     False   3
+        expire_logs         24h 0m  0s   True     False   3
+        flush_db            0h  0m  30s  True     False   5760
         get_languages       0h  0m  0s   False    False   0
         get_crypto          0h  30m 0s   True     False   161
         get_domain          24h 0m  0s   True     False   3
@@ -245,28 +253,70 @@ class background_tasks(commands.Cog):
                 name, cookie = value.decode().split("=", 1)
                 next_cookies[name] = cookie.split(":", 1)[0]
             self.DB.main.put(b"stock-cookies", orjson.dumps(next_cookies))
-            stocks = await resp.json()
 
-        if not stocks:
-            return
+            # Rows are parsed as they arrive and saved in bounded batches
+            # so the full response is never held in memory at once
+            stream = ArrayStream(b"rows")
+            timestamp = time.time()
+            rows = []
+            changed = 0
+
+            async for chunk in resp.content.iter_chunked(65536):
+                rows.extend(stream.feed(chunk))
+
+                if len(rows) >= 1000:
+                    changed += await self.ADB.run(self.save_stocks, rows, timestamp)
+                    rows = []
+
+        if rows:
+            changed += await self.ADB.run(self.save_stocks, rows, timestamp)
+
+        if changed:
+            await self.ADB.run(self.bot.valuation.refresh_stocks)
+
+    def save_stocks(self, rows, timestamp):
+        """Writes the changed rows of the nasdaq screener to the db and
+        appends every row to the price history.
+
+        Returns the amount of stocks that changed.
+
+        rows: list[bytes]
+        timestamp: float
+        """
+        changed = 0
+        ticks = []
 
         with self.DB.stocks.write_batch() as wb:
-            for stock in stocks["data"]["table"]["rows"]:
-                stock_data = {
-                    "name": stock["name"],
-                    "price": stock["lastsale"][1:],
-                    "change": stock["netchange"],
-                    "%change": stock["pctchange"][:-1]
-                    if stock["pctchange"] != "--"
-                    else 0,
-                    "cap": stock["marketCap"],
-                }
+            for row in rows:
+                stock = orjson.loads(row)
+                symbol = stock["symbol"].encode()
+                stock_data = orjson.dumps(
+                    {
+                        "name": stock["name"],
+                        "price": stock["lastsale"][1:],
+                        "change": stock["netchange"],
+                        "%change": stock["pctchange"][:-1]
+                        if stock["pctchange"] != "--"
+                        else 0,
+                        "cap": stock["marketCap"],
+                    }
+                )
 
-                wb.put(
-                    stock["symbol"].encode(),
-                    orjson.dumps(stock_data),
+                if self.DB.stocks.get(symbol) != stock_data:
+                    wb.put(symbol, stock_data)
+                    changed += 1
+
+                ticks.append(
+                    (
+                        stock["symbol"],
+                        to_float(stock["lastsale"][1:]),
+                        to_float(stock["pctchange"][:-1]),
+                    )
                 )
 
+        self.DB.stock_history.append(ticks, timestamp)
+        return changed
+
     @tasks.loop(minutes=5)
     async def update_bot(self):
         """Tries to update every 5 minutes and then reloads if needed."""
@@ -297,39 +347,26 @@ class background_tasks(commands.Cog):
         if self.DB.main.get(b"restart") == b"1":
             return
 
-        number = self.DB.main.get(b"backup_number")
-
-        if not number:
-            number = -1
-        else:
-            number = int(number.decode())
-
-        number = (number + 1) % 11
+        self.DB.flush()
+        await self.ADB.run(self.DB.backups.backup)
 
-        self.DB.main.put(b"backup_number", str(number).encode())
-
-        os.makedirs("backup/", exist_ok=True)
-        with open(f"backup/{number}backup.json", "w", encoding="utf-8") as file:
-            database = {}
-
-            excluded = (
-                b"crypto",
-                b"stocks",
-                b"boot_times",
-                b"tiolanguages",
-                b"helloworlds",
-                b"docs",
-            )
+    @tasks.loop(hours=24)
+    async def compact_history(self):
+        """Downsamples and expires old price history every day."""
+        await self.ADB.run(self.DB.stock_history.compact)
+        await self.ADB.run(self.DB.crypto_history.compact)
 
-            for key, value in self.DB.main:
-                if key.split(b"-")[0] not in excluded:
-                    if value[:1] in [b"{", b"["]:
-                        value = orjson.loads(value)
-                    else:
-                        value = value.decode()
-                    database[key.decode()] = value
+    @tasks.loop(hours=24)
+    async def expire_logs(self):
+        """Removes old deleted and edited messages every day."""
+        # Counts are only changed on the event loop so appends can't race them
+        for log in (self.DB.deleted_log, self.DB.edited_log):
+            log.forget(await self.ADB.run(log.expire))
 
-            file.write(str(database))
+    @tasks.loop(seconds=30)
+    async def flush_db(self):
+        """Writes buffered db changes like message counts every 30 seconds."""
+        self.DB.flush()
 
     @tasks.loop(count=1)
     async def get_languages(self):
@@ -375,8 +412,15 @@ class background_tasks(commands.Cog):
         if not crypto:
             return
 
+        await self.ADB.run(self.save_crypto, crypto["data"]["cryptoCurrencyList"])
+
+    def save_crypto(self, coins):
+        """Writes the coins of the coinmarketcap listing to the db and
+        appends them to the price history."""
+        ticks = []
+
         with self.DB.crypto.write_batch() as wb:
-            for coin in crypto["data"]["cryptoCurrencyList"]:
+            for coin in coins:
                 if "price" not in coin["quotes"][0]:
                     continue
 
@@ -400,6 +444,16 @@ class background_tasks(commands.Cog):
                         }
                     ),
                 )
+                ticks.append(
+                    (
+                        coin["symbol"],
+                        coin["quotes"][0]["price"],
+                        coin["quotes"][0]["percentChange24h"],
+                    )
+                )
+
+        self.DB.crypto_history.append(ticks)
+        self.bot.valuation.refresh_crypto()
 
     @tasks.loop(hours=24)
     async def get_domain(self):
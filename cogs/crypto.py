@@ -2,8 +2,10 @@ import textwrap
 from decimal import Decimal
 
 import discord
-import orjson
-from discord.ext import commands, pages
+from discord.ext import commands
+
+from cogs.utils.history import PERIODS, format_summary
+from cogs.utils.paginator import LazyPaginator, price_pages
 
 
 class crypto(commands.Cog):
@@ -12,6 +14,7 @@ class crypto(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         self.DB = bot.DB
+        self.ADB = bot.ADB
 
     @commands.group(aliases=["coin"])
     async def crypto(self, ctx):
@@ -53,6 +56,15 @@ class crypto(commands.Cog):
         )
         embed.add_field(name="24h Volume", value=f"```{crypto['volume_24h']:,.2f}```")
         embed.add_field(name="Last updated", value=f"<t:{crypto['timestamp']}:R>")
+
+        summary = await self.ADB.run(self.DB.crypto_history.summary, symbol, PERIODS)
+        if summary:
+            embed.add_field(
+                name="Price History (min/max/avg)",
+                value=format_summary(summary),
+                inline=False,
+            )
+
         embed.set_image(
             url=f"https://s3.coinmarketcap.com/generated/sparklines/web/1d/usd/{crypto['id']}.png"
         )
@@ -70,8 +82,8 @@ class crypto(commands.Cog):
         """
         embed = discord.Embed(color=discord.Color.blurple())
 
-        if cash < 0:
-            embed.description = "```You can't buy a negative amount of crypto```"
+        if cash <= 0:
+            embed.description = "```You have to buy a positive amount of crypto```"
             return await ctx.send(embed=embed)
 
         symbol = symbol.upper()
@@ -90,15 +102,6 @@ class crypto(commands.Cog):
             return await ctx.send(embed=embed)
 
         amount = cash / price
-
-        cryptobal = self.DB.get_cryptobal(member_id)
-
-        if symbol not in cryptobal:
-            cryptobal[symbol] = {"total": 0, "history": [(amount, cash)]}
-        else:
-            cryptobal[symbol]["history"].append((amount, cash))
-
-        cryptobal[symbol]["total"] += amount
         bal -= Decimal(cash)
 
         embed = discord.Embed(
@@ -110,7 +113,7 @@ class crypto(commands.Cog):
         await ctx.send(embed=embed)
 
         self.DB.put_bal(member_id, bal)
-        self.DB.put_cryptobal(member_id, cryptobal)
+        self.DB.crypto_portfolios.buy(ctx.author.id, symbol, amount, cash)
 
     @crypto.command(aliases=["s"])
     async def sell(self, ctx, symbol, amount):
@@ -132,41 +135,27 @@ class crypto(commands.Cog):
 
         price = price["price"]
         member_id = str(ctx.author.id).encode()
-        cryptobal = self.DB.get_cryptobal(member_id)
-
-        if not cryptobal:
-            embed.description = "```You haven't invested.```"
-            return await ctx.send(embed=embed)
+        holding = self.DB.crypto_portfolios.get(ctx.author.id, symbol)
 
-        if symbol not in cryptobal:
+        if not holding:
             embed.description = f"```You haven't invested in {symbol}.```"
             return await ctx.send(embed=embed)
 
         if amount[-1] == "%":
-            amount = cryptobal[symbol]["total"] * ((float(amount[:-1])) / 100)
+            amount = holding.total * ((float(amount[:-1])) / 100)
         else:
             amount = float(amount)
 
-        if amount < 0:
-            embed.description = "```You can't sell a negative amount of crypto```"
+        if amount <= 0:
+            embed.description = "```You have to sell a positive amount of crypto```"
             return await ctx.send(embed=embed)
 
-        if cryptobal[symbol]["total"] < amount:
-            embed.description = (
-                f"```Not enough {symbol} you have: {cryptobal[symbol]['total']}```"
-            )
+        if holding.total < amount:
+            embed.description = f"```Not enough {symbol} you have: {holding.total}```"
             return await ctx.send(embed=embed)
 
         bal = self.DB.get_bal(member_id)
         cash = amount * float(price)
-
-        cryptobal[symbol]["total"] -= amount
-
-        if cryptobal[symbol]["total"] == 0:
-            cryptobal.pop(symbol, None)
-        else:
-            cryptobal[symbol]["history"].append((-amount, cash))
-
         bal += Decimal(cash)
 
         embed.title = f"Sold {amount:.2f} {symbol} for ${cash:.2f}"
@@ -175,7 +164,7 @@ class crypto(commands.Cog):
         await ctx.send(embed=embed)
 
         self.DB.put_bal(member_id, bal)
-        self.DB.put_cryptobal(member_id, cryptobal)
+        self.DB.crypto_portfolios.sell(ctx.author.id, symbol, amount, cash)
 
     @crypto.command(aliases=["p"])
     async def profile(self, ctx, member: discord.Member = None):
@@ -186,11 +175,10 @@ class crypto(commands.Cog):
         """
         member = member or ctx.author
 
-        member_id = str(member.id).encode()
-        cryptobal = self.DB.get_cryptobal(member_id)
+        holdings = self.DB.crypto_portfolios.get_all(member.id)
         embed = discord.Embed(color=discord.Color.blurple())
 
-        if not cryptobal:
+        if not holdings:
             embed.description = "```You haven't invested.```"
             return await ctx.send(embed=embed)
 
@@ -200,23 +188,18 @@ class crypto(commands.Cog):
             "Name:    Amount:      Price:             Percent Gain:\n"
         )
 
-        for crypto in cryptobal:
+        for crypto, holding in holdings.items():
             data = self.DB.get_crypto(crypto)
 
-            trades = [
-                trade[1] / trade[0]
-                for trade in cryptobal[crypto]["history"]
-                if trade[0] > 0
-            ]
-            change = ((data["price"] / (sum(trades) / len(trades))) - 1) * 100
+            change = holding.change(data["price"])
             color = "31" if change < 0 else "32"
 
             msg += (
-                f"[2;{color}m{crypto + ':':<8} {cryptobal[crypto]['total']:<13.2f}"
+                f"[2;{color}m{crypto + ':':<8} {holding.total:<13.2f}"
                 f"${data['price']:<17.2f} {change:.2f}%\n[0m"
             )
 
-            net_value += cryptobal[crypto]["total"] * float(data["price"])
+            net_value += holding.total * float(data["price"])
 
         embed.description = f"```ansi\n{msg}\nNet Value: ${net_value:.2f}```"
         await ctx.send(embed=embed)
@@ -229,27 +212,15 @@ class crypto(commands.Cog):
             The symbol of the crypto to find.
         """
         symbol = symbol.upper()
-        member_id = str(ctx.author.id).encode()
-
-        cryptobal = self.DB.get_cryptobal(member_id)
+        holding = self.DB.crypto_portfolios.get(ctx.author.id, symbol)
         embed = discord.Embed(color=discord.Color.blurple())
 
-        if not cryptobal:
-            embed.description = "```You haven't invested.```"
-            return await ctx.send(embed=embed)
-
-        if symbol not in cryptobal:
+        if not holding:
             embed.description = f"```You haven't invested in {symbol}```"
             return await ctx.send(embed=embed)
 
         crypto = self.DB.get_crypto(symbol)
-
-        trades = [
-            trade[1] / trade[0]
-            for trade in cryptobal[symbol]["history"]
-            if trade[0] > 0
-        ]
-        change = ((crypto["price"] / (sum(trades) / len(trades))) - 1) * 100
+        change = holding.change(crypto["price"])
         sign = "" if crypto["change_24h"] < 0 else "+"
 
         embed.set_author(
@@ -259,7 +230,7 @@ class crypto(commands.Cog):
         embed.description = textwrap.dedent(
             f"""
                 ```diff
-                Bal: {cryptobal[symbol]['total']}
+                Bal: {holding.total}
 
                 Percent Gain/Loss:
                 {"" if change < 0 else "+"}{change:.2f}%
@@ -279,26 +250,18 @@ class crypto(commands.Cog):
         await ctx.send(embed=embed)
 
     @crypto.command()
-    async def list(self, ctx):
-        """Shows the prices of crypto with pagination."""
-        messages = []
-        cryptos = ""
-        for i, (crypto, price) in enumerate(self.DB.crypto, start=1):
-            price = orjson.loads(price)["price"]
-
-            if not i % 3:
-                cryptos += f"{crypto.decode():}: ${float(price):.2f}\n"
-            else:
-                cryptos += f"{crypto.decode():}: ${float(price):.2f}\t".expandtabs()
-
-            if not i % 99:
-                messages.append(discord.Embed(description=f"```prolog\n{cryptos}```"))
-                cryptos = ""
-
-        if i % 99:
-            messages.append(discord.Embed(description=f"```prolog\n{cryptos}```"))
-
-        paginator = pages.Paginator(pages=messages)
+    async def list(self, ctx, sort: str = None, prefix: str = ""):
+        """Shows the prices of crypto with pagination.
+
+        sort: str
+            price, change or cap to sort from highest to lowest.
+        prefix: str
+            Only shows symbols starting with this.
+        """
+        prices = await self.ADB.run(getattr, self.bot.valuation, "crypto")
+        indices = prices.select(sort and sort.lower(), prefix.upper())
+
+        paginator = LazyPaginator(ctx.author, *price_pages(prices, indices))
         await paginator.send(ctx)
 
     @crypto.command(aliases=["h"])
@@ -312,17 +275,18 @@ class crypto(commands.Cog):
         member = member or ctx.author
 
         embed = discord.Embed(color=discord.Color.blurple())
-        cryptobal = self.DB.get_cryptobal(str(member.id).encode())
+        portfolios = self.DB.crypto_portfolios
+        holdings = portfolios.get_all(member.id)
 
-        if not cryptobal:
+        if not holdings:
             embed.description = "```You haven't invested.```"
             return await ctx.send(embed=embed)
 
         msg = ""
 
-        for crypto_name, crypto_data in cryptobal.items():
+        for crypto_name in holdings:
             msg += f"{crypto_name}:\n"
-            for trade in crypto_data["history"]:
+            for trade in portfolios.get_trades(member.id, crypto_name, int(amount)):
                 if trade[0] < 0:
                     kind = "Sold"
                 else:
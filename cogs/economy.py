@@ -96,6 +96,7 @@ class economy(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         self.DB = bot.DB
+        self.ADB = bot.ADB
 
     @staticmethod
     def get_amount(bal, bet):
@@ -447,12 +448,13 @@ class economy(commands.Cog):
             The amount of balances to get defaulting to 10.
         """
         baltop = []
-        for member, bal in self.DB.bal:
-            member = self.bot.get_user(int(member))
-            if member:
-                baltop.append((float(bal), member.display_name))
+        board = await self.ADB.leaderboard("bal")
 
-        baltop = sorted(baltop, reverse=True)[:amount]
+        for bal, member_id in board.top():
+            if len(baltop) == amount:
+                break
+            if member := self.bot.get_user(member_id):
+                baltop.append((bal, member.display_name))
 
         embed = discord.Embed(
             color=discord.Color.blurple(),
@@ -477,22 +479,14 @@ class economy(commands.Cog):
 
         embed = discord.Embed(color=discord.Color.blurple())
 
-        def get_value(values, db):
-            if values:
-                return Decimal(
-                    sum(
-                        [
-                            stock[1]["total"]
-                            * float(orjson.loads(db.get(stock[0].encode()))["price"])
-                            for stock in values.items()
-                        ]
-                    )
-                )
-
-            return 0
+        def get_values():
+            valuation = self.bot.valuation
+            return (
+                valuation.stocks.value(self.DB.stock_portfolios.get_all(member.id)),
+                valuation.crypto.value(self.DB.crypto_portfolios.get_all(member.id)),
+            )
 
-        stock_value = get_value(self.DB.get_stockbal(member_id), self.DB.stocks)
-        crypto_value = get_value(self.DB.get_cryptobal(member_id), self.DB.crypto)
+        stock_value, crypto_value = map(Decimal, await self.ADB.run(get_values))
 
         embed.add_field(
             name=f"{member.display_name}'s net worth",
@@ -514,30 +508,14 @@ class economy(commands.Cog):
         amount: int
             The amount of members to get
         """
-
-        def get_value(values, db):
-            if values:
-                return sum(
-                    [
-                        stock[1]["total"]
-                        * float(orjson.loads(db.get(stock[0].encode()))["price"])
-                        for stock in values.items()
-                    ]
-                )
-
-            return 0
-
         net_top = []
+        board = await self.ADB.leaderboard("bal")
+        balances = dict(board.scores)
+        net_worths = await self.ADB.run(self.bot.valuation.net_worths, balances)
 
-        for member_id, value in self.DB.bal:
-            stock_value = get_value(self.DB.get_stockbal(member_id), self.DB.stocks)
-            crypto_value = get_value(self.DB.get_cryptobal(member_id), self.DB.crypto)
-            # fmt: off
-            if (member := self.bot.get_user(int(member_id))):
-                net_top.append(
-                    (float(value) + stock_value + crypto_value, member.display_name)
-                )
-            # fmt: on
+        for net_worth, member_id in net_worths:
+            if member := self.bot.get_user(member_id):
+                net_top.append((net_worth, member.display_name))
 
         net_top = sorted(net_top, reverse=True)[:amount]
         embed = discord.Embed(color=discord.Color.blurple())
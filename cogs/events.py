@@ -1,20 +1,28 @@
+import asyncio
 import difflib
 import logging
 import os
 import platform
 import re
+import time
 from datetime import datetime, timedelta
 from io import StringIO
 
+import aiohttp
 import discord
 import orjson
 import psutil
 from discord.ext import commands
 
+from cogs.utils.cache import LRUCache, SingleFlight
+from cogs.utils.logs import ChannelIndex
+from cogs.utils.spam import SpamChecker
+
 GIST_REGEX = re.compile(
     r"(?P<host>(http(s)?://gist\.github\.com))/"
     r"(?P<owner>[\w,\-,\_]+)/(?P<id>[\w,\-,\_]+)((/){0,1})"
 )
+GIST_TTL = 300
 
 
 class DeleteButton(discord.ui.View):
@@ -29,64 +37,17 @@ class DeleteButton(discord.ui.View):
                 await interaction.message.delete()
 
 
-class CooldownByContent(commands.CooldownMapping):
-    def _bucket_key(self, message: discord.Message) -> tuple[int, str]:
-        return (message.channel.id, message.content)
-
-
-class SpamChecker:
-    """Checks if someone is spamming via the below criteria
-    1) If a user has spammed more than 10 times in 12 seconds
-    2) If the content has been spammed 15 times in 17 seconds.
-    3) If a user has mentioned 40 separate people in 17 seconds.
-    """
-
-    def __init__(self):
-        self.by_content = CooldownByContent.from_cooldown(
-            15, 17.0, commands.BucketType.member
-        )
-        self.by_user = commands.CooldownMapping.from_cooldown(
-            10, 12.0, commands.BucketType.user
-        )
-
-        self.by_mentions = commands.CooldownMapping.from_cooldown(
-            40, 12.0, commands.BucketType.member
-        )
-
-    def is_spamming(self, message: discord.Message) -> bool:
-        if message.guild is None:
-            return False
-
-        current = message.created_at.timestamp()
-
-        user_bucket = self.by_user.get_bucket(message)
-        if user_bucket.update_rate_limit(current):
-            return True
-
-        content_bucket = self.by_content.get_bucket(message)
-        if content_bucket.update_rate_limit(current):
-            return True
-
-        if self.is_mention_spam(message, current):
-            return True
-
-        return False
-
-    def is_mention_spam(self, message: discord.Message, current: float) -> bool:
-        mention_bucket = self.by_mentions.get_bucket(message, current)
-        mention_count = sum(
-            not m.bot and m.id != message.author.id for m in message.mentions
-        )
-        mention_bucket._tokens -= mention_count - 1
-
-        return mention_bucket.update_rate_limit(current) is not None
-
-
 class events(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         self.DB = bot.DB
         self.spam_checker = SpamChecker()
+        self.joins = {}
+        self.channels = ChannelIndex(self.DB.settings)
+        self.gists = bot.cache.add(
+            "gists", LRUCache(4 * 2**20, lambda gist: len(gist["content"]))
+        )
+        self.gist_requests = SingleFlight()
 
     async def poll_check(self, payload):
         """Keeps track of poll results.
@@ -94,31 +55,17 @@ class events(commands.Cog):
         payload: discord.RawReactionActionEvent
             A payload of raw data about the reaction and member.
         """
-        if not payload.guild_id or payload.emoji.is_custom_emoji():
-            return
-
-        polls = self.DB.main.get(b"polls")
-
-        if not polls:
-            return
-
-        polls = orjson.loads(polls)
-        guild = str(payload.guild_id)
-
-        if guild not in polls:
-            return
-
-        message = str(payload.message_id)
-
-        if message not in polls[guild]:
-            return
-
-        if payload.emoji.name not in polls[guild][message]:
+        # payload.member is None outside of guilds so check the id instead
+        if (
+            not payload.guild_id
+            or payload.user_id == self.bot.user.id
+            or payload.emoji.is_custom_emoji()
+        ):
             return
 
-        polls[guild][message][payload.emoji.name]["count"] += 1
-
-        self.DB.main.put(b"polls", orjson.dumps(polls))
+        self.DB.poll_index.vote(
+            payload.guild_id, payload.message_id, payload.emoji.name
+        )
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload):
@@ -222,24 +169,16 @@ class events(commands.Cog):
         """
         if (
             not before.guild
-            or self.DB.main.get(f"{after.guild.id}-logging".encode())
+            or self.DB.settings.logging_disabled(after.guild.id)
             or not after.content
             or before.content == after.content
             or after.author == self.bot.user
         ):
             return
 
-        member_id = f"{before.guild.id}-{before.author.id}".encode()
-        edited = self.DB.edited.get(member_id)
-
-        if not edited:
-            edited = {}
-        else:
-            edited = orjson.loads(edited)
-
-        date = str(int(datetime.now().timestamp()))
-        edited[date] = [before.content, after.content]
-        self.DB.edited.put(member_id, orjson.dumps(edited))
+        self.DB.edited_log.append(
+            before.guild.id, before.author.id, [before.content, after.content]
+        )
         self.DB.main.put(
             f"{before.guild.id}-editsnipe_message".encode(),
             orjson.dumps([before.content, after.content, before.author.display_name]),
@@ -248,7 +187,7 @@ class events(commands.Cog):
         if after.content.startswith("https"):
             return
 
-        channel = discord.utils.get(after.guild.channels, name="logs")
+        channel = self.channels.log_channel(after.guild)
 
         if not channel:
             return
@@ -265,7 +204,7 @@ class events(commands.Cog):
         embed.add_field(name="To:", value=f"```{after.content}```")
         embed.set_footer(text=f"Member ID: {before.author.id}")
 
-        await channel.send(embed=embed)
+        self.bot.log_sink.send(channel, embed)
 
     @commands.Cog.listener()
     async def on_message_delete(self, message):
@@ -275,7 +214,7 @@ class events(commands.Cog):
         """
         if (
             not message.guild
-            or self.DB.main.get(f"{message.guild.id}-logging".encode())
+            or self.DB.settings.logging_disabled(message.guild.id)
             or message.author == self.bot.user
         ):
             return
@@ -294,24 +233,19 @@ class events(commands.Cog):
             "\n".join(attachments),
         )
 
-        member_id = f"{message.guild.id}-{message.author.id}".encode()
-        deleted = self.DB.deleted.get(member_id)
-
-        if not deleted:
-            deleted = {}
-        else:
-            deleted = orjson.loads(deleted)
-
-        time_sent = str(((message.id >> 22) + 1420070400000) // 1000)
-        deleted[time_sent] = message.content
-
-        self.DB.deleted.put(member_id, orjson.dumps(deleted))
+        if message.content:
+            self.DB.deleted_log.append(
+                message.guild.id,
+                message.author.id,
+                message.content,
+                message.created_at.timestamp(),
+            )
         self.DB.main.put(
             f"{message.guild.id}-snipe_message".encode(),
             orjson.dumps([content, message.author.display_name]),
         )
 
-        channel = discord.utils.get(message.guild.channels, name="logs")
+        channel = self.channels.log_channel(message.guild)
 
         if not channel:
             return
@@ -322,7 +256,7 @@ class events(commands.Cog):
             color=discord.Color.blurple(),
         )
         embed.set_footer(text=f"Member ID: {message.author.id}")
-        await channel.send(embed=embed)
+        self.bot.log_sink.send(channel, embed)
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -344,10 +278,14 @@ class events(commands.Cog):
         if not guild_id:
             return
 
-        anti_spam = self.DB.main.get(f"anti_spam-{guild_id}".encode())
+        thresholds = self.DB.settings.spam_thresholds(guild_id)
         channel = message.channel.name.lower()
 
-        if anti_spam and channel != "bot" and self.spam_checker.is_spamming(message):
+        if (
+            thresholds
+            and channel != "bot"
+            and self.spam_checker.is_spamming(message, thresholds)
+        ):
             try:
                 await message.author.timeout(
                     until=datetime.now() + timedelta(hours=1), reason="Spamming"
@@ -356,28 +294,21 @@ class events(commands.Cog):
                 pass
 
         key = f"{guild_id}-{message.author.id}".encode()
-        count = self.DB.message_count.get(key)
-        # Add 1 to count and put it back into the database
-        self.DB.message_count.put(key, str(int(count) + 1).encode() if count else b"1")
+        # Buffered in memory and written to the db by the flush_db task
+        self.DB.add_message(guild_id, message.author.id)
 
         if key == b"815732601302155275-190747796452671488":
             if message.content and not message.content.startswith("."):
-                messages = orjson.loads(self.DB.main.get(b"justins-messages"))
-                messages.append(message.content)
-                self.DB.main.put(b"justins-messages", orjson.dumps(messages))
+                self.DB.justins_messages.append(message.content)
 
         match = GIST_REGEX.search(message.content)
 
         if not message.author.bot and match:
-            gist_id = match.group(5)
-            url = f"https://api.github.com/gists/{gist_id}"
-            data = await self.bot.get_json(url)
+            file = await self.get_gist(match.group(5))
 
-            if not data:
+            if not file:
                 return
 
-            # We just want the first value in the dictionary
-            file = data["files"].values().__iter__().__next__()
             content = file["content"]
             filename = file["filename"]
             extension = filename.split(".")[-1]
@@ -388,6 +319,58 @@ class events(commands.Cog):
                 )
             await message.channel.send(f"```{extension}\n{content}```")
 
+    async def get_gist(self, gist_id: str) -> dict | None:
+        """Returns the first file of a gist.
+
+        Gists are cached for GIST_TTL seconds and then revalidated with their
+        ETag, which doesn't count against the GitHub rate limit when the
+        gist hasn't changed. Concurrent requests for a gist share one fetch.
+
+        gist_id: str
+        """
+        cached = self.gists.get(gist_id)
+
+        if cached and time.monotonic() - cached["checked"] < GIST_TTL:
+            return cached
+
+        return await self.gist_requests.do(gist_id, self._fetch_gist, gist_id, cached)
+
+    async def _fetch_gist(self, gist_id, cached):
+        headers = {}
+        if cached and cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+
+        try:
+            async with self.bot.client_session.get(
+                f"https://api.github.com/gists/{gist_id}", headers=headers
+            ) as response:
+                if response.status == 304 and cached:
+                    cached["checked"] = time.monotonic()
+                    return cached
+
+                # Rate limits and server errors keep serving the cached copy
+                if response.status != 200:
+                    return cached
+
+                data = await response.json()
+                etag = response.headers.get("ETag", "")
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            return cached
+
+        # We just want the first file
+        if not (file := next(iter(data["files"].values()), None)):
+            return None
+
+        gist = {
+            "content": file["content"],
+            "filename": file["filename"],
+            "size": file["size"],
+            "etag": etag,
+            "checked": time.monotonic(),
+        }
+        self.gists.put(gist_id, gist)
+        return gist
+
     @commands.Cog.listener()
     async def on_member_update(self, before, after):
         """Puts members nickname history into the db.
@@ -460,18 +443,30 @@ class events(commands.Cog):
 
         member: discord.Member
         """
-        for invite in await member.guild.invites():
-            invite_key = f"{invite.code}-{invite.guild.id}"
-            member_key = f"{member.id}-{invite.guild.id}"
+        joins = self.joins.setdefault(member.guild.id, [])
+        joins.append(member.id)
 
-            uses = self.DB.invites.get(invite_key.encode())
+        # Joins in a burst share a single invites fetch
+        if len(joins) == 1:
+            self.bot.loop.create_task(self.track_invites(member.guild))
 
-            if not uses:
-                self.DB.invites.put(invite_key.encode(), str(invite.uses).encode())
-                continue
+    async def track_invites(self, guild, delay: float = 2.0):
+        """Fetches a guilds invites once for the joins in the last few seconds.
 
-            if invite.uses > int(uses):
-                self.DB.invites.put(member_key.encode(), invite.code.encode())
+        guild: discord.Guild
+        delay: float
+        """
+        await asyncio.sleep(delay)
+        members = self.joins.pop(guild.id)
+
+        try:
+            invites = await guild.invites()
+        except discord.HTTPException:
+            return
+
+        self.DB.invite_tracker.update(
+            guild.id, {invite.code: invite.uses for invite in invites}, members
+        )
 
     @commands.Cog.listener()
     async def on_member_remove(self, member):
@@ -479,10 +474,10 @@ class events(commands.Cog):
 
         member: discord.Member
         """
-        if self.DB.main.get(f"{member.guild.id}-logging".encode()):
+        if self.DB.settings.logging_disabled(member.guild.id):
             return
 
-        channel = discord.utils.get(member.guild.channels, name="logs")
+        channel = self.channels.log_channel(member.guild)
 
         if not channel:
             return
@@ -492,7 +487,32 @@ class events(commands.Cog):
             f"```{member.display_name} left the server\n\nMember ID: {member.id}```"
         )
 
-        await channel.send(embed=embed)
+        self.bot.log_sink.send(channel, embed)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        """Adds new channels to the channel index.
+
+        channel: discord.abc.GuildChannel
+        """
+        self.channels.add(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        """Removes deleted channels from the channel index.
+
+        channel: discord.abc.GuildChannel
+        """
+        self.channels.remove(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        """Reindexes renamed channels.
+
+        before: discord.abc.GuildChannel
+        after: discord.abc.GuildChannel
+        """
+        self.channels.update(before, after)
 
     @commands.Cog.listener()
     async def on_invite_create(self, invite):
@@ -500,8 +520,7 @@ class events(commands.Cog):
 
         invite: discord.Invite
         """
-        key = f"{invite.code}-{invite.guild.id}"
-        self.DB.invites.put(key.encode(), str(invite.uses).encode())
+        self.DB.invite_tracker.created(invite.guild.id, invite.code, invite.uses or 0)
 
     @commands.Cog.listener()
     async def on_invite_delete(self, invite):
@@ -509,7 +528,7 @@ class events(commands.Cog):
 
         invite: discord.Invite
         """
-        self.DB.invites.delete(f"{invite.code}-{invite.guild.id}".encode())
+        self.DB.invite_tracker.deleted(invite.guild.id, invite.code)
 
     @staticmethod
     async def can_run(ctx, command):
@@ -602,14 +621,7 @@ class events(commands.Cog):
 
             self.bot.uptime = start_time
 
-            boot_times = self.DB.main.get(b"boot_times")
-            boot_times = orjson.loads(boot_times) if boot_times else []
-            boot_times.append(round(boot_time, 5))
-
-            self.DB.main.put(b"boot_times", orjson.dumps(boot_times))
-
-            # Wipe the polls as we have no way of knowing if they have expired
-            self.DB.main.delete(b"polls")
+            self.DB.boot_times.append(round(boot_time, 5))
 
             self.bot.get_cog("admin").on_ready()
 
@@ -629,13 +641,13 @@ class events(commands.Cog):
 
         if ctx.guild:
             guild_id = ctx.guild.id
-            disabled = self.DB.main.get(f"{guild_id}-disabled_channels".encode())
+            settings = self.DB.settings
 
-            if disabled and ctx.command.name != "disable_channel":
-                if ctx.channel.id in orjson.loads(disabled):
+            if ctx.command.name != "disable_channel":
+                if ctx.channel.id in settings.disabled_channels(guild_id):
                     return False
 
-            if self.DB.main.get(f"{guild_id}-t-{ctx.command}".encode()):
+            if settings.command_disabled(guild_id, ctx.command):
                 await ctx.send(
                     embed=discord.Embed(
                         color=discord.Color.red(), description="```Command disabled```"
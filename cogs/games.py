@@ -91,7 +91,7 @@ class CookieClickerButton(discord.ui.Button["CookieClicker"]):
                 cookies[self.name] += amount
                 cookies["cps"] += amount * self.cps
 
-            view.DB.cookies.put(user_id, orjson.dumps(cookies))
+            view.DB.put_cookies(user_id, cookies)
             await interaction.response.edit_message(
                 content=None, embed=view.get_embed(cookies)
             )
@@ -192,7 +192,7 @@ class CookieClicker(discord.ui.View):
                 cookies = orjson.loads(cookies)
 
             cookies["buy_amount"] = int(interaction.data["values"][0])
-            self.DB.cookies.put(user_id, orjson.dumps(cookies))
+            self.DB.put_cookies(user_id, cookies)
 
             await interaction.response.edit_message(
                 content=None, embed=self.get_embed(cookies)
@@ -218,7 +218,7 @@ class CookieClicker(discord.ui.View):
             await interaction.response.edit_message(
                 content=None, embed=self.get_embed(cookies)
             )
-            self.DB.cookies.put(user_id, orjson.dumps(cookies))
+            self.DB.put_cookies(user_id, cookies)
 
 
 class TicTacToeButton(discord.ui.Button["TicTacToe"]):
@@ -393,6 +393,7 @@ class games(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         self.DB = bot.DB
+        self.ADB = bot.ADB
 
     @commands.command()
     async def games(self, ctx):
@@ -500,23 +501,16 @@ class games(commands.Cog):
         )
 
         await ctx.send(embed=embed)
-        self.DB.cookies.put(user_id, orjson.dumps(cookies))
+        self.DB.put_cookies(user_id, cookies)
 
     @cookie.command()
     async def top(self, ctx):
         """Gets the users with the most cookies."""
-        cookietop = []
-        for member, data in self.DB.cookies:
-            data = orjson.loads(data)
-            cps = data.get("cps", 0)
-            if cps:
-                data["cookies"] += round((time.time() - data["start"]) * cps)
-
-            member = self.bot.get_user(int(member))
-            if member:
-                cookietop.append((data["cookies"], member.display_name))
-
-        cookietop = sorted(cookietop, reverse=True)[:10]
+        board = await self.ADB.leaderboard("cookies")
+        cookietop = [
+            (round(cookies), self.bot.get_user(member).display_name)
+            for cookies, member in board.top(10, time.time(), self.bot.get_user)
+        ]
 
         embed = discord.Embed(
             color=discord.Color.blurple(),
@@ -572,8 +566,8 @@ class games(commands.Cog):
         embed.title = f"You sent {amount} 🍪 to {member}"
         await ctx.send(embed=embed)
 
-        self.DB.cookies.put(sender, orjson.dumps(sender_bal))
-        self.DB.cookies.put(receiver, orjson.dumps(receiver_bal))
+        self.DB.put_cookies(sender, sender_bal)
+        self.DB.put_cookies(receiver, receiver_bal)
 
     @commands.command()
     async def tictactoe(self, ctx):
@@ -8,7 +8,6 @@ from datetime import datetime
 from io import StringIO
 
 import discord
-import orjson
 import psutil
 from discord.ext import commands
 
@@ -19,6 +18,7 @@ class information(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         self.DB = bot.DB
+        self.ADB = bot.ADB
         self.process = psutil.Process()
 
     @commands.command()
@@ -102,14 +102,7 @@ class information(commands.Cog):
 
         amount: str
         """
-        msgtop = []
-        guild = str(ctx.guild.id).encode()
-
-        for member, count in self.DB.message_count:
-            if member.startswith(guild):
-                msgtop.append((int(count), member.decode()))
-
-        msgtop.sort(reverse=True)
+        board = await self.ADB.leaderboard("message_count", ctx.guild.id)
 
         amount = 10 if not amount else 250 if amount.lower() == "all" else int(amount)
 
@@ -118,8 +111,8 @@ class information(commands.Cog):
         counts = []
         lines = ""
 
-        for count, member in msgtop:
-            user = self.bot.get_user(int(member.split("-")[1]))
+        for count, member in board.top():
+            user = self.bot.get_user(member)
             if user:
                 total_lines += 1
 
@@ -163,15 +156,13 @@ class information(commands.Cog):
         number: int
             Which rule to get.
         """
-        rules = self.DB.main.get(f"{ctx.guild.id}-rules".encode())
+        rules = self.DB.rules(ctx.guild.id)
         embed = discord.Embed(color=discord.Color.blurple())
 
         if not rules:
             embed.description = "```No rules added yet.```"
             return await ctx.send(embed=embed)
 
-        rules = orjson.loads(rules)
-
         if number not in range(1, len(rules) + 1):
             embed.description = "```No rule found.```"
             return await ctx.send(embed=embed)
@@ -182,14 +173,13 @@ class information(commands.Cog):
     @commands.command()
     async def rules(self, ctx):
         """Shows all the rules of the server"""
-        rules = self.DB.main.get(f"{ctx.guild.id}-rules".encode())
+        rules = self.DB.rules(ctx.guild.id)
         embed = discord.Embed(color=discord.Color.blurple())
 
         if not rules:
             embed.description = "```No rules added yet.```"
             return await ctx.send(embed=embed)
 
-        rules = orjson.loads(rules)
         embed.title = "Server Rules"
         for index, rule in enumerate(rules, start=1):
             embed.add_field(name=f"Rule {index}", value=rule, inline=False)
@@ -3,11 +3,11 @@ import random
 import re
 import unicodedata
 from datetime import datetime
+from itertools import islice
 
 import discord
 import lxml.html
 import opcode
-import orjson
 from discord.ext import commands, pages
 
 from cogs.utils.color import hsslv
@@ -105,6 +105,7 @@ class misc(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         self.DB = bot.DB
+        self.ADB = bot.ADB
 
     @commands.command()
     async def solved(self, ctx: commands.Context):
@@ -472,10 +473,18 @@ class misc(commands.Cog):
     @commands.command()
     async def justin(self, ctx):
         """Gets a random message from justin."""
-        messages = orjson.loads(self.DB.main.get(b"justins-messages"))
+        messages = self.DB.justins_messages
+
+        if not messages:
+            return await ctx.send(
+                embed=discord.Embed(
+                    color=discord.Color.blurple(), description="```No messages found```"
+                )
+            )
 
         embed = discord.Embed(
-            color=discord.Color.blurple(), description=random.choice(messages)
+            color=discord.Color.blurple(),
+            description=messages[random.randrange(len(messages))],
         )
         embed.set_footer(text="― Justin")
         await ctx.send(embed=embed)
@@ -604,15 +613,8 @@ class misc(commands.Cog):
             The user to get the karma of.
         """
         user = user or ctx.author
-        user_id = str(user.id).encode()
-        karma = self.DB.karma.get(user_id)
-
-        if not karma:
-            karma = 0
-        else:
-            karma = karma.decode()
-
-        color = "32" if int(karma) > 0 else "31"
+        karma = self.DB.karma_counter.get(str(user.id).encode())
+        color = "32" if karma > 0 else "31"
 
         embed = discord.Embed(color=0x0)
 
@@ -622,9 +624,10 @@ class misc(commands.Cog):
     @commands.command(aliases=["kboard", "ktop", "karmatop"])
     async def karmaboard(self, ctx):
         """Displays the top 5 and bottom 5 members karma."""
-        sorted_karma = sorted(
-            [(int(k), int(m)) for m, k in self.DB.karma], reverse=True
-        )
+        board = await self.ADB.leaderboard("karma")
+        top = list(islice(board.top(), 5))
+        bottom = list(islice(board.bottom(), 5))[::-1]
+
         embed = discord.Embed(title="Karma Board", color=discord.Color.blurple())
 
         def parse_karma(data):
@@ -638,11 +641,11 @@ class misc(commands.Cog):
 
         embed.add_field(
             name="Top Five",
-            value="```ansi\n{}```".format("\n".join(parse_karma(sorted_karma[:5]))),
+            value="```ansi\n{}```".format("\n".join(parse_karma(top))),
         )
         embed.add_field(
             name="Bottom Five",
-            value="```ansi\n{}```".format("\n".join(parse_karma(sorted_karma[-5:]))),
+            value="```ansi\n{}```".format("\n".join(parse_karma(bottom))),
         )
         await ctx.send(embed=embed)
 
@@ -7,6 +7,7 @@ import discord
 import orjson
 from discord.ext import commands, pages
 
+from cogs.utils.paginator import LazyPaginator
 from cogs.utils.time import parse_time
 
 
@@ -16,6 +17,7 @@ class moderation(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         self.DB = bot.DB
+        self.ADB = bot.ADB
         self.loop = bot.loop
         self.handles = {}
 
@@ -28,7 +30,7 @@ class moderation(commands.Cog):
             Used to check the invite that a specific member used.
         """
         if member:
-            invite_code = self.DB.invites.get(f"{member.id}-{ctx.guild.id}".encode())
+            invite_code = self.DB.invite_tracker.joined_from(member.id, ctx.guild.id)
 
             if not invite_code:
                 return await ctx.send(
@@ -41,7 +43,7 @@ class moderation(commands.Cog):
             return await ctx.send(
                 embed=discord.Embed(
                     color=discord.Color.blurple(),
-                    title=f"{member} joined from the invite `{invite_code.decode()}`",
+                    title=f"{member} joined from the invite `{invite_code}`",
                 )
             )
 
@@ -49,7 +51,9 @@ class moderation(commands.Cog):
         invites = ""
         count = 0
 
-        for member, invite in self.DB.invites:
+        self.DB.invite_tracker.flush()
+
+        async for member, invite in self.ADB.scan(self.DB.invites):
             if invite.isdigit():
                 continue
 
@@ -75,30 +79,38 @@ class moderation(commands.Cog):
         paginator = pages.Paginator(pages=invite_list)
         await paginator.send(ctx)
 
-    async def _end_poll(self, guild, message):
-        """Ends a poll and sends the results."""
-        polls = self.DB.main.get(b"polls")
-
-        if not polls:
-            return
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Reschedules the polls that were running when the bot stopped."""
+        for (guild_id, message_id), poll in self.DB.poll_index.polls.items():
+            if message_id not in self.handles:
+                self._schedule_poll(guild_id, poll["channel"], message_id, poll["ends"])
+
+    def _schedule_poll(self, guild_id, channel_id, message_id, ends):
+        self.handles[message_id] = self.loop.call_later(
+            max(ends - time.time(), 0),
+            asyncio.create_task,
+            self._end_poll(guild_id, channel_id, message_id),
+        )
 
-        message_id = str(message.id)
-        polls = orjson.loads(polls)
+    @staticmethod
+    def _winner(poll):
+        return max(poll["options"], key=lambda emoji: poll["options"][emoji]["count"])
 
-        if guild not in polls:
-            return
+    async def _end_poll(self, guild_id, channel_id, message_id):
+        """Ends a poll and sends the results."""
+        self.handles.pop(message_id, None)
+        poll = self.DB.poll_index.end(guild_id, message_id)
 
-        if message_id not in polls[guild]:
+        if not poll or not (channel := self.bot.get_channel(channel_id)):
             return
 
-        winner = max(
-            polls[guild][message_id], key=lambda x: polls[guild][message_id][x]["count"]
-        )
-
-        await message.reply(f"Winner of the poll was {winner}")
-
-        polls[guild].pop(message_id)
-        self.DB.main.put(b"polls", orjson.dumps(polls))
+        try:
+            await channel.get_partial_message(message_id).reply(
+                f"Winner of the poll was {self._winner(poll)}"
+            )
+        except discord.HTTPException:
+            pass
 
     @commands.command()
     @commands.has_permissions(kick_members=True)
@@ -119,82 +131,44 @@ class moderation(commands.Cog):
             embed.description = "```You need at least 2 options```"
             return await ctx.send(embed=embed)
 
-        polls = self.DB.main.get(b"polls")
-
-        if not polls:
-            polls = {}
-        else:
-            polls = orjson.loads(polls)
-
-        guild = str(ctx.guild.id)
-
-        if guild not in polls:
-            polls[guild] = {}
-
-        polls[guild]["temp"] = {}
-        embed.description = ""
-
-        for number, option in enumerate(options):
-            emoji = chr(127462 + number)
-            polls[guild]["temp"][emoji] = {
-                "name": option,
-                "count": 0,
-            }
-            embed.description += f"{emoji}: {option}\n"
+        options = {
+            chr(127462 + number): option for number, option in enumerate(options)
+        }
 
         embed.title = title
+        embed.description = "".join(
+            f"{emoji}: {option}\n" for emoji, option in options.items()
+        )
         message = await ctx.send(embed=embed)
-        message_id = str(message.id)
 
-        polls[guild][message_id] = polls[guild].pop("temp")
+        for emoji in options:
+            await message.add_reaction(emoji)
 
-        for i in range(len(options)):
-            await message.add_reaction(chr(127462 + i))
-
-        self.DB.main.put(b"polls", orjson.dumps(polls))
-        handle = self.loop.call_later(
-            21600, asyncio.create_task, self._end_poll(guild, message)
+        # Started after reacting so the bots own reactions aren't counted
+        ends = time.time() + 21600
+        self.DB.poll_index.start(
+            ctx.guild.id, ctx.channel.id, message.id, options, ends
         )
-        self.handles[message_id] = handle
+        self._schedule_poll(ctx.guild.id, ctx.channel.id, message.id, ends)
 
     @commands.command()
     @commands.has_permissions(kick_members=True)
     @commands.guild_only()
-    async def endpoll(self, ctx, message_id):
+    async def endpoll(self, ctx, message_id: int):
         """Ends a poll based off its message id."""
-        polls = self.DB.main.get(b"polls")
-
-        if not polls:
-            return
-
-        polls = orjson.loads(polls)
-
-        if str(ctx.guild.id) not in polls:
-            return await ctx.send(
-                embed=discord.Embed(
-                    color=discord.Color.blurple(), description="No polls found"
-                )
-            )
+        poll = self.DB.poll_index.end(ctx.guild.id, message_id)
 
-        if message_id not in polls[str(ctx.guild.id)]:
+        if not poll:
             return await ctx.send(
                 embed=discord.Embed(
                     color=discord.Color.blurple(), description="Poll not found"
                 )
             )
 
-        winner = max(
-            polls[str(ctx.guild.id)][message_id],
-            key=lambda x: polls[str(ctx.guild.id)][message_id][x]["count"],
-        )
-
-        await ctx.reply(f"Winner of the poll was {winner}")
+        await ctx.reply(f"Winner of the poll was {self._winner(poll)}")
 
-        polls[str(ctx.guild.id)].pop(message_id)
-        self.DB.main.put(b"polls", orjson.dumps(polls))
-
-        self.handles[message_id].cancel()
-        self.handles.pop(message_id)
+        if handle := self.handles.pop(message_id, None):
+            handle.cancel()
 
     @commands.command(name="warn")
     @commands.has_permissions(manage_messages=True)
@@ -597,6 +571,23 @@ class moderation(commands.Cog):
         )
         await ctx.send(embed=embed)
 
+    def _history_paginator(self, ctx, log, member, format_entry):
+        """Returns a paginator over a members message log or None if it's empty."""
+        count = log.count(ctx.guild.id, member.id)
+
+        if not count:
+            return None
+
+        def get_page(page: int) -> discord.Embed:
+            embed = discord.Embed(color=discord.Color.blurple())
+
+            for date, entry in log.page(ctx.guild.id, member.id, page):
+                embed.add_field(name=f"<t:{date:.0f}:R>", value=format_entry(entry))
+
+            return embed
+
+        return LazyPaginator(ctx.author, -(-count // 10), get_page)
+
     @history.command(aliases=["d"])
     @commands.has_permissions(manage_messages=True)
     @commands.guild_only()
@@ -605,39 +596,21 @@ class moderation(commands.Cog):
 
         member: discord.User
             The user to get the history of.
-        amount: int
-            The amount of messages to get.
         """
         member = member or ctx.author
 
-        member_id = f"{ctx.guild.id}-{member.id}".encode()
-        deleted = self.DB.deleted.get(member_id)
-        embed = discord.Embed(color=discord.Color.blurple())
+        paginator = self._history_paginator(
+            ctx,
+            self.DB.deleted_log,
+            member,
+            lambda message: message.replace("`", "`\u200b"),
+        )
 
-        if not deleted:
+        if not paginator:
+            embed = discord.Embed(color=discord.Color.blurple())
             embed.description = "```No deleted messages found```"
             return await ctx.send(embed=embed)
 
-        deleted = orjson.loads(deleted)
-
-        embeds = []
-        count = 0
-
-        for date, message in reversed(deleted.items()):
-            message = message.replace("`", "`\u200B")
-            if message:
-                embed.add_field(name=f"<t:{date}:R>", value=message)
-                count += 1
-
-                if count == 10:
-                    embeds.append(embed)
-                    embed = discord.Embed(color=discord.Color.blurple())
-                    count = 0
-
-        if count != 10:
-            embeds.append(embed)
-
-        paginator = pages.Paginator(pages=embeds)
         await paginator.send(ctx)
 
     @history.command(aliases=["e"])
@@ -648,39 +621,21 @@ class moderation(commands.Cog):
 
         member: discord.User
             The user to get the edit history of.
-        amount: int
-            The amount of messages to get.
         """
         member = member or ctx.author
 
-        member_id = f"{ctx.guild.id}-{member.id}".encode()
-        edited = self.DB.edited.get(member_id)
-        embed = discord.Embed(color=discord.Color.blurple())
+        paginator = self._history_paginator(
+            ctx,
+            self.DB.edited_log,
+            member,
+            lambda edit: " >>> ".join(text.replace("`", "`\u200b") for text in edit),
+        )
 
-        if not edited:
+        if not paginator:
+            embed = discord.Embed(color=discord.Color.blurple())
             embed.description = "```No edited messages found```"
             return await ctx.send(embed=embed)
 
-        edited = orjson.loads(edited)
-        embeds = []
-        count = 0
-
-        for index, (date, (before, after)) in enumerate(reversed(edited.items())):
-            before = before.replace("`", "`\u200b")
-            after = after.replace("`", "`\u200b")
-
-            embed.add_field(name=f"<t:{date}:R>", value=f"{before} >>> {after}")
-            count += 1
-
-            if count == 10:
-                embeds.append(embed)
-                embed = discord.Embed(color=discord.Color.blurple())
-                count = 0
-
-        if count != 10:
-            embeds.append(embed)
-
-        paginator = pages.Paginator(pages=embeds)
         await paginator.send(ctx)
 
 
@@ -4,12 +4,16 @@ import textwrap
 import time
 import traceback
 from contextlib import redirect_stdout
+from functools import partial
 from io import StringIO
 
 import discord
 import orjson
 from discord.ext import commands, pages
 
+from cogs.utils.backup import BackupError
+from cogs.utils.database import is_binary
+
 
 class PerformanceMocker:
     """A mock object that can also be used in await expressions."""
@@ -55,6 +59,7 @@ class owner(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         self.DB = bot.DB
+        self.ADB = bot.ADB
 
     async def cog_check(self, ctx):
         """Checks if the member is an owner.
@@ -185,7 +190,7 @@ class owner(commands.Cog):
         await ctx.send(
             embed=discord.Embed(
                 color=discord.Color.blurple(),
-                description=f"```Usage: {ctx.prefix}db [del/show/get/put/pre]```",
+                description=f"```Usage: {ctx.prefix}db [del/show/get/put/pre/restore]```",
             )
         )
 
@@ -205,7 +210,11 @@ class owner(commands.Cog):
 
             value = (await ctx.message.attachments[0].read()).decode()
 
-        self.DB.main.put(key.encode(), value.encode())
+        try:
+            self.DB.edit(key.encode(), value.encode())
+        except ValueError as e:
+            embed.description = f"```{e}```"
+            return await ctx.send(embed=embed)
 
         length = len(value)
         if length < 1986:
@@ -220,7 +229,7 @@ class owner(commands.Cog):
 
         key: str
         """
-        self.DB.main.delete(key.encode())
+        self.DB.edit(key.encode())
 
         await ctx.send(
             embed=discord.Embed(
@@ -245,7 +254,10 @@ class owner(commands.Cog):
                 )
             )
 
-        file = StringIO(item.decode())
+        if is_binary(key.encode()):
+            file = StringIO(item.hex())
+        else:
+            file = StringIO(item.decode(errors="backslashreplace"))
 
         await ctx.send(file=discord.File(file, "data.txt"))
 
@@ -253,32 +265,29 @@ class owner(commands.Cog):
     async def show(self, ctx, exclude=True):
         """Sends a json of the entire database."""
         database = {}
+        excluded = (
+            b"crypto",
+            b"stocks",
+            b"message_count",
+            b"invites",
+            b"karma",
+            b"boot_times",
+            b"aliases",
+            b"stock_ticks",
+            b"crypto_ticks",
+        )
 
-        if exclude:
-            excluded = (
-                b"crypto",
-                b"stocks",
-                b"message_count",
-                b"invites",
-                b"karma",
-                b"boot_times",
-                b"aliases",
-            )
+        async for key, value in self.ADB.scan():
+            if exclude and key.split(b"-")[0] in excluded:
+                continue
 
-            for key, value in self.DB.main:
-                if key.split(b"-")[0] not in excluded:
-                    if value[:1] in [b"{", b"["]:
-                        value = orjson.loads(value)
-                    else:
-                        value = value.decode()
-                    database[key.decode()] = value
-        else:
-            for key, value in self.DB.main:
-                if value[:1] in [b"{", b"["]:
-                    value = orjson.loads(value)
-                else:
-                    value = value.decode()
-                database[key.decode()] = value
+            if is_binary(key):
+                value = value.hex()
+            elif value[:1] in [b"{", b"["]:
+                value = orjson.loads(value)
+            else:
+                value = value.decode(errors="backslashreplace")
+            database[key.decode()] = value
 
         file = StringIO(str(database))
         await ctx.send(file=discord.File(file, "data.json"))
@@ -294,14 +303,43 @@ class owner(commands.Cog):
                 )
             )
 
+        if is_binary(prefixed.encode()):
+            decode = bytes.hex
+        else:
+            decode = partial(bytes.decode, errors="backslashreplace")
+
         database = {
-            key.decode(): value.decode() for key, value in getattr(self.DB, prefixed)
+            key.decode(): decode(value)
+            async for key, value in self.ADB.scan(getattr(self.DB, prefixed))
         }
 
         file = StringIO(str(database))
 
         await ctx.send(file=discord.File(file, "data.json"))
 
+    @db.command()
+    async def restore(self, ctx, number: int = None):
+        """Restores the database from a backup.
+
+        number: int
+            Which backup to restore, defaults to the latest.
+        """
+        embed = discord.Embed(color=discord.Color.blurple())
+        self.DB.flush()
+
+        try:
+            applied = await self.ADB.run(self.DB.backups.restore, number)
+        except BackupError as e:
+            embed.description = f"```{e}```"
+            return await ctx.send(embed=embed)
+
+        self.DB.reset_caches()
+        await self.ADB.run(self.bot.valuation.refresh_stocks)
+        await self.ADB.run(self.bot.valuation.refresh_crypto)
+
+        embed.description = f"```Restored {applied} records```"
+        await ctx.send(embed=embed)
+
     @commands.command(aliases=["removeinf"])
     @commands.guild_only()
     async def remove_infraction(
@@ -340,15 +378,16 @@ class owner(commands.Cog):
         """
         embed = discord.Embed(color=discord.Color.blurple())
 
-        user_id = str(user.id).encode()
-        if self.DB.blacklist.get(user_id):
-            self.DB.blacklist.delete(user_id)
+        blacklist = self.DB.blacklist_index
+
+        if blacklist.get_exact(user.id):
+            blacklist.delete(user.id)
 
             embed.title = "User Unblacklisted"
             embed.description = f"***{user}*** has been unblacklisted"
             return await ctx.send(embed=embed)
 
-        self.DB.blacklist.put(user_id, b"2")
+        blacklist.put(user.id, b"2")
         embed.title = "User Blacklisted"
         embed.description = f"**{user}** has been added to the blacklist"
 
@@ -362,15 +401,16 @@ class owner(commands.Cog):
         """
         embed = discord.Embed(color=discord.Color.blurple())
 
-        user_id = str(user.id).encode()
-        if self.DB.blacklist.get(user_id):
-            self.DB.blacklist.delete(user_id)
+        blacklist = self.DB.blacklist_index
+
+        if blacklist.get_exact(user.id):
+            blacklist.delete(user.id)
 
             embed.title = "User Undownvoted"
             embed.description = f"***{user}*** has been undownvoted"
             return await ctx.send(embed=embed)
 
-        self.DB.blacklist.put(user_id, b"1")
+        blacklist.put(user.id, b"1")
         embed.title = "User Downvoted"
         embed.description = f"**{user}** has been added to the downvote list"
 
@@ -378,26 +418,35 @@ class owner(commands.Cog):
 
     @commands.command()
     async def backup(self, ctx, number: int = None):
-        """Sends the bot database backup as a json file.
+        """Sends a database backup file.
+
+        Incremental backups only hold the changes since the one before them.
 
         number: int
-            Which backup to get.
+            Which backup to get, defaults to the latest.
         """
-        if not number:
-            number = int(self.DB.main.get(b"backup_number").decode())
+        backups = dict(self.DB.backups.backups())
 
-            with open(f"backup/{number}backup.json", "rb") as file:
-                return await ctx.send(file=discord.File(file, "backup.json"))
+        if number is None and backups:
+            number = max(backups)
 
-        number = min(10, max(number, 0))
+        if number not in backups:
+            return await ctx.send(
+                embed=discord.Embed(
+                    color=discord.Color.blurple(),
+                    description=f"```Backups: {', '.join(map(str, backups))}```",
+                )
+            )
 
-        with open(f"backup/{number}backup.json", "rb") as file:
-            await ctx.send(file=discord.File(file, "backup.json"))
+        path = self.DB.backups.path(number, backups[number])
+
+        with open(path, "rb") as file:
+            await ctx.send(file=discord.File(file, os.path.basename(path)))
 
     @commands.command(name="boot")
     async def boot_times(self, ctx):
         """Shows the average fastest and slowest boot times of the bot."""
-        boot_times = self.DB.main.get(b"boot_times")
+        boot_times = list(self.DB.boot_times)
 
         embed = discord.Embed(color=discord.Color.blurple())
 
@@ -405,8 +454,6 @@ class owner(commands.Cog):
             embed.description = "No boot times found"
             return await ctx.send(embed=embed)
 
-        boot_times = orjson.loads(boot_times)
-
         msg = (
             f"\n\nAverage: {(sum(boot_times) / len(boot_times)):.5f}s"
             f"\nSlowest: {max(boot_times):.5f}s"
@@ -417,6 +464,49 @@ class owner(commands.Cog):
         embed.description = f"```{msg}```"
         await ctx.send(embed=embed)
 
+    @commands.command(name="logsink")
+    async def log_sink(self, ctx):
+        """Shows the queue depth and counters of the log sink."""
+        sink = self.bot.log_sink
+
+        embed = discord.Embed(color=discord.Color.blurple())
+        embed.description = (
+            f"```Queued embeds: {sink.depth()}"
+            f"\nChannels waiting: {len(sink.queues)}"
+            f"\nMessages sent: {sink.sent}"
+            f"\nEmbeds dropped: {sink.dropped}```"
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    async def hosts(self, ctx):
+        """Shows the breaker state, concurrency limit and latency of each host."""
+        embed = discord.Embed(color=discord.Color.blurple())
+        lines = []
+
+        hosts = sorted(
+            self.bot.client_session.hosts.items(),
+            key=lambda item: item[1].latency.total,
+            reverse=True,
+        )
+
+        # Only the busiest hosts fit in an embed
+        for name, host in hosts[:40]:
+            p50, p95 = host.latency.quantile(0.5), host.latency.quantile(0.95)
+            lines.append(
+                f"{name[:24]:<24} {host.breaker.state:<9}"
+                f" {host.limit.inflight}/{host.limit.limit:<5.1f}"
+                f" p50<={p50}s p95<={p95}s"
+                f" {host.failures} failed {host.rejected} rejected"
+            )
+
+        if not lines:
+            embed.description = "```No requests have been made```"
+            return await ctx.send(embed=embed)
+
+        embed.description = "```\n{}```".format("\n".join(lines))
+        await ctx.send(embed=embed)
+
     @commands.group(invoke_without_command=True)
     async def cache(self, ctx):
         """Command group for interacting with the cache."""
@@ -429,7 +519,7 @@ class owner(commands.Cog):
 
     @cache.command()
     async def wipe(self, ctx):
-        """Wipes cache from the db."""
+        """Wipes every cache namespace."""
         self.bot.cache.clear()
 
         await ctx.send(
@@ -440,15 +530,30 @@ class owner(commands.Cog):
 
     @cache.command(name="list")
     async def _list(self, ctx):
-        """Lists the cached items in the db."""
+        """Lists the cache namespaces and their stats."""
         embed = discord.Embed(color=discord.Color.blurple())
-        cache = self.bot.cache
+        lines = []
+
+        for name, cache in self.bot.cache:
+            if hasattr(cache, "expire"):
+                cache.expire()
+
+            lines.append(
+                f"{name:<8} {len(cache):>5} entries {cache.size:>9,}/{cache.max_size:,}"
+                f" {cache.hit_rate():>7.1%} hits {cache.evictions:>5} evicted"
+            )
 
-        if not cache:
+        if not lines:
             embed.description = "```Nothing has been cached```"
             return await ctx.send(embed=embed)
 
-        embed.description = "```\n{}```".format("\n".join(cache))
+        embed.description = "```\n{}```".format("\n".join(lines))
+
+        if http := self.bot.http_cache:
+            embed.set_footer(
+                text=f"http: {http.hit_rate():.1%} fresh hits,"
+                f" {http.revalidated} revalidated, {http.coalesced} coalesced"
+            )
         await ctx.send(embed=embed)
 
     @commands.command()
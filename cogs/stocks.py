@@ -2,8 +2,10 @@ import textwrap
 from decimal import Decimal
 
 import discord
-import orjson
-from discord.ext import commands, pages
+from discord.ext import commands
+
+from cogs.utils.history import PERIODS, format_summary
+from cogs.utils.paginator import LazyPaginator, price_pages
 
 
 class stocks(commands.Cog):
@@ -12,6 +14,7 @@ class stocks(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         self.DB = bot.DB
+        self.ADB = bot.ADB
 
     @commands.group()
     async def stock(self, ctx):
@@ -51,6 +54,15 @@ class stocks(commands.Cog):
         embed.add_field(
             name="Percent 24h Change", value=f"```diff\n{sign}{stock['%change']}%```"
         )
+
+        summary = await self.ADB.run(self.DB.stock_history.summary, symbol, PERIODS)
+        if summary:
+            embed.add_field(
+                name="Price History (min/max/avg)",
+                value=format_summary(summary),
+                inline=False,
+            )
+
         embed.set_image(url=f"https://charts2.finviz.com/chart.ashx?s=l&p=w&t={symbol}")
 
         await ctx.send(embed=embed)
@@ -75,38 +87,28 @@ class stocks(commands.Cog):
 
         price = price["price"]
         member_id = str(ctx.author.id).encode()
-        stockbal = self.DB.get_stockbal(member_id)
+        holding = self.DB.stock_portfolios.get(ctx.author.id, symbol)
 
-        if not stockbal:
+        if not holding:
             embed.description = f"```You have never invested in {symbol}```"
             return await ctx.send(embed=embed)
 
         if amount[-1] == "%":
-            amount = stockbal[symbol]["total"] * ((float(amount[:-1])) / 100)
+            amount = holding.total * ((float(amount[:-1])) / 100)
         else:
             amount = float(amount)
 
-        if amount < 0:
-            embed.description = "```You can't sell a negative amount of stocks```"
+        if amount <= 0:
+            embed.description = "```You have to sell a positive amount of stocks```"
             return await ctx.send(embed=embed)
 
-        if stockbal[symbol]["total"] < amount:
-            embed.description = (
-                f"```Not enough stock you have: {stockbal[symbol]['total']}```"
-            )
+        if holding.total < amount:
+            embed.description = f"```Not enough stock you have: {holding.total}```"
             return await ctx.send(embed=embed)
 
         bal = self.DB.get_bal(member_id)
 
         cash = amount * float(price)
-
-        stockbal[symbol]["total"] -= amount
-
-        if stockbal[symbol]["total"] == 0:
-            stockbal.pop(symbol, None)
-        else:
-            stockbal[symbol]["history"].append((-amount, cash))
-
         bal += Decimal(cash)
 
         embed = discord.Embed(
@@ -118,7 +120,7 @@ class stocks(commands.Cog):
         await ctx.send(embed=embed)
 
         self.DB.put_bal(member_id, bal)
-        self.DB.put_stockbal(member_id, stockbal)
+        self.DB.stock_portfolios.sell(ctx.author.id, symbol, amount, cash)
 
     @stock.command(aliases=["buy"])
     async def invest(self, ctx, symbol, cash: float):
@@ -130,8 +132,8 @@ class stocks(commands.Cog):
         """
         embed = discord.Embed(color=discord.Color.blurple())
 
-        if cash < 0:
-            embed.description = "```You can't buy a negative amount of stocks```"
+        if cash <= 0:
+            embed.description = "```You have to buy a positive amount of stocks```"
             return await ctx.send(embed=embed)
 
         symbol = symbol.upper()
@@ -150,15 +152,6 @@ class stocks(commands.Cog):
             return await ctx.send(embed=embed)
 
         amount = cash / float(stock)
-
-        stockbal = self.DB.get_stockbal(member_id)
-
-        if symbol not in stockbal:
-            stockbal[symbol] = {"total": 0, "history": [(amount, cash)]}
-        else:
-            stockbal[symbol]["history"].append((amount, cash))
-
-        stockbal[symbol]["total"] += amount
         bal -= Decimal(cash)
 
         embed = discord.Embed(
@@ -170,7 +163,7 @@ class stocks(commands.Cog):
         await ctx.send(embed=embed)
 
         self.DB.put_bal(member_id, bal)
-        self.DB.put_stockbal(member_id, stockbal)
+        self.DB.stock_portfolios.buy(ctx.author.id, symbol, amount, cash)
 
     @stock.command(aliases=["balance"])
     async def bal(self, ctx, symbol):
@@ -180,29 +173,20 @@ class stocks(commands.Cog):
             The symbol of the stock to find.
         """
         symbol = symbol.upper()
-        member_id = str(ctx.author.id).encode()
-        stockbal = self.DB.get_stockbal(member_id)
+        holding = self.DB.stock_portfolios.get(ctx.author.id, symbol)
         embed = discord.Embed(color=discord.Color.blurple())
 
-        if not stockbal:
-            embed.description = "```You have never invested```"
-            return await ctx.send(embed=embed)
-
-        if symbol not in stockbal:
+        if not holding:
             embed.description = f"```You have never invested in {symbol}```"
             return await ctx.send(embed=embed)
 
         stock = self.DB.get_stock(symbol)
-
-        trades = [
-            trade[1] / trade[0] for trade in stockbal[symbol]["history"] if trade[0] > 0
-        ]
-        change = ((float(stock["price"]) / (sum(trades) / len(trades))) - 1) * 100
+        change = holding.change(float(stock["price"]))
 
         embed.description = textwrap.dedent(
             f"""
                 ```diff
-                You have {stockbal[symbol]['total']:.2f} stocks in {symbol}
+                You have {holding.total:.2f} stocks in {symbol}
 
                 Price: {stock['price']}
 
@@ -225,67 +209,49 @@ class stocks(commands.Cog):
         """
         member = member or ctx.author
 
-        member_id = str(member.id).encode()
-        stockbal = self.DB.get_stockbal(member_id)
+        holdings = self.DB.stock_portfolios.get_all(member.id)
         embed = discord.Embed(color=discord.Color.blurple())
 
-        if not stockbal:
+        if not holdings:
             embed.description = "```You have never invested```"
             return await ctx.send(embed=embed)
 
-        if len(stockbal) == 0:
-            embed.description = "```You have sold all your stocks.```"
-            return await ctx.send(embed=embed)
-
         net_value = 0
         msg = (
             f"{member.display_name}'s stock profile:\n\n"
             "Name:    Amount:      Price:             Percent Gain:\n"
         )
 
-        for stock in stockbal:
+        for stock, holding in holdings.items():
             data = self.DB.get_stock(stock)
             price = float(data["price"])
 
-            trades = [
-                trade[1] / trade[0]
-                for trade in stockbal[stock]["history"]
-                if trade[0] > 0
-            ]
-            change = ((price / (sum(trades) / len(trades))) - 1) * 100
+            change = holding.change(price)
             color = "31" if change < 0 else "32"
 
             msg += (
-                f"[2;{color}m{stock + ':':<8} {stockbal[stock]['total']:<13.2f}"
+                f"[2;{color}m{stock + ':':<8} {holding.total:<13.2f}"
                 f"${price:<17.2f} {change:.2f}%\n[0m"
             )
 
-            net_value += stockbal[stock]["total"] * price
+            net_value += holding.total * price
 
         embed.description = f"```ansi\n{msg}\nNet Value: ${net_value:.2f}```"
         await ctx.send(embed=embed)
 
     @stock.command()
-    async def list(self, ctx):
-        """Shows the prices of stocks from the nasdaq api."""
-        messages = []
-        stocks = ""
-        for i, (stock, price) in enumerate(self.DB.stocks, start=1):
-            price = orjson.loads(price)["price"]
-
-            if not i % 3:
-                stocks += f"{stock.decode():}: ${float(price):.2f}\n"
-            else:
-                stocks += f"{stock.decode():}: ${float(price):.2f}\t".expandtabs()
-
-            if not i % 99:
-                messages.append(discord.Embed(description=f"```prolog\n{stocks}```"))
-                stocks = ""
-
-        if i % 99:
-            messages.append(discord.Embed(description=f"```prolog\n{stocks}```"))
-
-        paginator = pages.Paginator(pages=messages)
+    async def list(self, ctx, sort: str = None, prefix: str = ""):
+        """Shows the prices of stocks from the nasdaq api.
+
+        sort: str
+            price, change or cap to sort from highest to lowest.
+        prefix: str
+            Only shows symbols starting with this.
+        """
+        prices = await self.ADB.run(getattr, self.bot.valuation, "stocks")
+        indices = prices.select(sort and sort.lower(), prefix.upper())
+
+        paginator = LazyPaginator(ctx.author, *price_pages(prices, indices))
         await paginator.send(ctx)
 
     @stock.command(aliases=["h"])
@@ -299,17 +265,18 @@ class stocks(commands.Cog):
         member = member or ctx.author
 
         embed = discord.Embed(color=discord.Color.blurple())
-        stockbal = self.DB.get_stockbal(str(member.id).encode())
+        portfolios = self.DB.stock_portfolios
+        holdings = portfolios.get_all(member.id)
 
-        if not stockbal:
+        if not holdings:
             embed.description = "```You haven't invested.```"
             return await ctx.send(embed=embed)
 
         msg = ""
 
-        for stock_name, stock_data in stockbal.items():
+        for stock_name in holdings:
             msg += f"{stock_name}:\n"
-            for trade in stock_data["history"]:
+            for trade in portfolios.get_trades(member.id, stock_name, int(amount)):
                 if trade[0] < 0:
                     kind = "Sold"
                 else:
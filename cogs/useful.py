@@ -1,6 +1,5 @@
 import difflib
 import io
-import random
 import re
 import secrets
 import time
@@ -12,6 +11,8 @@ import lxml.html
 import orjson
 from discord.ext import commands
 
+from cogs.utils.cache import RandomPool
+
 STATUS_CODES = {
     "1": {
         "title": "1xx informational response",
@@ -208,7 +209,7 @@ class useful(commands.Cog):
         self.bot = bot
         self.DB = bot.DB
         self.loop = bot.loop
-        self.cache = {}
+        self.images = bot.cache.namespace("images", ttl=300, max_size=256)
 
     @commands.command()
     async def currency(self, ctx, *message):
@@ -716,24 +717,6 @@ class useful(commands.Cog):
 
         await ctx.send(embed=embed)
 
-    async def cache_check(self, search):
-        """Checks the cache for an search if found randomly return a result.
-
-        search: str
-        """
-        cache = self.bot.cache
-
-        if search in cache:
-            if not cache[search]:
-                return {}
-
-            url, title = random.choice(list(cache[search].items()))
-
-            cache[search].pop(url)
-
-            return url, title
-        return cache
-
     @commands.command()
     async def google(self, ctx, *, search):
         """Searchs and finds a random image from google.
@@ -744,10 +727,9 @@ class useful(commands.Cog):
         embed = discord.Embed(color=discord.Color.blurple())
 
         cache_search = f"google-{search.lower()}"
-        cache = await self.cache_check(cache_search)
 
-        if isinstance(cache, tuple):
-            url, title = cache
+        if image := self.images.take(cache_search):
+            url, title = image
             embed.set_image(url=url)
             embed.title = title
 
@@ -773,16 +755,16 @@ class useful(commands.Cog):
                 embed.color = discord.Color.dark_red()
                 return await ctx.send(embed=embed)
 
-            url, title = random.choice(list(images.items()))
-            images.pop(url)
+            images = RandomPool(images.items())
+            url, title = images.pop()
 
             embed.set_image(url=url)
             embed.title = title
 
             await ctx.send(embed=embed, view=DeleteButton(ctx.author))
 
-            cache[cache_search] = images
-            self.loop.call_later(300, self.bot.remove_from_cache, cache_search)
+            if images:
+                self.images.put(cache_search, images)
 
     @commands.command(aliases=["img"])
     async def image(self, ctx, *, search):
@@ -794,10 +776,9 @@ class useful(commands.Cog):
         embed = discord.Embed(color=discord.Color.blurple())
 
         cache_search = f"image-{search}"
-        cache = await self.cache_check(cache_search)
 
-        if isinstance(cache, tuple):
-            url, title = cache
+        if image := self.images.take(cache_search):
+            url, title = image
             embed.set_image(url=url)
             embed.title = title
 
@@ -822,16 +803,16 @@ class useful(commands.Cog):
                 embed.set_footer(text="Safe search is enabled.")
                 return await ctx.send(embed=embed)
 
-            url, title = random.choice(list(images.items()))
-            images.pop(url)
+            images = RandomPool(images.items())
+            url, title = images.pop()
 
             embed.set_image(url=url)
             embed.title = title
 
             await ctx.send(embed=embed, view=DeleteButton(ctx.author))
 
-            cache[cache_search] = images
-            self.loop.call_later(300, self.bot.remove_from_cache, cache_search)
+            if images:
+                self.images.put(cache_search, images)
 
 
 def setup(bot: commands.Bot) -> None:
@@ -0,0 +1,263 @@
+import gzip
+import os
+import re
+import struct
+import zlib
+
+MAGIC = b"SNAKEDB1"
+PUT, DELETE, END = 0, 1, 2
+
+# op, key length, value length
+RECORD = struct.Struct("<BII")
+# op, record count, crc32 of every record before it
+TRAILER = struct.Struct("<BQI")
+# key length, crc32 of the value
+MANIFEST = struct.Struct("<II")
+
+FILENAME = re.compile(r"(\d{6})\.(full|incr)\.gz")
+
+
+class BackupError(Exception):
+    pass
+
+
+class BackupWriter:
+    def __init__(self, path):
+        self.file = gzip.open(path, "wb")
+        self.file.write(MAGIC)
+        self.crc = 0
+        self.count = 0
+
+    def write(self, op, key, value=b""):
+        record = RECORD.pack(op, len(key), len(value)) + key + value
+        self.crc = zlib.crc32(record, self.crc)
+        self.count += 1
+        self.file.write(record)
+
+    def close(self):
+        self.file.write(TRAILER.pack(END, self.count, self.crc))
+        self.file.close()
+
+
+def read_records(path):
+    """Yields the (op, key, value) records of a backup file.
+
+    Raises BackupError if the file is corrupt, truncated or fails its
+    checksum. That can happen after records have been yielded, so records
+    should only be applied once the whole file has been read.
+
+    path: str
+    """
+    try:
+        yield from _read_records(path)
+    except (EOFError, OSError, struct.error, zlib.error) as e:
+        raise BackupError(f"{path} is corrupt: {e}") from e
+
+
+def _read_records(path):
+    with gzip.open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise BackupError(f"{path} is not a backup file")
+
+        crc = 0
+        count = 0
+
+        while header := file.read(RECORD.size):
+            if header[0] == END:
+                header += file.read(TRAILER.size - RECORD.size)
+                _, expected_count, expected_crc = TRAILER.unpack(header)
+
+                if (count, crc) != (expected_count, expected_crc):
+                    raise BackupError(f"{path} failed its checksum")
+                return
+
+            op, key_length, value_length = RECORD.unpack(header)
+            key = file.read(key_length)
+            value = file.read(value_length)
+
+            if len(key) != key_length or len(value) != value_length:
+                break
+
+            crc = zlib.crc32(header + key + value, crc)
+            count += 1
+            yield op, key, value
+
+    raise BackupError(f"{path} is truncated")
+
+
+def read_manifest(path):
+    """Yields the (key, crc32) pairs of a manifest in key order.
+
+    path: str
+    """
+    if not os.path.exists(path):
+        return
+
+    with gzip.open(path, "rb") as file:
+        while header := file.read(MANIFEST.size):
+            key_length, crc = MANIFEST.unpack(header)
+            yield file.read(key_length), crc
+
+
+class BackupEngine:
+    """Streams snapshots of the db to compressed, checksummed backup files.
+
+    Every full_every-th backup is a full one, the rest are incremental and
+    only hold the keys that changed since the previous backup. Changes are
+    found by merge joining the sorted snapshot against a manifest of the
+    (key, crc32) pairs of the last backup, so memory use doesn't grow with
+    the size of the db. Two chains of backups are kept.
+    """
+
+    def __init__(self, db, directory="backup", full_every=4, excluded=()):
+        self.db = db
+        self.directory = directory
+        self.full_every = full_every
+        self.excluded = excluded
+
+    @property
+    def manifest(self):
+        return os.path.join(self.directory, "manifest.gz")
+
+    def backups(self) -> list[tuple[int, str]]:
+        """Returns the (number, kind) of each backup file sorted by number."""
+        if not os.path.isdir(self.directory):
+            return []
+
+        backups = []
+        for name in os.listdir(self.directory):
+            if match := FILENAME.fullmatch(name):
+                backups.append((int(match[1]), match[2]))
+
+        return sorted(backups)
+
+    def path(self, number: int, kind: str) -> str:
+        return os.path.join(self.directory, f"{number:06d}.{kind}.gz")
+
+    def _included(self, key):
+        return key.split(b"-", 1)[0] not in self.excluded
+
+    def backup(self) -> str:
+        """Writes a backup and returns its path."""
+        os.makedirs(self.directory, exist_ok=True)
+
+        backups = self.backups()
+        number = backups[-1][0] + 1 if backups else 0
+        full = (
+            not backups
+            or number % self.full_every == 0
+            or not os.path.exists(self.manifest)
+        )
+
+        path = self.path(number, "full" if full else "incr")
+        snapshot = self.db.snapshot()
+
+        try:
+            self._write(snapshot, path + ".tmp", self.manifest + ".tmp", full)
+        finally:
+            snapshot.close()
+
+        os.replace(path + ".tmp", path)
+        os.replace(self.manifest + ".tmp", self.manifest)
+
+        if full:
+            self._prune(number)
+
+        return path
+
+    def _write(self, snapshot, path, manifest_path, full):
+        writer = BackupWriter(path)
+        previous = iter(() if full else read_manifest(self.manifest))
+        old_key, old_crc = next(previous, (None, 0))
+
+        with gzip.open(manifest_path, "wb") as manifest:
+            for key, value in snapshot.iterator():
+                if not self._included(key):
+                    continue
+
+                crc = zlib.crc32(value)
+                manifest.write(MANIFEST.pack(len(key), crc) + key)
+
+                # Keys in the old manifest that come before this one were deleted
+                while old_key is not None and old_key < key:
+                    writer.write(DELETE, old_key)
+                    old_key, old_crc = next(previous, (None, 0))
+
+                if old_key == key:
+                    changed = old_crc != crc
+                    old_key, old_crc = next(previous, (None, 0))
+                else:
+                    changed = True
+
+                if changed:
+                    writer.write(PUT, key, value)
+
+            while old_key is not None:
+                writer.write(DELETE, old_key)
+                old_key, old_crc = next(previous, (None, 0))
+
+        writer.close()
+
+    def _prune(self, number):
+        """Removes the backups from before the previous full backup."""
+        fulls = [n for n, kind in self.backups() if kind == "full" and n < number]
+
+        if not fulls:
+            return
+
+        for old, kind in self.backups():
+            if old < fulls[-1]:
+                os.remove(self.path(old, kind))
+
+    def chain(self, number: int = None) -> list[str]:
+        """Returns the paths needed to restore a backup in the order to apply them.
+
+        number: int
+            Defaults to the latest backup.
+        """
+        backups = [
+            backup for backup in self.backups() if number is None or backup[0] <= number
+        ]
+
+        if number is not None and (not backups or backups[-1][0] != number):
+            raise BackupError(f"Backup {number} not found")
+
+        for start in range(len(backups) - 1, -1, -1):
+            if backups[start][1] == "full":
+                return [self.path(*backup) for backup in backups[start:]]
+
+        raise BackupError("No full backup found")
+
+    def restore(self, number: int = None) -> int:
+        """Restores the db to a backup and returns the amount of records applied.
+
+        The whole restore is written as one write batch, so if a file turns
+        out to be corrupt or the restore is interrupted the db is left as it
+        was. Excluded keys are left untouched.
+
+        number: int
+            Defaults to the latest backup.
+        """
+        chain = self.chain(number)
+        applied = 0
+
+        # The manifest won't match the db after this so the next backup is a
+        # full one, even if the restore fails partway
+        if os.path.exists(self.manifest):
+            os.remove(self.manifest)
+
+        with self.db.write_batch(transaction=True) as wb:
+            for key in self.db.iterator(include_value=False):
+                if self._included(key):
+                    wb.delete(key)
+
+            # Later operations in a batch override earlier ones on the same key
+            for path in chain:
+                for op, key, value in read_records(path):
+                    if op == PUT:
+                        wb.put(key, value)
+                    else:
+                        wb.delete(key)
+                    applied += 1
+
+        return applied
@@ -0,0 +1,271 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """A dict bounded by the total size of its values.
+
+    Adding a value evicts the least recently used ones until the total
+    size is at most max_size. Sizes are measured with sizeof.
+    """
+
+    def __init__(self, max_size: int, sizeof=len):
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self.entries
+
+    def get(self, key, default=None):
+        """Returns a value and marks it as recently used.
+
+        key: Hashable
+        default: Any
+        """
+        if (entry := self.entries.get(key)) is None:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value):
+        """Adds a value, evicting the least recently used ones if needed.
+
+        Values bigger than max_size aren't cached at all.
+
+        key: Hashable
+        value: Any
+        """
+        self.pop(key)
+        size = self.sizeof(value)
+
+        if size > self.max_size:
+            return
+
+        self.entries[key] = (value, size)
+        self.size += size
+
+        while self.size > self.max_size:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.size -= evicted
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        """Removes a value and returns it.
+
+        key: Hashable
+        default: Any
+        """
+        if (entry := self.entries.pop(key, None)) is None:
+            return default
+
+        self.size -= entry[1]
+        return entry[0]
+
+    def resize(self, key):
+        """Measures a value again after it was changed in place.
+
+        key: Hashable
+        """
+        value, size = self.entries[key]
+        self.entries[key] = (value, new := self.sizeof(value))
+        self.size += new - size
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def hit_rate(self) -> float:
+        """Returns the fraction of gets that found a value."""
+        return self.hits / ((self.hits + self.misses) or 1)
+
+
+class TTLCache(LRUCache):
+    """An LRUCache whose values expire ttl seconds after being added.
+
+    Expired values are dropped when they are looked up or reach the least
+    recently used end, so no timers are needed. By default the size of
+    every value is 1, making max_size a cap on the number of entries.
+    """
+
+    def __init__(self, max_size: int, ttl: float, sizeof=lambda value: 1):
+        super().__init__(max_size, lambda entry: sizeof(entry[1]))
+        self.ttl = ttl
+        self.expired = 0
+
+    def _expired(self, key) -> bool:
+        if (entry := self.entries.get(key)) is None:
+            return False
+
+        if entry[0][0] > time.monotonic():
+            return False
+
+        self.pop(key)
+        self.expired += 1
+        return True
+
+    def get(self, key, default=None):
+        """Returns a value that hasn't expired and marks it as recently used.
+
+        key: Hashable
+        default: Any
+        """
+        self._expired(key)
+
+        if (entry := super().get(key)) is None:
+            return default
+
+        return entry[1]
+
+    def put(self, key, value):
+        """Adds a value that expires after ttl seconds.
+
+        key: Hashable
+        value: Any
+        """
+        while self.entries and self._expired(next(iter(self.entries))):
+            pass
+
+        super().put(key, (time.monotonic() + self.ttl, value))
+
+    def pop(self, key, default=None):
+        """Removes a value and returns it.
+
+        key: Hashable
+        default: Any
+        """
+        if (entry := super().pop(key)) is None:
+            return default
+
+        return entry[1]
+
+    def take(self, key):
+        """Removes and returns one item from a cached list or RandomPool.
+
+        The key is removed once it has no items left.
+
+        key: Hashable
+        """
+        if not (items := self.get(key)):
+            return None
+
+        item = items.pop()
+
+        if not items:
+            self.pop(key)
+        else:
+            self.resize(key)
+
+        return item
+
+    def expire(self):
+        """Removes every expired value."""
+        for key in list(self.entries):
+            self._expired(key)
+
+
+class RandomPool:
+    """A list that pops a random item in O(1) by swapping it with the last."""
+
+    def __init__(self, items=()):
+        self.items = list(items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def pop(self):
+        """Removes and returns a random item."""
+        items = self.items
+        index = random.randrange(len(items))
+        items[index], items[-1] = items[-1], items[index]
+        return items.pop()
+
+
+class Cache:
+    """The named caches of the bot, kept in one place for the cache commands."""
+
+    def __init__(self):
+        self.namespaces = {}
+
+    def __iter__(self):
+        return iter(self.namespaces.items())
+
+    def add(self, name: str, cache: LRUCache) -> LRUCache:
+        """Registers a cache under a name, keeping an existing one on reloads.
+
+        name: str
+        cache: LRUCache
+        """
+        return self.namespaces.setdefault(name, cache)
+
+    def namespace(self, name: str, ttl: float, max_size: int, sizeof=lambda value: 1):
+        """Returns the TTLCache with a name, creating it if needed.
+
+        name: str
+        ttl: float
+        max_size: int
+        sizeof: Callable[[Any], int]
+        """
+        if name not in self.namespaces:
+            self.namespaces[name] = TTLCache(max_size, ttl, sizeof)
+
+        return self.namespaces[name]
+
+    def clear(self):
+        for cache in self.namespaces.values():
+            cache.clear()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one.
+
+    While a call for a key is running, other callers with that key await
+    its result instead of making the call again. If every caller is
+    cancelled the call is cancelled too, so an abandoned request doesn't
+    keep running until it times out.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.waiting = {}
+
+    def _done(self, key, future):
+        if self.calls.get(key) is future:
+            del self.calls[key]
+
+    async def do(self, key, func, *args):
+        """Returns the result of func(*args), sharing it with concurrent callers.
+
+        key: Hashable
+        func: Callable[..., Awaitable]
+        """
+        if (future := self.calls.get(key)) is None:
+            future = self.calls[key] = asyncio.ensure_future(func(*args))
+            future.add_done_callback(lambda _: self._done(key, future))
+
+        self.waiting[future] = self.waiting.get(future, 0) + 1
+
+        try:
+            # Shielded so one caller being cancelled doesn't cancel the others
+            return await asyncio.shield(future)
+        finally:
+            self.waiting[future] -= 1
+
+            if not self.waiting[future]:
+                del self.waiting[future]
+
+                if not future.done():
+                    self._done(key, future)
+                    future.cancel()
@@ -1,9 +1,23 @@
+import asyncio
+import functools
+import operator
 import pathlib
+import struct
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
+from itertools import islice
 
 import orjson
 import plyvel
 
+from cogs.utils.backup import BackupEngine
+from cogs.utils.history import PriceHistory
+from cogs.utils.invites import InviteTracker
+from cogs.utils.leaderboard import BaseLeaderboard, Leaderboard, RateLeaderboard
+from cogs.utils.portfolio import Portfolios
+from cogs.utils.ringlog import RingLog
+from cogs.utils.spam import Thresholds
+
 prefixed_dbs = (
     "infractions",
     "karma",
@@ -23,9 +37,646 @@ prefixed_dbs = (
     "cookies",
     "reminders",
     "trivia_wins",
+    "stock_ticks",
+    "crypto_ticks",
+    "stock_holdings",
+    "stock_trades",
+    "crypto_holdings",
+    "crypto_trades",
+    "polls",
+    "emoji_submissions",
+)
+
+# Prefixes whose values are packed binary instead of text or json
+BINARY_PREFIXES = (
+    b"message_count",
+    b"karma",
+    b"trivia_wins",
+    b"stock_ticks",
+    b"crypto_ticks",
+    b"stock_holdings",
+    b"stock_trades",
+    b"crypto_holdings",
+    b"crypto_trades",
 )
 
 
+def is_binary(key: bytes) -> bool:
+    """Returns whether the value of a key is packed binary.
+
+    key: bytes
+    """
+    return key.split(b"-", 1)[0] in BINARY_PREFIXES
+
+
+class BufferedCounter:
+    """Accumulates increments in memory and writes them to a db in batches.
+
+    Counts are stored as one little endian int64 per field, so flushing is
+    a fixed width merge rather than parsing and formatting text. Reads
+    merge the pending increments with the stored counts so they are always
+    exact even before a flush. Single field counters read as ints and
+    multi field counters as tuples.
+    """
+
+    def __init__(self, db, fields: int = 1):
+        self.db = db
+        self.fields = fields
+        self.struct = struct.Struct(f"<{fields}q")
+        self.empty = 0 if fields == 1 else (0,) * fields
+        self.pending = {}
+
+    def decode(self, value: bytes):
+        counts = self.struct.unpack(value)
+        return counts[0] if self.fields == 1 else counts
+
+    def encode(self, counts) -> bytes:
+        if self.fields == 1:
+            return self.struct.pack(counts)
+        return self.struct.pack(*counts)
+
+    def parse(self, value: bytes) -> bytes:
+        """Encodes counts written as decimal text with : between fields.
+
+        value: bytes
+        """
+        try:
+            return self.struct.pack(*map(int, value.decode().split(":")))
+        except (ValueError, struct.error) as e:
+            raise ValueError("Counters are integers separated by :") from e
+
+    def _add(self, counts, amounts):
+        if self.fields == 1:
+            return counts + amounts
+        return tuple(map(operator.add, counts, amounts))
+
+    def increment(self, key: bytes, *amounts: int):
+        """Adds amounts to the fields of a counter without touching the db.
+
+        key: bytes
+        amounts: int
+            One per field, defaults to adding 1 to a single field counter.
+        """
+        amounts = amounts or (1,)
+        amount = amounts[0] if self.fields == 1 else amounts
+        self.pending[key] = self._add(self.pending.get(key, self.empty), amount)
+
+    def get(self, key: bytes):
+        """Returns the current count of a key.
+
+        key: bytes
+        """
+        count = self.db.get(key)
+        count = self.decode(count) if count else self.empty
+        return self._add(count, self.pending.get(key, self.empty))
+
+    def iterator(self, prefix: bytes = b""):
+        """Returns an iterator of (key, count) pairs for keys starting with a prefix.
+
+        The pending increments are copied straight away so the iterator can
+        safely be consumed from another thread.
+
+        prefix: bytes
+        """
+        pending = {
+            key: amount
+            for key, amount in self.pending.items()
+            if key.startswith(prefix)
+        }
+        return self._merge(self.db.iterator(prefix=prefix), pending)
+
+    def _merge(self, iterator, pending):
+        for key, count in iterator:
+            count = self.decode(count)
+            if key in pending:
+                count = self._add(count, pending.pop(key))
+            yield key, count
+
+        yield from pending.items()
+
+    def flush(self):
+        """Writes all pending increments to the db in one write batch."""
+        if not self.pending:
+            return
+
+        pending, self.pending = self.pending, {}
+
+        with self.db.write_batch() as wb:
+            for key, amounts in pending.items():
+                count = self.db.get(key)
+
+                if count:
+                    amounts = self._add(self.decode(count), amounts)
+
+                wb.put(key, self.encode(amounts))
+
+    def migrate(self):
+        """Converts counts stored as decimal text with : between fields."""
+        with self.db.write_batch() as wb:
+            for key, value in self.db:
+                wb.put(key, self.parse(value))
+
+
+class GuildSettings:
+    """A read-through cache of decoded per guild settings.
+
+    Values are decoded once and kept until they are changed through one of
+    the setters or invalidated.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.cache = {}
+
+    def _get(self, key: bytes, decode=None):
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+
+        value = self.db.get(key)
+
+        if value is not None and decode:
+            value = decode(value)
+
+        self.cache[key] = value
+        return value
+
+    def _put(self, key: bytes, value: bytes):
+        self.db.put(key, value)
+        self.cache.pop(key, None)
+
+    def _delete(self, key: bytes):
+        self.db.delete(key)
+        self.cache[key] = None
+
+    def invalidate(self, key: bytes):
+        """Removes a key from the cache so it is read from the db again.
+
+        key: bytes
+        """
+        self.cache.pop(key, None)
+
+    def prefix(self, guild_id: int) -> str | None:
+        """Returns the custom prefix of a guild.
+
+        guild_id: int
+        """
+        return self._get(f"{guild_id}-prefix".encode(), bytes.decode)
+
+    def set_prefix(self, guild_id: int, prefix: str):
+        """Sets the custom prefix of a guild.
+
+        guild_id: int
+        prefix: str
+        """
+        self._put(f"{guild_id}-prefix".encode(), prefix.encode())
+
+    def logging_disabled(self, guild_id: int) -> bool:
+        """Returns whether logging to the logs channel is disabled.
+
+        guild_id: int
+        """
+        return bool(self._get(f"{guild_id}-logging".encode()))
+
+    def toggle_logging(self, guild_id: int) -> bool:
+        """Toggles logging and returns whether it is now disabled.
+
+        guild_id: int
+        """
+        key = f"{guild_id}-logging".encode()
+
+        if self.logging_disabled(guild_id):
+            self._delete(key)
+            return False
+
+        self._put(key, b"1")
+        return True
+
+    def disabled_channels(self, guild_id: int) -> frozenset:
+        """Returns the ids of channels where commands are disabled.
+
+        guild_id: int
+        """
+        channels = self._get(
+            f"{guild_id}-disabled_channels".encode(),
+            lambda value: frozenset(orjson.loads(value)),
+        )
+        return channels or frozenset()
+
+    def toggle_channel(self, guild_id: int, channel_id: int) -> bool:
+        """Toggles commands in a channel and returns whether they are now disabled.
+
+        guild_id: int
+        channel_id: int
+        """
+        disabled = set(self.disabled_channels(guild_id))
+
+        if channel_id in disabled:
+            disabled.remove(channel_id)
+            state = False
+        else:
+            disabled.add(channel_id)
+            state = True
+
+        self._put(
+            f"{guild_id}-disabled_channels".encode(), orjson.dumps(list(disabled))
+        )
+        return state
+
+    def log_channel(self, guild_id: int) -> int | None:
+        """Returns the id of the channel set as a guilds logs channel.
+
+        guild_id: int
+        """
+        return self._get(f"{guild_id}-log_channel".encode(), int)
+
+    def set_log_channel(self, guild_id: int, channel_id: int = None):
+        """Sets the logs channel of a guild or unsets it with None.
+
+        guild_id: int
+        channel_id: int
+        """
+        key = f"{guild_id}-log_channel".encode()
+
+        if channel_id is None:
+            self._delete(key)
+        else:
+            self._put(key, str(channel_id).encode())
+
+    def command_disabled(self, guild_id: int, command: str) -> bool:
+        """Returns whether a command is disabled in a guild.
+
+        guild_id: int
+        command: str
+        """
+        return bool(self._get(f"{guild_id}-t-{command}".encode()))
+
+    def toggle_command(self, guild_id: int, command: str) -> bool:
+        """Toggles a command and returns whether it is now disabled.
+
+        guild_id: int
+        command: str
+        """
+        key = f"{guild_id}-t-{command}".encode()
+
+        if self.command_disabled(guild_id, command):
+            self._delete(key)
+            return False
+
+        self._put(key, b"1")
+        return True
+
+    def anti_spam(self, guild_id: int) -> bool:
+        """Returns whether anti spam is turned on in a guild.
+
+        guild_id: int
+        """
+        return self.spam_thresholds(guild_id) is not None
+
+    def spam_thresholds(self, guild_id: int) -> Thresholds | None:
+        """Returns the spam thresholds of a guild or None if anti spam is off.
+
+        guild_id: int
+        """
+        return self._get(f"anti_spam-{guild_id}".encode(), Thresholds.decode)
+
+    def set_spam_threshold(self, guild_id: int, kind: str, limit: int, seconds: float):
+        """Changes one of the spam thresholds of a guild, turning anti spam on.
+
+        guild_id: int
+        kind: str
+            user, content or mentions.
+        limit: int
+        seconds: float
+        """
+        thresholds = self.spam_thresholds(guild_id) or Thresholds()
+        thresholds = thresholds._replace(**{kind: (limit, seconds)})
+        self._put(f"anti_spam-{guild_id}".encode(), thresholds.encode())
+
+    def toggle_anti_spam(self, guild_id: int) -> bool:
+        """Toggles anti spam and returns whether it is now on.
+
+        guild_id: int
+        """
+        key = f"anti_spam-{guild_id}".encode()
+
+        if self.anti_spam(guild_id):
+            self._delete(key)
+            return False
+
+        self._put(key, b"1")
+        return True
+
+
+class Blacklist:
+    """An in-memory index of blacklisted and downvoted members.
+
+    Every entry is loaded at startup so checking a member who isn't on it,
+    which is almost every check, never touches the db. States are b"1" for
+    downvoted and b"2" for blacklisted.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.load()
+
+    def load(self):
+        """Loads every entry from the db."""
+        self.members = {}
+        self.guilds = {}
+
+        for key, state in self.db:
+            guild_id, _, member_id = key.decode().rpartition("-")
+
+            if guild_id:
+                self.guilds.setdefault(int(guild_id), {})[int(member_id)] = state
+            else:
+                self.members[int(member_id)] = state
+
+    def _key(self, member_id, guild_id):
+        if guild_id:
+            return f"{guild_id}-{member_id}".encode()
+        return str(member_id).encode()
+
+    def get(self, member_id: int, guild_id: int = None) -> bytes | None:
+        """Returns the state of a member, checking the global list first.
+
+        member_id: int
+        guild_id: int
+        """
+        if state := self.members.get(member_id):
+            return state
+
+        if guild_id and (guild := self.guilds.get(guild_id)):
+            return guild.get(member_id)
+
+    def get_exact(self, member_id: int, guild_id: int = None) -> bytes | None:
+        """Returns the state of a member only in a guild or only globally.
+
+        member_id: int
+        guild_id: int
+        """
+        if guild_id:
+            return self.guilds.get(guild_id, {}).get(member_id)
+        return self.members.get(member_id)
+
+    def put(self, member_id: int, state: bytes, guild_id: int = None):
+        """Adds a member to the global list or a guilds list.
+
+        member_id: int
+        state: bytes
+        guild_id: int
+        """
+        self.db.put(self._key(member_id, guild_id), state)
+
+        if guild_id:
+            self.guilds.setdefault(guild_id, {})[member_id] = state
+        else:
+            self.members[member_id] = state
+
+    def delete(self, member_id: int, guild_id: int = None):
+        """Removes a member from the global list or a guilds list.
+
+        member_id: int
+        guild_id: int
+        """
+        self.db.delete(self._key(member_id, guild_id))
+
+        if not guild_id:
+            self.members.pop(member_id, None)
+        elif guild := self.guilds.get(guild_id):
+            guild.pop(member_id, None)
+
+            if not guild:
+                del self.guilds[guild_id]
+
+    def entries(self):
+        """Yields (guild_id, member_id, state) with a guild_id of None for
+        global entries."""
+        for member_id, state in self.members.items():
+            yield None, member_id, state
+
+        for guild_id, members in self.guilds.items():
+            for member_id, state in members.items():
+                yield guild_id, member_id, state
+
+
+class AppendList:
+    """A list stored as one orjson encoded element per key under a prefix.
+
+    Elements are keyed by a zero padded sequence number and the first and
+    next numbers are kept in memory, so appending and indexing are a single
+    put or get instead of rewriting a json array.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.load()
+
+    def load(self):
+        """Finds the first and next sequence numbers in the db."""
+        first = next(self.db.iterator(include_value=False), None)
+        last = next(self.db.iterator(include_value=False, reverse=True), None)
+
+        self.start = int(first) if first else 0
+        self.end = int(last) + 1 if last else 0
+
+    @staticmethod
+    def _key(number: int) -> bytes:
+        return b"%010d" % number
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def _number(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError("AppendList index out of range")
+
+        return self.start + index
+
+    def __getitem__(self, index: int):
+        return orjson.loads(self.db.get(self._key(self._number(index))))
+
+    def __iter__(self):
+        for _, value in self.db:
+            yield orjson.loads(value)
+
+    def append(self, value):
+        """Appends a value and returns the new length.
+
+        value: Any
+            Anything orjson can encode.
+        """
+        self.db.put(self._key(self.end), orjson.dumps(value))
+        self.end += 1
+        return len(self)
+
+    def tail(self, amount: int) -> list:
+        """Returns the last amount of values in order.
+
+        amount: int
+        """
+        values = [
+            orjson.loads(value)
+            for _, value in islice(self.db.iterator(reverse=True), amount)
+        ]
+        values.reverse()
+        return values
+
+    def pop(self, index: int):
+        """Removes and returns the value at an index.
+
+        Values after it are moved down by one, so this is O(n - index).
+
+        index: int
+        """
+        number = self._number(index)
+        value = self[index]
+
+        with self.db.write_batch() as wb:
+            following = self.db.iterator(start=self._key(number + 1))
+            for key, data in following:
+                wb.put(self._key(int(key) - 1), data)
+            wb.delete(self._key(self.end - 1))
+
+        self.end -= 1
+        return value
+
+    def trim(self, amount: int):
+        """Removes the oldest values so at most amount are left.
+
+        amount: int
+        """
+        if len(self) <= amount:
+            return
+
+        start = self.end - amount
+
+        with self.db.write_batch() as wb:
+            for number in range(self.start, start):
+                wb.delete(self._key(number))
+
+        self.start = start
+
+    def migrate(self, main, key: bytes):
+        """Moves the values of a json array blob into the list.
+
+        main: plyvel.DB
+        key: bytes
+        """
+        if (data := main.get(key)) is None:
+            return
+
+        with self.db.write_batch() as wb:
+            for value in orjson.loads(data):
+                wb.put(self._key(self.end), orjson.dumps(value))
+                self.end += 1
+
+        main.delete(key)
+
+
+class Polls:
+    """Keeps running polls in memory with one db key per poll.
+
+    Votes only change the in-memory tallies and mark the poll as dirty, the
+    dirty polls are then written in one batch by flush.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.load()
+
+    def load(self):
+        """Loads every running poll from the db."""
+        self.polls = {}
+        self.dirty = set()
+
+        for key, data in self.db:
+            guild_id, message_id = map(int, key.split(b"-"))
+            self.polls[guild_id, message_id] = orjson.loads(data)
+
+    @staticmethod
+    def _key(guild_id, message_id):
+        return f"{guild_id}-{message_id}".encode()
+
+    def start(
+        self,
+        guild_id: int,
+        channel_id: int,
+        message_id: int,
+        options: dict[str, str],
+        ends: float,
+    ):
+        """Starts a poll.
+
+        guild_id: int
+        channel_id: int
+        message_id: int
+        options: dict[str, str]
+            Maps option emojis to their names.
+        ends: float
+            When the poll ends as a unix timestamp.
+        """
+        poll = {
+            "channel": channel_id,
+            "ends": ends,
+            "options": {
+                emoji: {"name": name, "count": 0} for emoji, name in options.items()
+            },
+        }
+        self.polls[guild_id, message_id] = poll
+        self.db.put(self._key(guild_id, message_id), orjson.dumps(poll))
+
+    def get(self, guild_id: int, message_id: int) -> dict | None:
+        return self.polls.get((guild_id, message_id))
+
+    def vote(self, guild_id: int, message_id: int, emoji: str) -> bool:
+        """Counts a vote and returns whether it was for an option of a poll.
+
+        guild_id: int
+        message_id: int
+        emoji: str
+        """
+        poll = self.polls.get((guild_id, message_id))
+
+        if not poll or emoji not in poll["options"]:
+            return False
+
+        poll["options"][emoji]["count"] += 1
+        self.dirty.add((guild_id, message_id))
+        return True
+
+    def end(self, guild_id: int, message_id: int) -> dict | None:
+        """Removes a poll and returns it.
+
+        guild_id: int
+        message_id: int
+        """
+        poll = self.polls.pop((guild_id, message_id), None)
+
+        if poll:
+            self.dirty.discard((guild_id, message_id))
+            self.db.delete(self._key(guild_id, message_id))
+
+        return poll
+
+    def flush(self):
+        """Writes the tallies of polls voted on since the last flush."""
+        if not self.dirty:
+            return
+
+        dirty, self.dirty = self.dirty, set()
+
+        with self.db.write_batch() as wb:
+            for guild_id, message_id in dirty:
+                if poll := self.polls.get((guild_id, message_id)):
+                    wb.put(self._key(guild_id, message_id), orjson.dumps(poll))
+
+
 class Database:
     def __init__(self):
         self.main = plyvel.DB(
@@ -34,32 +685,264 @@ class Database:
         for db in prefixed_dbs:
             setattr(self, db, self.main.prefixed_db(f"{db}-".encode()))
 
+        self.message_counter = BufferedCounter(self.message_count)
+        self.karma_counter = BufferedCounter(self.karma)
+        self.trivia_counter = BufferedCounter(self.trivia_wins, fields=2)
+        self.counters = {
+            b"message_count": self.message_counter,
+            b"karma": self.karma_counter,
+            b"trivia_wins": self.trivia_counter,
+        }
+        self.migrate_counters()
+        self.settings = GuildSettings(self.main)
+        self.blacklist_index = Blacklist(self.blacklist)
+        self.poll_index = Polls(self.polls)
+        # Polls used to be a single json blob which was wiped on every start
+        self.main.delete(b"polls")
+        self.invite_tracker = InviteTracker(self.invites)
+
+        self.leaderboards = {
+            "bal": Leaderboard(),
+            "karma": Leaderboard(),
+            "cookies": RateLeaderboard(),
+        }
+        self.message_leaderboards = {}
+
+        self.stock_history = PriceHistory(self.stock_ticks)
+        self.crypto_history = PriceHistory(self.crypto_ticks)
+
+        self.stock_portfolios = Portfolios(self.stock_holdings, self.stock_trades)
+        self.crypto_portfolios = Portfolios(self.crypto_holdings, self.crypto_trades)
+        self.migrate_portfolios()
+
+        self.deleted_log = RingLog(self.deleted)
+        self.edited_log = RingLog(self.edited)
+        self.migrate_message_logs()
+
+        self.justins_messages = AppendList(self.main.prefixed_db(b"justins-messages-"))
+        self.boot_times = AppendList(self.main.prefixed_db(b"boot_times-"))
+        self.migrate_lists()
+
+        # Data that is refetched by the background tasks isn't backed up
+        self.backups = BackupEngine(
+            self.main,
+            excluded=(
+                b"crypto",
+                b"stocks",
+                b"boot_times",
+                b"tiolanguages",
+                b"helloworlds",
+                b"docs",
+            ),
+        )
+
+    def migrate_portfolios(self):
+        """Converts the json stockbal and cryptobal portfolios to binary
+        holdings the first time the bot starts after the change."""
+        if self.main.get(b"portfolio_version") == b"1":
+            return
+
+        self.stock_portfolios.migrate(self.stockbal)
+        self.crypto_portfolios.migrate(self.cryptobal)
+        self.main.put(b"portfolio_version", b"1")
+
+    def migrate_counters(self):
+        """Converts the decimal text counters to binary int64 fields the
+        first time the bot starts after the change."""
+        if self.main.get(b"counter_version") == b"1":
+            return
+
+        self.message_counter.migrate()
+        self.karma_counter.migrate()
+        self.trivia_counter.migrate()
+        self.main.put(b"counter_version", b"1")
+
+    def migrate_message_logs(self):
+        """Splits the json deleted and edited message histories into ring log
+        entries the first time the bot starts after the change."""
+        if self.main.get(b"message_log_version") == b"1":
+            return
+
+        self.deleted_log.migrate()
+        self.edited_log.migrate()
+        self.main.put(b"message_log_version", b"1")
+
+    def migrate_lists(self):
+        """Splits the json array blobs into append lists the first time the
+        bot starts after the change."""
+        if self.main.get(b"list_version") == b"1":
+            return
+
+        self.justins_messages.migrate(self.main, b"justins-messages")
+        self.boot_times.migrate(self.main, b"boot_times")
+
+        for key in self.main.iterator(include_value=False):
+            if key.endswith(b"-rules") and key[:-6].isdigit():
+                self.rules(int(key[:-6])).migrate(self.main, key)
+
+        emojis = self.main.get(b"emoji_submissions")
+        if emojis:
+            for message_id, emoji in orjson.loads(emojis).items():
+                self.emoji_submissions.put(message_id.encode(), orjson.dumps(emoji))
+            self.main.delete(b"emoji_submissions")
+
+        self.main.put(b"list_version", b"1")
+
+    def rules(self, guild_id: int) -> AppendList:
+        """Returns the rules of a guild.
+
+        guild_id: int
+        """
+        return AppendList(self.main.prefixed_db(f"{guild_id}-rules-".encode()))
+
+    def flush(self):
+        """Writes any buffered changes to the db."""
+        self.message_counter.flush()
+        self.karma_counter.flush()
+        self.trivia_counter.flush()
+        self.poll_index.flush()
+        self.invite_tracker.flush()
+
+    def reset_caches(self):
+        """Drops everything cached from the db after it was changed externally."""
+        self.settings.cache.clear()
+        self.blacklist_index.load()
+        self.poll_index.load()
+        self.invite_tracker.load()
+        self.justins_messages.load()
+        self.boot_times.load()
+        self.deleted_log.counts.clear()
+        self.edited_log.counts.clear()
+        self.message_leaderboards.clear()
+
+        for name, board in self.leaderboards.items():
+            self.leaderboards[name] = type(board)()
+
+    def edit(self, key: bytes, value: bytes = None):
+        """Puts or deletes a key by hand, keeping the in memory state in sync.
+
+        Counters are written as decimal text with : between fields, the
+        other binary values can't be written as text.
+
+        key: bytes
+        value: bytes
+            Deletes the key when None.
+        """
+        prefix = key.split(b"-", 1)[0]
+
+        if value is not None and prefix in self.counters:
+            value = self.counters[prefix].parse(value)
+        elif value is not None and prefix in BINARY_PREFIXES:
+            raise ValueError(f"{prefix.decode()} values are binary")
+
+        # Otherwise buffered changes would overwrite the edit on their next flush
+        if prefix in self.counters:
+            self.counters[prefix].flush()
+        elif prefix == b"polls":
+            self.poll_index.flush()
+        elif prefix == b"invites":
+            self.invite_tracker.flush()
+
+        if value is None:
+            self.main.delete(key)
+        else:
+            self.main.put(key, value)
+
+        self.invalidate(key)
+
+    def invalidate(self, key: bytes):
+        """Drops whatever is cached from a key after it was changed externally.
+
+        key: bytes
+        """
+        prefix = key.split(b"-", 1)[0]
+        self.settings.invalidate(key)
+
+        if prefix == b"blacklist":
+            self.blacklist_index.load()
+        elif prefix == b"polls":
+            self.poll_index.load()
+        elif prefix == b"invites":
+            self.invite_tracker.load()
+        elif prefix == b"justins":
+            self.justins_messages.load()
+        elif prefix == b"boot_times":
+            self.boot_times.load()
+        elif prefix == b"deleted":
+            self.deleted_log.counts.clear()
+        elif prefix == b"edited":
+            self.edited_log.counts.clear()
+        elif prefix == b"message_count":
+            self.message_leaderboards.clear()
+        elif (name := prefix.decode()) in self.leaderboards:
+            self.leaderboards[name] = type(self.leaderboards[name])()
+
+    def get_leaderboard(self, name: str, guild_id: int = None) -> BaseLeaderboard:
+        """Returns a leaderboard which may still need to be loaded.
+
+        Message count leaderboards are per guild and only kept for guilds
+        where they have been used.
+
+        name: str
+        guild_id: int
+        """
+        if name == "message_count":
+            return self.message_leaderboards.setdefault(guild_id, Leaderboard())
+        return self.leaderboards[name]
+
+    def leaderboard_entries(self, name: str, guild_id: int = None):
+        """Returns an iterator of the (member_id, score) pairs of a leaderboard.
+
+        The db snapshot is taken straight away so the iterator can be consumed
+        from another thread.
+
+        name: str
+        guild_id: int
+        """
+        if name == "message_count":
+            counts = self.message_counter.iterator(prefix=f"{guild_id}-".encode())
+            return ((int(key.split(b"-")[1]), count) for key, count in counts)
+
+        if name == "karma":
+            counts = self.karma_counter.iterator()
+            return ((int(member_id), count) for member_id, count in counts)
+
+        if name == "cookies":
+            return (
+                (int(member_id), self.cookie_rate(orjson.loads(data)))
+                for member_id, data in self.cookies.iterator()
+            )
+
+        return (
+            (int(member_id), float(value)) for member_id, value in self.bal.iterator()
+        )
+
+    def add_message(self, guild_id: int, member_id: int):
+        """Counts a message sent by a member in a guild.
+
+        guild_id: int
+        member_id: int
+        """
+        self.message_counter.increment(f"{guild_id}-{member_id}".encode())
+
+        if board := self.message_leaderboards.get(guild_id):
+            board.add(member_id, 1)
+
     def add_karma(self, member_id: int, amount: int):
         """Adds or removes an amount from a members karma.
 
         member_id: int
         amount: int
         """
-        member_id = str(member_id).encode()
-        member_karma = self.karma.get(member_id)
-
-        if not member_karma:
-            member_karma = amount
-        else:
-            member_karma = int(member_karma) + amount
-
-        self.karma.put(member_id, str(member_karma).encode())
+        self.karma_counter.increment(str(member_id).encode(), amount)
+        self.leaderboards["karma"].add(member_id, amount)
 
     def get_blacklist(self, member_id, guild=None):
         """Returns whether someone is blacklisted.
 
         member_id: int
         """
-        if state := self.blacklist.get(str(member_id).encode()):
-            return state
-
-        if guild and (state := self.blacklist.get(f"{guild}-{member_id}".encode())):
-            return state
+        return self.blacklist_index.get(member_id, guild)
 
     def get_bal(self, member_id: bytes) -> Decimal:
         """Gets the balance of an member.
@@ -81,6 +964,7 @@ class Database:
         """
         balance_bytes = f"{balance:50f}".rstrip("0").lstrip(" ").encode()
         self.bal.put(member_id, balance_bytes or b"0.0")
+        self.leaderboards["bal"].update(int(member_id), float(balance))
         return balance
 
     def add_bal(self, member_id: bytes, amount: float):
@@ -93,6 +977,27 @@ class Database:
             raise ValueError("You can't pay a negative amount")
         return self.put_bal(member_id, self.get_bal(member_id) + Decimal(amount))
 
+    @staticmethod
+    def cookie_rate(data: dict) -> tuple[float, float]:
+        """Returns the cookies of a member as (base, rate) where the amount
+        at a time is base + rate * time.
+
+        data: dict
+        """
+        cps = data.get("cps", 0)
+        if not cps:
+            return data["cookies"], 0
+        return data["cookies"] - data["start"] * cps, cps
+
+    def put_cookies(self, member_id: bytes, data: dict):
+        """Sets a members cookie clicker data.
+
+        member_id: bytes
+        data: dict
+        """
+        self.cookies.put(member_id, orjson.dumps(data))
+        self.leaderboards["cookies"].update(int(member_id), self.cookie_rate(data))
+
     def get_stock(self, symbol: bytes):
         """Returns the data of a stock.
 
@@ -112,25 +1017,6 @@ class Database:
         """
         self.stocks.put(symbol.encode(), orjson.dumps(data))
 
-    def get_stockbal(self, member_id: bytes) -> dict | None:
-        """Returns a members stockbal.
-
-        member_id: bytes
-        """
-        data = self.stockbal.get(member_id)
-
-        if data:
-            return orjson.loads(data)
-        return None
-
-    def put_stockbal(self, member_id: bytes, data: dict):
-        """Sets a members stockbal.
-
-        member_id: bytes
-        data: dict
-        """
-        self.stockbal.put(member_id, orjson.dumps(data))
-
     def get_crypto(self, symbol: bytes) -> dict | None:
         """Returns the data of a crypto.
 
@@ -151,21 +1037,128 @@ class Database:
         data = orjson.dumps(data)
         self.crypto.put(symbol.encode(), data)
 
-    def get_cryptobal(self, member_id):
-        """Returns a members cryptobal.
 
-        member_id: bytes
+class AsyncDatabase:
+    """Runs blocking db calls on a small dedicated thread pool.
+
+    Point lookups are fast enough to do inline, this is for scans and
+    large writes that would otherwise stall the event loop.
+    """
+
+    def __init__(self, database: Database, workers: int = 2):
+        self.DB = database
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="database"
+        )
+        self.loading_boards = {}
+
+    async def run(self, func, *args, **kwargs):
+        """Runs a function in the db thread pool and returns the result.
+
+        func: Callable
         """
-        data = self.cryptobal.get(member_id)
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
 
-        if data:
-            return orjson.loads(data)
-        return {}
+    async def get(self, key: bytes, db=None) -> bytes | None:
+        """Gets a value from a db, defaulting to the main db.
 
-    def put_cryptobal(self, member_id, data):
-        """Sets a members cryptobal.
+        key: bytes
+        db: plyvel.DB | plyvel.PrefixedDB
+        """
+        return await self.run((db or self.DB.main).get, key)
 
-        member_id: bytes
-        data: dict
+    async def put(self, key: bytes, value: bytes, db=None):
+        """Puts a value in a db, defaulting to the main db.
+
+        key: bytes
+        value: bytes
+        db: plyvel.DB | plyvel.PrefixedDB
+        """
+        await self.run((db or self.DB.main).put, key, value)
+
+    async def delete(self, key: bytes, db=None):
+        """Deletes a key from a db, defaulting to the main db.
+
+        key: bytes
+        db: plyvel.DB | plyvel.PrefixedDB
         """
-        self.cryptobal.put(member_id, orjson.dumps(data))
+        await self.run((db or self.DB.main).delete, key)
+
+    async def batch(self, items, db=None):
+        """Writes (key, value) pairs in one write batch.
+
+        A value of None deletes the key.
+
+        items: Iterable[tuple[bytes, bytes | None]]
+        db: plyvel.DB | plyvel.PrefixedDB
+        """
+
+        def write():
+            with (db or self.DB.main).write_batch() as wb:
+                for key, value in items:
+                    if value is None:
+                        wb.delete(key)
+                    else:
+                        wb.put(key, value)
+
+        await self.run(write)
+
+    async def iterate(self, iterator, chunk_size: int = 500):
+        """Consumes a blocking iterator in the thread pool in chunks.
+
+        iterator: Iterator
+        chunk_size: int
+        """
+        while chunk := await self.run(list, islice(iterator, chunk_size)):
+            for item in chunk:
+                yield item
+
+    async def scan(self, db=None, prefix: bytes = b"", chunk_size: int = 500, **kwargs):
+        """Streams (key, value) pairs from a db without blocking the event loop.
+
+        db: plyvel.DB | plyvel.PrefixedDB
+        prefix: bytes
+        chunk_size: int
+        """
+        iterator = (db or self.DB.main).iterator(prefix=prefix, **kwargs)
+
+        try:
+            async for item in self.iterate(iterator, chunk_size):
+                yield item
+        finally:
+            iterator.close()
+
+    async def leaderboard(self, name: str, guild_id: int = None):
+        """Returns a leaderboard, loading it in the thread pool the first time.
+
+        name: str
+        guild_id: int
+        """
+        board = self.DB.get_leaderboard(name, guild_id)
+
+        if not board.loaded:
+            key = (name, guild_id)
+
+            if key not in self.loading_boards:
+                board.begin_load()
+                entries = self.DB.leaderboard_entries(name, guild_id)
+                self.loading_boards[key] = asyncio.ensure_future(
+                    self.run(list, entries)
+                )
+
+            try:
+                entries = await asyncio.shield(self.loading_boards[key])
+            finally:
+                if self.loading_boards.get(key) and self.loading_boards[key].done():
+                    del self.loading_boards[key]
+
+            if not board.loaded:
+                board.load(entries)
+
+        return board
+
+    def close(self):
+        """Waits for running db calls to finish and stops the thread pool."""
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,158 @@
+import asyncio
+import time
+from collections import deque
+
+# How much recent failures weigh against the failure rate
+ALPHA = 0.2
+
+
+class ProviderStats:
+    """Recent latencies and the failure rate of one provider."""
+
+    def __init__(self, samples: int = 50):
+        self.latencies = deque(maxlen=samples)
+        self.failure_rate = 0.0
+
+    def record(self, latency: float, ok: bool):
+        """Records the outcome of a request.
+
+        latency: float
+        ok: bool
+        """
+        self.failure_rate += ALPHA * ((not ok) - self.failure_rate)
+
+        if ok:
+            self.latencies.append(latency)
+
+    def record_cancelled(self, latency: float):
+        """Records a request that lost the race before it finished.
+
+        It took at least latency and didn't answer in time, so it counts as
+        half a failure.
+
+        latency: float
+        """
+        self.failure_rate += ALPHA * (0.5 - self.failure_rate)
+        self.latencies.append(latency)
+
+    def quantile(self, q: float) -> float | None:
+        """Returns a quantile of the recent latencies.
+
+        q: float
+        """
+        if not self.latencies:
+            return None
+
+        latencies = sorted(self.latencies)
+        return latencies[min(int(q * len(latencies)), len(latencies) - 1)]
+
+
+class Hedger:
+    """Races fallback providers, starting the next when one is slow.
+
+    The first provider is started straight away and the next one after the
+    p95 latency of the one before it, or as soon as it fails. The first
+    successful result wins and the other requests are cancelled. Providers
+    are tried in order of their failure rate and median latency, so a dead
+    provider drifts to the back instead of delaying every request.
+    """
+
+    def __init__(
+        self, default_delay: float = 1.0, min_delay: float = 0.2, max_delay: float = 3.0
+    ):
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.stats = {}
+
+    def _stats(self, key) -> ProviderStats:
+        if (stats := self.stats.get(key)) is None:
+            stats = self.stats[key] = ProviderStats()
+        return stats
+
+    def order(self, keys: list) -> list:
+        """Sorts providers by how likely they are to answer quickly.
+
+        Providers without latencies are assumed to take the default delay,
+        so they rank behind fast providers and ahead of slow ones.
+
+        keys: list[Hashable]
+        """
+
+        def score(key):
+            stats = self._stats(key)
+            if (median := stats.quantile(0.5)) is None:
+                median = self.default_delay
+            # A failure costs about as much as a request timing out
+            return stats.failure_rate * 10 + median
+
+        return sorted(keys, key=score)
+
+    def delay(self, key) -> float:
+        """Returns how long to wait on a provider before starting the next.
+
+        key: Hashable
+        """
+        if (p95 := self._stats(key).quantile(0.95)) is None:
+            return self.default_delay
+
+        return min(max(p95, self.min_delay), self.max_delay)
+
+    async def _timed(self, key, func):
+        start = time.monotonic()
+
+        try:
+            result = await func(key)
+        except asyncio.CancelledError:
+            self._stats(key).record_cancelled(time.monotonic() - start)
+            raise
+        except Exception:
+            result = None
+
+        self._stats(key).record(time.monotonic() - start, result is not None)
+        return result
+
+    async def run(self, keys: list, func):
+        """Returns the first result of func(key) that isn't None.
+
+        keys: list[Hashable]
+        func: Callable[[Hashable], Awaitable]
+        """
+        remaining = iter(self.order(keys))
+        pending = {}
+        last = None
+
+        def start_next() -> bool:
+            nonlocal last
+            if (key := next(remaining, None)) is None:
+                return False
+
+            pending[asyncio.ensure_future(self._timed(key, func))] = last = key
+            return True
+
+        start_next()
+
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.delay(last),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if not done:
+                    start_next()
+                    continue
+
+                for task in done:
+                    del pending[task]
+
+                    if (result := task.result()) is not None:
+                        return result
+
+                    start_next()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return None
@@ -0,0 +1,149 @@
+import time
+from array import array
+
+import numpy as np
+
+DAY = 86400
+PERIODS = {"24h": DAY, "7d": 7 * DAY, "30d": 30 * DAY}
+
+
+class PriceHistory:
+    """An append only store of (timestamp, price, change) ticks per symbol.
+
+    Ticks are packed float64 columns split into one segment per symbol per
+    day, keyed by day first so a whole day can be compacted or expired with
+    one prefix scan. Segments older than full_days are downsampled to
+    buckets of bucket_size seconds and dropped after retention_days.
+    """
+
+    def __init__(
+        self,
+        db,
+        full_days: int = 7,
+        bucket_size: int = 14400,
+        retention_days: int = 365,
+    ):
+        self.db = db
+        self.full_days = full_days
+        self.bucket_size = bucket_size
+        self.retention_days = retention_days
+
+    @staticmethod
+    def _key(day: int, symbol: str) -> bytes:
+        return f"{day:06d}-{symbol}".encode()
+
+    def append(self, ticks, timestamp: float = None):
+        """Appends a tick for each symbol in one write batch.
+
+        ticks: Iterable[tuple[str, float, float]]
+            (symbol, price, change) tuples.
+        timestamp: float
+        """
+        timestamp = timestamp or time.time()
+        day = int(timestamp // DAY)
+
+        with self.db.write_batch() as wb:
+            for symbol, price, change in ticks:
+                key = self._key(day, symbol)
+                segment = self.db.get(key, b"")
+                wb.put(key, segment + array("d", (timestamp, price, change)).tobytes())
+
+    def range(self, symbol: str, start: float, end: float = None) -> np.ndarray:
+        """Returns an (n, 3) array of the ticks of a symbol between two times.
+
+        symbol: str
+        start: float
+        end: float
+        """
+        end = end or time.time()
+        segments = []
+
+        for day in range(int(start // DAY), int(end // DAY) + 1):
+            if segment := self.db.get(self._key(day, symbol)):
+                segments.append(segment)
+
+        ticks = np.frombuffer(b"".join(segments), dtype=np.float64).reshape(-1, 3)
+        return ticks[(ticks[:, 0] >= start) & (ticks[:, 0] <= end)]
+
+    def summary(self, symbol: str, periods) -> dict:
+        """Returns the stats of a symbol over several periods in one read.
+
+        symbol: str
+        periods: dict[str, int]
+            Maps names to periods in seconds.
+        """
+        now = time.time()
+        ticks = self.range(symbol, now - max(periods.values()), now)
+        ticks = ticks[~np.isnan(ticks[:, 1])]
+        summary = {}
+
+        for name, seconds in periods.items():
+            prices = ticks[ticks[:, 0] >= now - seconds, 1]
+
+            if prices.size:
+                summary[name] = (
+                    float(prices.min()),
+                    float(prices.max()),
+                    float(prices.mean()),
+                )
+
+        return summary
+
+    def downsample(self, ticks: np.ndarray) -> np.ndarray:
+        """Averages the ticks in each bucket into one tick.
+
+        ticks: np.ndarray
+        """
+        buckets, inverse, counts = np.unique(
+            ticks[:, 0] // self.bucket_size, return_inverse=True, return_counts=True
+        )
+        sampled = np.empty((buckets.size, 3))
+
+        for column in range(3):
+            sampled[:, column] = np.bincount(inverse, ticks[:, column]) / counts
+
+        return sampled
+
+    def compact(self, now: float = None):
+        """Downsamples segments that are older than full_days and drops
+        segments older than retention_days.
+
+        The last day compacted is stored so each day is only scanned once.
+
+        now: float
+        """
+        today = int((now or time.time()) // DAY)
+        last = self.db.get(b"compacted")
+        last = int(last) if last else today - self.retention_days
+
+        for day in range(last + 1, today - self.full_days):
+            with self.db.write_batch() as wb:
+                for key, segment in self.db.iterator(prefix=f"{day:06d}-".encode()):
+                    ticks = np.frombuffer(segment, dtype=np.float64).reshape(-1, 3)
+                    ticks = ticks[~np.isnan(ticks[:, 1])]
+
+                    if ticks.size:
+                        wb.put(key, self.downsample(ticks).tobytes())
+                    else:
+                        wb.delete(key)
+
+            self.db.put(b"compacted", str(day).encode())
+
+        expired = f"{today - self.retention_days + 1:06d}-".encode()
+
+        with self.db.write_batch() as wb:
+            for key in self.db.iterator(stop=expired, include_value=False):
+                wb.delete(key)
+
+
+def format_summary(summary: dict) -> str:
+    """Formats the result of PriceHistory.summary as a code block.
+
+    summary: dict
+    """
+    return "```{}```".format(
+        "\n".join(
+            f"{name:<4}${low:,.2f} / ${high:,.2f} / ${avg:,.2f}"
+            for name, (low, high, avg) in summary.items()
+        )
+    )
@@ -0,0 +1,456 @@
+import asyncio
+import re
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+import aiohttp
+import orjson
+
+from cogs.utils.cache import LRUCache, SingleFlight
+
+MAX_AGE_REGEX = re.compile(r"max-age=(\d+)")
+
+# Seconds to cache responses for, by host and path prefix, overriding the
+# Cache-Control header. Endpoints that return something random are never
+# cached or coalesced, so concurrent callers each get their own result.
+TTLS = {
+    "api.alexflipnote.dev/color/": 86400,
+    "api.datamuse.com/": 3600,
+    "api.dictionaryapi.dev/": 3600,
+    "api.github.com/": 300,
+    "api.mcsrvstat.us/": 60,
+    "api.urbandictionary.com/": 300,
+    "disease.sh/": 600,
+    "restcountries.com/": 86400,
+    "www.thecocktaildb.com/api/json/v1/1/search": 3600,
+    # Random results, including every random image api
+    "api.alexflipnote.dev/birb": 0,
+    "api.bunnies.io/v2/loop/random/": 0,
+    "api.fakeartofwar.gaborszathmari.me/v1/getquote": 0,
+    "api.kanye.rest": 0,
+    "api.thecatapi.com/v1/images/search": 0,
+    "api.thedogapi.com/v1/images/search": 0,
+    "aws.random.cat/meow": 0,
+    "cataas.com/cat": 0,
+    "coffee.alexflipnote.dev/random": 0,
+    "dog.ceo/api/": 0,
+    "en.wikipedia.org/api/rest_v1/page/random/": 0,
+    "nekos.life/api/v2/img/": 0,
+    "opentdb.com/": 0,
+    "quote-garden.herokuapp.com/api/v3/quotes/random": 0,
+    "random-d.uk/api/v2/random": 0,
+    "random-word-api.herokuapp.com/word": 0,
+    "random.dog/woof.json": 0,
+    "randomfox.ca/floof": 0,
+    "shibe.online/api/": 0,
+    "some-random-api.ml/img/": 0,
+    "thatcopy.pw/catapi/rest": 0,
+    "uselessfacts.jsph.pl/random": 0,
+    "wohlsoft.ru/images/foxybot/randomfox.php": 0,
+    "www.thecocktaildb.com/api/json/v1/1/random": 0,
+}
+
+
+class Response(NamedTuple):
+    body: bytes
+    etag: str
+    expires: float
+
+
+def freshness(headers) -> float | None:
+    """Returns how many seconds a response is fresh for from its headers.
+
+    Returns None when it mustn't be stored at all.
+
+    headers: Mapping[str, str]
+    """
+    cache_control = headers.get("Cache-Control", "").lower()
+
+    if "no-store" in cache_control:
+        return None
+
+    if "no-cache" in cache_control:
+        return 0
+
+    if match := MAX_AGE_REGEX.search(cache_control):
+        age = headers.get("Age", "0")
+        return max(int(match.group(1)) - (int(age) if age.isdigit() else 0), 0)
+
+    return 0
+
+
+class CachedSession:
+    """Caches the json GET responses of an aiohttp session by url.
+
+    Fresh responses are served from memory. Stale ones are revalidated with
+    their ETag and concurrent requests for a url share one request, unless
+    its TTL is 0 because every request returns something random. Bodies
+    are kept as bytes in an LRUCache bounded by max_size bytes, so every
+    caller gets its own copy to mutate.
+    """
+
+    def __init__(self, session, max_size: int = 16 * 2**20, ttls: dict = TTLS):
+        self.session = session
+        self.store = LRUCache(max_size, lambda response: len(response.body))
+        self.requests = SingleFlight()
+        self.ttls = ttls
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.coalesced = 0
+
+    def ttl(self, url: str) -> float | None:
+        """Returns the overridden TTL of the longest matching prefix.
+
+        url: str
+        """
+        parts = urlsplit(url)
+        path = parts.netloc + parts.path
+        prefix = max(
+            (prefix for prefix in self.ttls if path.startswith(prefix)),
+            key=len,
+            default=None,
+        )
+        return None if prefix is None else self.ttls[prefix]
+
+    async def get_json(self, url: str):
+        """Gets and loads json from a url, returning None on failure.
+
+        url: str
+        """
+        cached = self.store.get(url)
+
+        if cached and cached.expires > time.monotonic():
+            self.hits += 1
+            body = cached.body
+        elif self.ttl(url) == 0:
+            self.misses += 1
+            body = await self._fetch(url, cached)
+        else:
+            self.misses += 1
+
+            if url in self.requests.calls:
+                self.coalesced += 1
+
+            body = await self.requests.do(url, self._fetch, url, cached)
+
+        if body is None:
+            return None
+
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            self.store.pop(url)
+            return None
+
+    async def _fetch(self, url, cached):
+        headers = {}
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+
+        try:
+            async with self.session.get(url, headers=headers) as response:
+                if response.status == 304 and cached:
+                    self.revalidated += 1
+                    body = cached.body
+                elif "json" not in response.content_type:
+                    return None
+                else:
+                    body = await response.read()
+
+                status = 200 if response.status == 304 else response.status
+                etag = response.headers.get("ETag") or (cached.etag if cached else "")
+
+                if (ttl := self.ttl(url)) is not None:
+                    store = ttl > 0
+                else:
+                    # Stale responses are only worth keeping to revalidate
+                    ttl = freshness(response.headers)
+                    store = ttl is not None and bool(ttl or etag)
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            return None
+
+        if status == 200 and store:
+            self.store.put(url, Response(body, etag, time.monotonic() + ttl))
+
+        return body
+
+    def hit_rate(self) -> float:
+        """Returns the fraction of requests served without a request."""
+        return self.hits / ((self.hits + self.misses) or 1)
+
+
+class HostConfig(NamedTuple):
+    timeout: float = 10
+    limit: int = 16
+
+
+# Hosts that are slow or rate limit hard get their own timeout and a lower
+# cap on concurrent requests
+HOSTS = {
+    "api.coinmarketcap.com": HostConfig(timeout=30, limit=2),
+    "api.jeyy.xyz": HostConfig(timeout=15, limit=4),
+    "dagpi.xyz": HostConfig(timeout=15, limit=4),
+    "emkc.org": HostConfig(timeout=20, limit=8),
+    "quickchart.io": HostConfig(limit=8),
+}
+
+# Upper bounds of the latency histogram buckets in seconds
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class CircuitOpenError(aiohttp.ClientConnectionError):
+    """Raised instead of sending a request to a host that is down."""
+
+
+class CircuitBreaker:
+    """Stops requests to a host after threshold failures in a row.
+
+    Once open, requests fail straight away for cooldown seconds. After that
+    a single request is let through and its result closes or reopens the
+    breaker.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened is None:
+            return "closed"
+        if self.probing or time.monotonic() - self.opened >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Returns whether a request can be sent."""
+        if self.opened is None:
+            return True
+
+        if self.probing or time.monotonic() - self.opened < self.cooldown:
+            return False
+
+        self.probing = True
+        return True
+
+    def record(self, ok: bool):
+        """Records the outcome of a request.
+
+        ok: bool
+        """
+        self.probing = False
+
+        if ok:
+            self.failures = 0
+            self.opened = None
+            return
+
+        self.failures += 1
+        if self.opened is not None or self.failures >= self.threshold:
+            self.opened = time.monotonic()
+
+
+class AdaptiveLimit:
+    """Caps concurrent requests to a host with AIMD.
+
+    The limit grows by about one per limit successes and halves on a
+    failure, so a degrading host gets fewer requests piled on it while a
+    healthy one ramps back up to max_limit.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(max_limit)
+        self.inflight = 0
+        self.waiters = deque()
+
+    def _wake(self):
+        while self.waiters and self.inflight < int(self.limit):
+            waiter = self.waiters.popleft()
+
+            if not waiter.done():
+                waiter.set_result(None)
+                self.inflight += 1
+
+    async def acquire(self):
+        """Waits until there is room for another request."""
+        if not self.waiters and self.inflight < int(self.limit):
+            self.inflight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # The slot was handed over just before being cancelled
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        self.inflight -= 1
+        self._wake()
+
+    def record(self, ok: bool):
+        """Adjusts the limit from the outcome of a request.
+
+        ok: bool
+        """
+        if ok:
+            self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+        else:
+            self.limit = max(self.limit / 2, self.min_limit)
+
+        self._wake()
+
+
+class Histogram:
+    """Counts latencies in the fixed BUCKETS."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.total += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Returns the upper bound of the bucket a quantile falls in.
+
+        q: float
+        """
+        if not self.total:
+            return None
+
+        rank = q * self.total
+        seen = 0
+
+        for bound, count in zip((*BUCKETS, float("inf")), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+
+
+class Host:
+    """The breaker, concurrency limit and latencies of one host."""
+
+    def __init__(self, name: str, config: HostConfig):
+        self.name = name
+        self.timeout = aiohttp.ClientTimeout(total=config.timeout)
+        self.breaker = CircuitBreaker()
+        self.limit = AdaptiveLimit(config.limit)
+        self.latency = Histogram()
+        self.failures = 0
+        self.rejected = 0
+
+
+class _RequestContext:
+    """Lets a guarded request be awaited or used with async with."""
+
+    def __init__(self, coro):
+        self.coro = coro
+        self.response = None
+
+    def __await__(self):
+        return self.coro.__await__()
+
+    async def __aenter__(self):
+        self.response = await self.coro
+        return self.response
+
+    async def __aexit__(self, *exc):
+        self.response.release()
+
+
+class ResilientSession:
+    """Wraps an aiohttp session with a breaker and an AIMD limit per host.
+
+    Timeouts, connection errors, 429s and 5xx responses count as failures.
+    A host's concurrency slot is held until its response headers arrive.
+    Anything other than the request methods is passed through to the
+    session.
+    """
+
+    def __init__(self, session, hosts: dict = HOSTS):
+        self.session = session
+        self.configs = hosts
+        self.hosts = {}
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    def host(self, name: str) -> Host:
+        """Returns the state of a host, creating it on first use.
+
+        name: str
+        """
+        if (host := self.hosts.get(name)) is None:
+            host = self.hosts[name] = Host(name, self.configs.get(name, HostConfig()))
+        return host
+
+    async def _request(self, method, url, **kwargs):
+        host = self.host(urlsplit(str(url)).hostname or "")
+
+        if not host.breaker.allow():
+            host.rejected += 1
+            raise CircuitOpenError(f"{host.name} is unavailable")
+
+        try:
+            await host.limit.acquire()
+        except asyncio.CancelledError:
+            host.breaker.probing = False
+            raise
+
+        kwargs.setdefault("timeout", host.timeout)
+        start = time.monotonic()
+
+        try:
+            response = await self.session.request(method, url, **kwargs)
+        except asyncio.CancelledError:
+            # A cancelled request says nothing about the host
+            host.breaker.probing = False
+            raise
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            self._record(host, start, False)
+            raise
+        else:
+            self._record(host, start, response.status < 500 and response.status != 429)
+            return response
+        finally:
+            host.limit.release()
+
+    @staticmethod
+    def _record(host, start, ok):
+        host.latency.observe(time.monotonic() - start)
+        host.breaker.record(ok)
+        host.limit.record(ok)
+        host.failures += not ok
+
+    def request(self, method: str, url, **kwargs) -> _RequestContext:
+        return _RequestContext(self._request(method, url, **kwargs))
+
+    def get(self, url, **kwargs) -> _RequestContext:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs) -> _RequestContext:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs) -> _RequestContext:
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs) -> _RequestContext:
+        return self.request("DELETE", url, **kwargs)
+
+    def head(self, url, **kwargs) -> _RequestContext:
+        return self.request("HEAD", url, **kwargs)
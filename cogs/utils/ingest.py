@@ -0,0 +1,109 @@
+import re
+
+TOKENS = re.compile(rb'[][{}"]')
+STRING_END = re.compile(rb'["\\]')
+
+
+class ArrayStream:
+    """Incrementally splits the items of a JSON array out of a byte stream.
+
+    The array is found by the key it is stored under, so only the item
+    currently being read is ever buffered rather than the whole document.
+    Items have to be objects or arrays, which is all the APIs we read use.
+
+    >>> stream = ArrayStream(b"rows")
+    >>> stream.feed(b'{"data": {"rows": [{"a": "}"}, {"b"')
+    [b'{"a": "}"}']
+    >>> stream.feed(b": 1}]}}")
+    [b'{"b": 1}']
+    """
+
+    def __init__(self, key: bytes):
+        self.start_pattern = re.compile(rb'"' + re.escape(key) + rb'"\s*:\s*\[')
+        self.buffer = bytearray()
+        self.found = False
+        self.done = False
+        self.in_string = False
+        self.depth = 0
+        self.start = 0
+        self.pos = 0
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        """Adds a chunk of the stream and returns the items it completed.
+
+        chunk: bytes
+        """
+        if self.done:
+            return []
+
+        self.buffer += chunk
+
+        if not self.found:
+            match = self.start_pattern.search(self.buffer)
+
+            if not match:
+                # Keep enough of the end in case the key is split across chunks
+                del self.buffer[: -len(self.start_pattern.pattern)]
+                return []
+
+            del self.buffer[: match.end()]
+            self.found = True
+
+        items = self._split()
+
+        if self.depth:
+            del self.buffer[: self.start]
+            self.pos -= self.start
+            self.start = 0
+        else:
+            del self.buffer[: self.pos]
+            self.pos = 0
+
+        return items
+
+    def _split(self):
+        items = []
+        buffer = self.buffer
+
+        while not self.done:
+            if self.in_string:
+                match = STRING_END.search(buffer, self.pos)
+
+                if not match:
+                    self.pos = len(buffer)
+                    break
+
+                if match.group() == b"\\":
+                    if match.end() == len(buffer):
+                        self.pos = match.start()  # Wait for the escaped byte
+                        break
+                    self.pos = match.end() + 1
+                    continue
+
+                self.in_string = False
+                self.pos = match.end()
+                continue
+
+            match = TOKENS.search(buffer, self.pos)
+
+            if not match:
+                self.pos = len(buffer)
+                break
+
+            token = match.group()
+            self.pos = match.end()
+
+            if token == b'"':
+                self.in_string = True
+            elif token in b"{[":
+                if not self.depth:
+                    self.start = match.start()
+                self.depth += 1
+            elif not self.depth:
+                self.done = True  # End of the array
+            else:
+                self.depth -= 1
+                if not self.depth:
+                    items.append(bytes(buffer[self.start : self.pos]))
+
+        return items
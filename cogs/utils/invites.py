@@ -0,0 +1,108 @@
+class InviteTracker:
+    """Keeps the uses of every guild invite in memory to attribute joins.
+
+    Uses are stored as {code}-{guild} and the invite a member joined from
+    as {member}-{guild}. Changes are buffered and written in one batch by
+    flush.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.load()
+
+    def load(self):
+        """Loads the stored invite uses from the db."""
+        self.uses = {}
+        self.pending = {}
+
+        for key, value in self.db:
+            # Member keys store the invite code instead of a count
+            if not value.isdigit():
+                continue
+
+            code, guild_id = key.decode().rsplit("-", 1)
+            self.uses.setdefault(int(guild_id), {})[code] = int(value)
+
+    def created(self, guild_id: int, code: str, uses: int = 0):
+        """Starts tracking a new invite.
+
+        guild_id: int
+        code: str
+        uses: int
+        """
+        self.uses.setdefault(guild_id, {})[code] = uses
+        self.pending[f"{code}-{guild_id}".encode()] = str(uses).encode()
+
+    def deleted(self, guild_id: int, code: str):
+        """Stops tracking a deleted invite.
+
+        guild_id: int
+        code: str
+        """
+        self.uses.get(guild_id, {}).pop(code, None)
+        self.pending[f"{code}-{guild_id}".encode()] = None
+
+    def joined_from(self, member_id: int, guild_id: int) -> str | None:
+        """Returns the code of the invite a member joined from.
+
+        member_id: int
+        guild_id: int
+        """
+        key = f"{member_id}-{guild_id}".encode()
+
+        if key in self.pending:
+            code = self.pending[key]
+        else:
+            code = self.db.get(key)
+
+        return code.decode() if code else None
+
+    def update(self, guild_id: int, invites: dict[str, int], members: list[int]):
+        """Replaces the uses of a guilds invites and attributes joins to them.
+
+        Joins can only be attributed when exactly one invite has gained
+        uses, otherwise there is no telling who used which invite. Returns
+        the code the members were attributed to.
+
+        guild_id: int
+        invites: dict[str, int]
+            The current uses of each invite.
+        members: list[int]
+            The members who joined since the last update.
+        """
+        old = self.uses.get(guild_id)
+        self.uses[guild_id] = dict(invites)
+
+        for code, uses in invites.items():
+            if not old or old.get(code) != uses:
+                self.pending[f"{code}-{guild_id}".encode()] = str(uses).encode()
+
+        if not old:
+            return None
+
+        for code in old.keys() - invites.keys():
+            self.pending[f"{code}-{guild_id}".encode()] = None
+
+        used = [code for code, uses in invites.items() if uses > old.get(code, uses)]
+
+        if len(used) != 1:
+            return None
+
+        for member_id in members:
+            self.pending[f"{member_id}-{guild_id}".encode()] = used[0].encode()
+
+        return used[0]
+
+    def flush(self):
+        """Writes the buffered changes to the db in one write batch."""
+        if not self.pending:
+            return
+
+        pending, self.pending = self.pending, {}
+
+        with self.db.write_batch() as wb:
+            for key, value in pending.items():
+                if value is None:
+                    wb.delete(key)
+                else:
+                    wb.put(key, value)
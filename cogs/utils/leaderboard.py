@@ -0,0 +1,138 @@
+import heapq
+from bisect import bisect_left, insort
+
+
+class BaseLeaderboard:
+    """The loading logic shared by the leaderboards.
+
+    A board starts out idle and ignores updates, as the full load it needs
+    before being read will include them anyway. While loading, updates are
+    recorded so nothing is lost between the db snapshot being taken and the
+    board being filled.
+    """
+
+    def __init__(self):
+        self.scores = {}
+        self.deltas = {}
+        self.loading = False
+        self.loaded = False
+
+    def __len__(self):
+        return len(self.scores)
+
+    def begin_load(self):
+        """Starts recording updates, call right before taking the db snapshot."""
+        self.scores.clear()
+        self.deltas.clear()
+        self.loading = True
+
+    def load(self, entries):
+        """Fills the board from the (member, score) pairs of a full db scan.
+
+        entries: Iterable[tuple[int, Any]]
+        """
+        for member, score in entries:
+            if member in self.scores:
+                continue  # Set while loading so it is newer than the scan
+
+            self.scores[member] = _add(score, self.deltas.pop(member, None))
+
+        for member, delta in self.deltas.items():
+            self.scores[member] = _add(self.scores.get(member), delta)
+
+        self.deltas.clear()
+        self.rank()
+        self.loading = False
+        self.loaded = True
+
+    def rank(self):
+        pass
+
+    def update(self, member: int, score):
+        """Sets the score of a member.
+
+        member: int
+        score: Any
+        """
+        if self.loaded or self.loading:
+            self.scores[member] = score
+
+
+class Leaderboard(BaseLeaderboard):
+    """Keeps members sorted by score so the top or bottom K can be read in O(K)."""
+
+    def __init__(self):
+        super().__init__()
+        self.ranked = []
+
+    def rank(self):
+        self.ranked = sorted((score, member) for member, score in self.scores.items())
+
+    def update(self, member: int, score):
+        """Sets the score of a member.
+
+        member: int
+        score: Any
+        """
+        if self.loaded:
+            if (old := self.scores.get(member)) is not None:
+                del self.ranked[bisect_left(self.ranked, (old, member))]
+            insort(self.ranked, (score, member))
+        elif not self.loading:
+            return
+
+        self.scores[member] = score
+
+    def add(self, member: int, amount):
+        """Adds an amount to the score of a member.
+
+        member: int
+        amount: Any
+        """
+        if self.loaded:
+            self.update(member, _add(self.scores.get(member), amount))
+        elif self.loading:
+            self.deltas[member] = _add(self.deltas.get(member), amount)
+
+    def top(self):
+        """Returns an iterator of (score, member) pairs from the highest score."""
+        return reversed(self.ranked)
+
+    def bottom(self):
+        """Returns an iterator of (score, member) pairs from the lowest score."""
+        return iter(self.ranked)
+
+
+class RateLeaderboard(BaseLeaderboard):
+    """A leaderboard of scores that grow linearly over time.
+
+    Scores are stored as (base, rate) pairs with the value at a time being
+    base + rate * time. As the order changes over time the top is selected
+    when it is read, which is still O(N log K) without touching the db.
+    Scores can only be set and the board only read from the top.
+    """
+
+    def top(self, amount: int, now: float, key=None):
+        """Returns the amount highest (score, member) pairs at a time.
+
+        amount: int
+        now: float
+        key: Callable[[int], bool]
+            Only includes members it returns True for.
+        """
+        return heapq.nlargest(
+            amount,
+            (
+                (base + rate * now, member)
+                for member, (base, rate) in self.scores.items()
+                if key is None or key(member)
+            ),
+        )
+
+
+def _add(score, delta):
+    if delta is None:
+        return score
+    if score is None:
+        return delta
+    return score + delta
@@ -0,0 +1,188 @@
+import asyncio
+from collections import deque
+
+import discord
+
+# The most characters the embeds of one message can have
+EMBED_LIMIT = 6000
+
+
+class ChannelIndex:
+    """Indexes the channels of each guild by name.
+
+    A guilds index is built with one scan of its channels the first time it
+    is used and then kept up to date from the channel events, so finding
+    the logs channel doesn't scan every channel on every event. Like
+    discord.utils.get the first channel with a name wins.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.guilds = {}
+
+    def _names(self, guild) -> dict[str, int]:
+        names = self.guilds.get(guild.id)
+
+        if names is None:
+            names = self.guilds[guild.id] = {}
+
+            for channel in guild.channels:
+                names.setdefault(channel.name, channel.id)
+
+        return names
+
+    def get(self, guild, name: str):
+        """Returns the first channel in a guild with a name.
+
+        guild: discord.Guild
+        name: str
+        """
+        if channel_id := self._names(guild).get(name):
+            return guild.get_channel(channel_id)
+
+    def add(self, channel):
+        """Indexes a created channel.
+
+        channel: discord.abc.GuildChannel
+        """
+        if (names := self.guilds.get(channel.guild.id)) is not None:
+            names.setdefault(channel.name, channel.id)
+
+    def remove(self, channel):
+        """Removes a deleted channel from the index.
+
+        channel: discord.abc.GuildChannel
+        """
+        names = self.guilds.get(channel.guild.id)
+
+        # Another channel might share the name so the guild is indexed again
+        if names and names.get(channel.name) == channel.id:
+            del self.guilds[channel.guild.id]
+
+    def update(self, before, after):
+        """Reindexes a renamed channel.
+
+        before: discord.abc.GuildChannel
+        after: discord.abc.GuildChannel
+        """
+        if before.name != after.name:
+            self.remove(before)
+            self.add(after)
+
+    def log_channel(self, guild):
+        """Returns the channel set with logchannel or the one named logs.
+
+        guild: discord.Guild
+        """
+        if channel_id := self.settings.log_channel(guild.id):
+            return guild.get_channel(channel_id)
+
+        return self.get(guild, "logs")
+
+
+class LogSink:
+    """Queues log embeds per channel and sends them up to 10 at a time.
+
+    Each channel has at most one send in flight and waits interval seconds
+    between sends, so a burst of events becomes a few multi embed messages
+    spaced out under the channels rate limit instead of hundreds of sends
+    competing with command replies. Partial batches wait up to delay
+    seconds for more embeds and are sent as soon as they fill up. Queues
+    are capped at max_queue embeds, dropping the oldest.
+    """
+
+    def __init__(self, delay: float = 2.0, interval: float = 1.0, max_queue: int = 500):
+        self.delay = delay
+        self.interval = interval
+        self.max_queue = max_queue
+        self.queues = {}
+        self.tasks = {}
+        self.full = {}
+        self.closing = False
+        self.sent = 0
+        self.dropped = 0
+
+    def send(self, channel, embed):
+        """Queues an embed to be sent to a channel.
+
+        channel: discord.abc.Messageable
+        embed: discord.Embed
+        """
+        queue = self.queues.setdefault(channel.id, deque())
+
+        if len(queue) == self.max_queue:
+            queue.popleft()
+            self.dropped += 1
+
+        queue.append(embed)
+
+        if channel.id not in self.tasks:
+            self.full[channel.id] = asyncio.Event()
+            self.tasks[channel.id] = asyncio.create_task(self._drain(channel))
+        elif len(queue) >= 10:
+            self.full[channel.id].set()
+
+    @staticmethod
+    def _batch(queue):
+        """Takes up to 10 embeds from a queue that fit in one message."""
+        batch = [queue.popleft()]
+        size = len(batch[0])
+
+        while queue and len(batch) < 10 and size + len(queue[0]) <= EMBED_LIMIT:
+            size += len(queue[0])
+            batch.append(queue.popleft())
+
+        return batch
+
+    async def _drain(self, channel):
+        queue = self.queues[channel.id]
+        full = self.full[channel.id]
+
+        try:
+            while queue:
+                if len(queue) < 10 and not self.closing:
+                    try:
+                        await asyncio.wait_for(full.wait(), self.delay)
+                    except asyncio.TimeoutError:
+                        pass
+                full.clear()
+
+                batch = self._batch(queue)
+
+                try:
+                    await channel.send(embeds=batch)
+                except (discord.Forbidden, discord.NotFound):
+                    # The channel is gone or we can't send to it anymore
+                    self.dropped += len(batch) + len(queue)
+                    queue.clear()
+                    break
+                except discord.HTTPException:
+                    self.dropped += len(batch)
+                else:
+                    self.sent += 1
+
+                if not self.closing:
+                    await asyncio.sleep(self.interval)
+        finally:
+            del self.tasks[channel.id]
+            del self.queues[channel.id]
+            del self.full[channel.id]
+
+    async def close(self, timeout: float = 10):
+        """Sends the queued embeds without waiting, then cancels what is left.
+
+        timeout: float
+        """
+        self.closing = True
+        for full in self.full.values():
+            full.set()
+
+        if self.tasks:
+            await asyncio.wait(list(self.tasks.values()), timeout=timeout)
+
+        for task in list(self.tasks.values()):
+            task.cancel()
+
+    def depth(self) -> int:
+        """Returns how many embeds are waiting to be sent."""
+        return sum(map(len, self.queues.values()))
@@ -0,0 +1,81 @@
+import discord
+
+
+class LazyPaginator(discord.ui.View):
+    """A paginator that only renders the page being shown.
+
+    get_page is called with a page number whenever it is shown, so page one
+    can be sent without building any of the others.
+    """
+
+    def __init__(self, author, page_count: int, get_page, timeout: int = 180):
+        super().__init__(timeout=timeout)
+        self.author = author
+        self.page_count = max(page_count, 1)
+        self.get_page = get_page
+        self.page = 0
+        self.update_buttons()
+
+    def update_buttons(self):
+        self.first.disabled = self.previous.disabled = self.page == 0
+        self.next.disabled = self.last.disabled = self.page == self.page_count - 1
+        self.counter.label = f"{self.page + 1}/{self.page_count}"
+
+    async def send(self, ctx):
+        """Sends the first page.
+
+        ctx: commands.Context
+        """
+        await ctx.send(embeds=[self.get_page(0)], view=self)
+
+    async def show(self, interaction: discord.Interaction, page: int):
+        self.page = min(max(page, 0), self.page_count - 1)
+        self.update_buttons()
+        await interaction.response.edit_message(
+            embeds=[self.get_page(self.page)], view=self
+        )
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user == self.author
+
+    @discord.ui.button(label="<<", style=discord.ButtonStyle.blurple)
+    async def first(self, button, interaction):
+        await self.show(interaction, 0)
+
+    @discord.ui.button(label="<", style=discord.ButtonStyle.red)
+    async def previous(self, button, interaction):
+        await self.show(interaction, self.page - 1)
+
+    @discord.ui.button(style=discord.ButtonStyle.gray, disabled=True)
+    async def counter(self, button, interaction):
+        pass
+
+    @discord.ui.button(label=">", style=discord.ButtonStyle.green)
+    async def next(self, button, interaction):
+        await self.show(interaction, self.page + 1)
+
+    @discord.ui.button(label=">>", style=discord.ButtonStyle.blurple)
+    async def last(self, button, interaction):
+        await self.show(interaction, self.page_count - 1)
+
+
+def price_pages(prices, indices, per_page: int = 99):
+    """Returns the page count and a page renderer for a list of prices.
+
+    prices: PriceIndex
+    indices: np.ndarray
+        The symbols to show in order.
+    per_page: int
+    """
+    page_count = -(-len(indices) // per_page)
+
+    def get_page(page: int) -> discord.Embed:
+        lines = ""
+
+        for i, index in enumerate(indices[page * per_page : (page + 1) * per_page], 1):
+            price = f"{prices.names[index]}: ${prices.prices[index]:.2f}"
+            lines += f"{price}\n" if not i % 3 else f"{price}\t".expandtabs()
+
+        return discord.Embed(description=f"```prolog\n{lines or 'No results'}```")
+
+    return page_count, get_page
@@ -0,0 +1,222 @@
+import struct
+import time
+from typing import NamedTuple
+
+import orjson
+
+VERSION = 1
+
+# version, total, cost basis, next trade number
+HOLDING = struct.Struct("<BddI")
+# amount, cash, timestamp
+TRADE = struct.Struct("<ddd")
+
+
+class Holding(NamedTuple):
+    total: float
+    cost: float
+    trades: int
+
+    @property
+    def average_price(self) -> float:
+        """The average price paid for the current holding."""
+        return self.cost / self.total if self.total else 0.0
+
+    def change(self, price: float) -> float:
+        """Returns the percent change of a price from the average price paid.
+
+        price: float
+        """
+        if not (average := self.average_price):
+            return 0.0
+
+        return (price / average - 1) * 100
+
+
+class Portfolios:
+    """Stores holdings as fixed size binary records per (member, symbol).
+
+    Each holding keeps a running cost basis so the average price paid never
+    needs the trades. Trades are kept in a separate log keyed by member,
+    symbol and trade number, capped to the last trade_limit per holding so
+    buys and sells stay O(1) in size.
+    """
+
+    def __init__(self, holdings, trades, trade_limit: int = 100):
+        self.holdings = holdings
+        self.trades = trades
+        self.trade_limit = trade_limit
+
+    @staticmethod
+    def _key(member_id: int, symbol: str) -> bytes:
+        return f"{member_id}-{symbol}".encode()
+
+    @staticmethod
+    def decode(data: bytes) -> Holding:
+        """Decodes a binary holding record.
+
+        data: bytes
+        """
+        version, *fields = HOLDING.unpack(data)
+
+        if version != VERSION:
+            raise ValueError(f"Unknown holding version {version}")
+
+        return Holding(*fields)
+
+    @staticmethod
+    def encode(holding: Holding) -> bytes:
+        return HOLDING.pack(VERSION, *holding)
+
+    def get(self, member_id: int, symbol: str) -> Holding | None:
+        """Returns a members holding of a symbol.
+
+        member_id: int
+        symbol: str
+        """
+        data = self.holdings.get(self._key(member_id, symbol))
+        return self.decode(data) if data else None
+
+    def get_all(self, member_id: int) -> dict[str, Holding]:
+        """Returns all of a members holdings by symbol.
+
+        member_id: int
+        """
+        prefix = f"{member_id}-".encode()
+        return {
+            key[len(prefix) :].decode(): self.decode(data)
+            for key, data in self.holdings.iterator(prefix=prefix)
+        }
+
+    def __iter__(self):
+        """Yields (member_id, symbol, holding) for every holding."""
+        for key, data in self.holdings:
+            member_id, symbol = key.decode().split("-", 1)
+            yield int(member_id), symbol, self.decode(data)
+
+    def _save(self, member_id, symbol, holding, amount, cash):
+        number = holding.trades - 1
+
+        with self.trades.write_batch() as wb:
+            wb.put(
+                f"{member_id}-{symbol}-{number:010d}".encode(),
+                TRADE.pack(amount, cash, time.time()),
+            )
+
+            if number >= self.trade_limit:
+                old = number - self.trade_limit
+                wb.delete(f"{member_id}-{symbol}-{old:010d}".encode())
+
+        self.holdings.put(self._key(member_id, symbol), self.encode(holding))
+
+    def buy(self, member_id: int, symbol: str, amount: float, cash: float) -> Holding:
+        """Adds a bought amount to a holding and logs the trade.
+
+        member_id: int
+        symbol: str
+        amount: float
+        cash: float
+        """
+        if amount <= 0:
+            raise ValueError("Can only buy a positive amount")
+
+        old = self.get(member_id, symbol) or Holding(0.0, 0.0, 0)
+        holding = Holding(old.total + amount, old.cost + cash, old.trades + 1)
+
+        self._save(member_id, symbol, holding, amount, cash)
+        return holding
+
+    def sell(self, member_id: int, symbol: str, amount: float, cash: float) -> Holding:
+        """Removes a sold amount from a holding and logs the trade.
+
+        Selling everything removes the holding along with its trades.
+
+        member_id: int
+        symbol: str
+        amount: float
+        cash: float
+        """
+        if amount <= 0:
+            raise ValueError("Can only sell a positive amount")
+
+        old = self.get(member_id, symbol)
+        total = old.total - amount
+        cost = old.cost * total / old.total if old.total > 0 else 0.0
+        holding = Holding(total, cost, old.trades + 1)
+
+        if total <= 0:
+            self.delete(member_id, symbol)
+            return holding
+
+        self._save(member_id, symbol, holding, -amount, cash)
+        return holding
+
+    def delete(self, member_id: int, symbol: str):
+        """Removes a holding and its trades.
+
+        member_id: int
+        symbol: str
+        """
+        self.holdings.delete(self._key(member_id, symbol))
+
+        with self.trades.write_batch() as wb:
+            for key, _ in self._trades(member_id, symbol):
+                wb.delete(key)
+
+    def _trades(self, member_id, symbol, reverse=False):
+        prefix = f"{member_id}-{symbol}-".encode()
+
+        for key, data in self.trades.iterator(prefix=prefix, reverse=reverse):
+            # Skips the trades of symbols that start with this one and a dash
+            if key[len(prefix) :].isdigit():
+                yield key, data
+
+    def get_trades(self, member_id: int, symbol: str, amount: int = 10):
+        """Returns the latest (amount, cash, timestamp) trades of a holding.
+
+        member_id: int
+        symbol: str
+        amount: int
+        """
+        trades = []
+
+        for _, data in self._trades(member_id, symbol, reverse=True):
+            if len(trades) == amount:
+                break
+            trades.append(TRADE.unpack(data))
+
+        return trades
+
+    def migrate(self, old_db):
+        """Converts json portfolios of {symbol: {"total", "history"}} to
+        binary holdings and removes them.
+
+        old_db: plyvel.PrefixedDB
+        """
+        for member_id, data in old_db:
+            member = int(member_id)
+
+            with self.trades.write_batch() as trades, self.holdings.write_batch() as wb:
+                for symbol, stock in orjson.loads(data).items():
+                    total = cost = 0.0
+
+                    for amount, cash in stock["history"]:
+                        if amount > 0:
+                            cost += cash
+                        elif total:
+                            cost *= (total + amount) / total
+                        total += amount
+
+                    history = stock["history"][-self.trade_limit :]
+                    start = len(stock["history"]) - len(history)
+                    holding = Holding(stock["total"], cost, len(stock["history"]))
+
+                    wb.put(self._key(member, symbol), self.encode(holding))
+
+                    for number, (amount, cash) in enumerate(history, start):
+                        trades.put(
+                            f"{member}-{symbol}-{number:010d}".encode(),
+                            TRADE.pack(amount, cash, 0.0),
+                        )
+
+            old_db.delete(member_id)
@@ -0,0 +1,71 @@
+import asyncio
+import time
+from collections import deque
+
+
+class Pool:
+    """Keeps a few results of a fetch function ready ahead of time.
+
+    get takes a buffered result if there is one and only fetches while the
+    user waits when the pool is empty. Whenever fewer than low results are
+    left the pool is refilled up to size in the background. Results older
+    than ttl seconds are thrown away so they don't go stale.
+    """
+
+    def __init__(self, fetch, size: int = 5, low: int = 2, ttl: float = 600):
+        self.fetch = fetch
+        self.size = size
+        self.low = low
+        self.ttl = ttl
+        self.items = deque()
+        self.task = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        self._expire()
+        return len(self.items)
+
+    def _expire(self):
+        now = time.monotonic()
+
+        while self.items and self.items[0][0] <= now:
+            self.items.popleft()
+
+    async def _fetch(self):
+        try:
+            return await self.fetch()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return None
+
+    async def _fill(self):
+        while len(self.items) < self.size:
+            # Stop when the api fails, the next get tries again
+            if (item := await self._fetch()) is None:
+                return
+
+            self.items.append((time.monotonic() + self.ttl, item))
+
+    def refill(self):
+        """Starts refilling the pool if it is running low."""
+        if len(self) < self.low and (self.task is None or self.task.done()):
+            self.task = asyncio.ensure_future(self._fill())
+
+    async def get(self):
+        """Returns a result, or None if the pool is empty and the fetch failed."""
+        if len(self):
+            self.hits += 1
+            item = self.items.popleft()[1]
+        else:
+            self.misses += 1
+            item = await self._fetch()
+
+        self.refill()
+        return item
+
+    def close(self):
+        """Cancels a running refill."""
+        if self.task:
+            self.task.cancel()
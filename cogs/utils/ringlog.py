@@ -0,0 +1,151 @@
+import time
+from itertools import islice
+
+import orjson
+
+DAY = 86400
+
+
+class RingLog:
+    """An append only log per (guild, member) capped in length and age.
+
+    Entries are orjson encoded and keyed by {guild}-{member}-{timestamp}
+    with millisecond timestamps, so a members log is a contiguous range
+    in time order. Appending drops the oldest entries past the cap or
+    older than max_age seconds, which keeps every append O(1) in size.
+    """
+
+    def __init__(self, db, cap: int = 500, max_age: float = 180 * DAY):
+        self.db = db
+        self.cap = cap
+        self.max_age = max_age
+        self.counts = {}
+
+    @staticmethod
+    def _prefix(guild_id, member_id):
+        return f"{guild_id}-{member_id}-".encode()
+
+    @staticmethod
+    def _timestamp(key):
+        return int(key.rsplit(b"-", 1)[1]) / 1000
+
+    def count(self, guild_id: int, member_id: int) -> int:
+        """Returns how many entries a members log has.
+
+        guild_id: int
+        member_id: int
+        """
+        prefix = self._prefix(guild_id, member_id)
+
+        if prefix not in self.counts:
+            self.counts[prefix] = sum(
+                1 for _ in self.db.iterator(prefix=prefix, include_value=False)
+            )
+
+        return self.counts[prefix]
+
+    def append(self, guild_id: int, member_id: int, entry, timestamp: float = None):
+        """Appends an entry to a members log.
+
+        guild_id: int
+        member_id: int
+        entry: Any
+            Anything orjson can encode.
+        timestamp: float
+        """
+        timestamp = timestamp or time.time()
+        prefix = self._prefix(guild_id, member_id)
+        count = self.count(guild_id, member_id)
+
+        milliseconds = int(timestamp * 1000)
+        while self.db.get(prefix + b"%013d" % milliseconds) is not None:
+            milliseconds += 1
+
+        with self.db.write_batch() as wb:
+            wb.put(prefix + b"%013d" % milliseconds, orjson.dumps(entry))
+            count += 1
+
+            cutoff = time.time() - self.max_age
+            for key in self.db.iterator(prefix=prefix, include_value=False):
+                if count <= self.cap and self._timestamp(key) >= cutoff:
+                    break
+
+                wb.delete(key)
+                count -= 1
+
+        self.counts[prefix] = count
+
+    def page(self, guild_id: int, member_id: int, page: int, per_page: int = 10):
+        """Returns a page of (timestamp, entry) pairs, newest first.
+
+        guild_id: int
+        member_id: int
+        page: int
+        per_page: int
+        """
+        start = page * per_page
+
+        with self.db.iterator(
+            prefix=self._prefix(guild_id, member_id), reverse=True
+        ) as iterator:
+            return [
+                (self._timestamp(key), orjson.loads(value))
+                for key, value in islice(iterator, start, start + per_page)
+            ]
+
+    def expire(self, now: float = None, chunk: int = 10_000) -> set[bytes]:
+        """Removes the entries older than max_age from every log.
+
+        Deletes are written in batches of chunk keys so a large log doesn't
+        build one huge write batch. Returns the prefixes of the logs it
+        changed, whose counts have to be forgotten afterwards. The counts
+        aren't touched here so this can run in another thread than append.
+
+        now: float
+        chunk: int
+        """
+        cutoff = (now or time.time()) - self.max_age
+        expired = []
+        prefixes = set()
+
+        for key in self.db.iterator(include_value=False):
+            if self._timestamp(key) < cutoff:
+                expired.append(key)
+                prefixes.add(key[: key.rindex(b"-") + 1])
+
+                if len(expired) == chunk:
+                    self._delete(expired)
+                    expired = []
+
+        self._delete(expired)
+        return prefixes
+
+    def _delete(self, keys):
+        with self.db.write_batch() as wb:
+            for key in keys:
+                wb.delete(key)
+
+    def forget(self, prefixes):
+        """Drops the cached counts of logs so they are counted again.
+
+        prefixes: Iterable[bytes]
+        """
+        for prefix in prefixes:
+            self.counts.pop(prefix, None)
+
+    def migrate(self):
+        """Converts the json {timestamp: entry} dict per member to log entries."""
+        for key, value in self.db:
+            # The old keys were {guild}-{member}
+            if key.count(b"-") != 1:
+                continue
+
+            guild_id, member_id = key.decode().split("-")
+            prefix = self._prefix(guild_id, member_id)
+
+            with self.db.write_batch() as wb:
+                for timestamp, entry in orjson.loads(value).items():
+                    wb.put(
+                        prefix + b"%013d" % (int(timestamp) * 1000), orjson.dumps(entry)
+                    )
+                wb.delete(key)
@@ -0,0 +1,185 @@
+from collections import OrderedDict, deque
+from typing import NamedTuple
+
+import orjson
+
+USER, CONTENT, MENTIONS = range(3)
+
+
+class Thresholds(NamedTuple):
+    """The (limit, seconds) allowed of each kind of spam.
+
+    user: messages from a member in a guild
+    content: messages with the same content in a channel
+    mentions: people mentioned by a member in a guild
+    """
+
+    user: tuple[int, float] = (10, 12.0)
+    content: tuple[int, float] = (15, 17.0)
+    mentions: tuple[int, float] = (40, 12.0)
+
+    @classmethod
+    def decode(cls, value: bytes):
+        """Decodes an anti_spam setting.
+
+        b"1" uses the defaults, otherwise it is a json object of the
+        thresholds that have been changed.
+
+        value: bytes
+        """
+        if value == b"1":
+            return cls()
+
+        overrides = orjson.loads(value)
+        return cls()._replace(
+            **{
+                kind: (int(limit), float(seconds))
+                for kind, (limit, seconds) in overrides.items()
+                if kind in cls._fields
+            }
+        )
+
+    def encode(self) -> bytes:
+        return orjson.dumps(self._asdict())
+
+
+class Window:
+    """A sliding window over the last limit events, stored in a ring buffer.
+
+    Events have a weight so one message can count as many mentions. Since
+    every weight is at least one, a full buffer of events that are all in
+    the window is already at the limit and older events can be dropped.
+    """
+
+    __slots__ = ("events", "total", "expires")
+
+    def __init__(self, limit: int):
+        self.events = deque(maxlen=limit)
+        self.total = 0
+        self.expires = 0.0
+
+    def add(self, now: float, seconds: float, limit: int, weight: int = 1) -> bool:
+        """Adds an event and returns whether the window is over its limit.
+
+        now: float
+        seconds: float
+        limit: int
+        weight: int
+        """
+        events = self.events
+
+        if events.maxlen != limit:
+            # The guild changed its thresholds
+            events = self.events = deque(events, maxlen=limit)
+            self.total = sum(weight for _, weight in events)
+
+        while events and now - events[0][0] >= seconds:
+            self.total -= events.popleft()[1]
+
+        over = self.total + weight > limit
+
+        if len(events) == limit:
+            self.total -= events[0][1]
+
+        events.append((now, weight))
+        self.total += weight
+        self.expires = now + seconds
+        return over
+
+
+class SpamChecker:
+    """Checks if someone is spamming against the thresholds of their guild.
+
+    Content is only kept as a hash so windows don't hold message text.
+    Windows are kept in least recently used order, so ones whose events
+    have all expired are dropped from the front, and at most max_windows
+    are kept even during a flood.
+    """
+
+    def __init__(self, max_windows: int = 50_000):
+        self.max_windows = max_windows
+        self.windows = OrderedDict()
+
+    def _window(self, key, limit):
+        window = self.windows.get(key)
+
+        if window is None:
+            window = self.windows[key] = Window(limit)
+
+            if len(self.windows) > self.max_windows:
+                self.windows.popitem(last=False)
+        else:
+            self.windows.move_to_end(key)
+
+        return window
+
+    def expire(self, now: float):
+        """Drops the windows that have no events left in them.
+
+        now: float
+        """
+        windows = self.windows
+
+        while windows:
+            key = next(iter(windows))
+            if windows[key].expires > now:
+                break
+            del windows[key]
+
+    def check(
+        self,
+        guild_id: int,
+        channel_id: int,
+        author_id: int,
+        content: str,
+        mentions: int,
+        now: float,
+        thresholds: Thresholds = Thresholds(),
+    ) -> bool:
+        """Records a message and returns whether its author is spamming.
+
+        guild_id: int
+        channel_id: int
+        author_id: int
+        content: str
+        mentions: int
+            How many other people the message mentions.
+        now: float
+        thresholds: Thresholds
+        """
+        self.expire(now)
+
+        limit, seconds = thresholds.user
+        if self._window((USER, guild_id, author_id), limit).add(now, seconds, limit):
+            return True
+
+        limit, seconds = thresholds.content
+        key = (CONTENT, channel_id, hash(content))
+        if self._window(key, limit).add(now, seconds, limit):
+            return True
+
+        if not mentions:
+            return False
+
+        limit, seconds = thresholds.mentions
+        key = (MENTIONS, guild_id, author_id)
+        return self._window(key, limit).add(now, seconds, limit, mentions)
+
+    def is_spamming(self, message, thresholds: Thresholds = Thresholds()) -> bool:
+        """Records a message and returns whether its author is spamming.
+
+        message: discord.Message
+        thresholds: Thresholds
+        """
+        if message.guild is None:
+            return False
+
+        return self.check(
+            message.guild.id,
+            message.channel.id,
+            message.author.id,
+            message.content,
+            sum(not m.bot and m.id != message.author.id for m in message.mentions),
+            message.created_at.timestamp(),
+            thresholds,
+        )
@@ -0,0 +1,181 @@
+import math
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import orjson
+
+
+def to_float(value) -> float:
+    """Parses numbers like "1,234.5", returning nan if there isn't one."""
+    try:
+        return float(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class PriceIndex:
+    """A snapshot of prices as a symbol to index map and a price vector.
+
+    Symbols are kept in sorted order along with their change and market cap
+    so lists can be filtered by prefix and sorted without touching the db.
+    The price vector has an extra trailing price of 0 which unknown symbols
+    map to, so delisted holdings are valued at nothing instead of raising.
+    """
+
+    def __init__(
+        self,
+        names: list[str],
+        prices: np.ndarray,
+        changes: np.ndarray = None,
+        caps: np.ndarray = None,
+    ):
+        self.names = names
+        self.symbols = {symbol: index for index, symbol in enumerate(names)}
+        self.prices = prices
+        self.changes = changes if changes is not None else np.zeros(len(names))
+        self.caps = caps if caps is not None else np.zeros(len(names))
+
+    @classmethod
+    def from_db(cls, db, change_key: str = "%change", cap_key: str = "cap"):
+        """Builds a price index from a db of orjson encoded price data.
+
+        db: plyvel.PrefixedDB
+        change_key: str
+        cap_key: str
+        """
+        names = []
+        prices = []
+        changes = []
+        caps = []
+
+        for symbol, data in db:
+            data = orjson.loads(data)
+
+            # Missing, None and unparseable prices are all nan
+            if math.isnan(price := to_float(data.get("price"))):
+                continue
+
+            names.append(symbol.decode())
+            prices.append(price)
+            changes.append(to_float(data.get(change_key)))
+            caps.append(to_float(data.get(cap_key)))
+
+        prices.append(0.0)
+        return cls(names, np.array(prices), np.array(changes), np.array(caps))
+
+    def select(self, sort: str = None, prefix: str = "") -> np.ndarray:
+        """Returns the indices of symbols starting with a prefix.
+
+        sort: str
+            price, change or cap to sort by that from highest to lowest,
+            otherwise symbols are in alphabetical order.
+        prefix: str
+        """
+        start = bisect_left(self.names, prefix)
+        end = bisect_right(self.names, prefix + "\U0010ffff")
+        indices = np.arange(start, end)
+
+        if sort in ("price", "change", "cap"):
+            column = {"price": self.prices, "change": self.changes, "cap": self.caps}
+            # NaNs are sorted last
+            indices = indices[np.argsort(-column[sort][indices], kind="stable")]
+
+        return indices
+
+    def index(self, symbol: str) -> int:
+        """Returns the index of a symbol in the price vector.
+
+        symbol: str
+        """
+        return self.symbols.get(symbol, -1)
+
+    def value(self, holdings: dict) -> float:
+        """Returns the value of a dict of holdings by symbol.
+
+        holdings: dict[str, Holding]
+        """
+        if not holdings:
+            return 0.0
+
+        indices = np.fromiter(map(self.index, holdings), np.intp, len(holdings))
+        totals = np.fromiter(
+            (holding.total for holding in holdings.values()),
+            np.float64,
+            len(holdings),
+        )
+        return float(totals @ self.prices[indices])
+
+
+class Valuation:
+    """Values stock and crypto holdings against the latest price snapshots.
+
+    Snapshots are rebuilt after each price refresh and swapped in whole, so
+    readers on other threads always see a consistent set of prices.
+    """
+
+    def __init__(self, database):
+        self.DB = database
+        self._stocks = None
+        self._crypto = None
+
+    @property
+    def stocks(self) -> PriceIndex:
+        if self._stocks is None:
+            self.refresh_stocks()
+        return self._stocks
+
+    @property
+    def crypto(self) -> PriceIndex:
+        if self._crypto is None:
+            self.refresh_crypto()
+        return self._crypto
+
+    def refresh_stocks(self):
+        """Rebuilds the stock price snapshot from the db."""
+        self._stocks = PriceIndex.from_db(self.DB.stocks)
+
+    def refresh_crypto(self):
+        """Rebuilds the crypto price snapshot from the db."""
+        self._crypto = PriceIndex.from_db(self.DB.crypto, "change_24h", "market_cap")
+
+    def holdings_value(self, portfolios, prices: PriceIndex, members: dict[int, int]):
+        """Values the holdings of many members in one sparse dot product.
+
+        Returns an array of values in the order of the members dict.
+
+        portfolios: Portfolios
+        prices: PriceIndex
+        members: dict[int, int]
+            Maps member ids to their row in the result.
+        """
+        rows = []
+        indices = []
+        totals = []
+
+        for member_id, symbol, holding in portfolios:
+            if (row := members.get(member_id)) is None:
+                continue
+
+            rows.append(row)
+            indices.append(prices.index(symbol))
+            totals.append(holding.total)
+
+        if not rows:
+            return np.zeros(len(members))
+
+        weights = np.array(totals, dtype=np.float64)
+        weights *= prices.prices[np.array(indices, dtype=np.intp)]
+        return np.bincount(rows, weights=weights, minlength=len(members))
+
+    def net_worths(self, balances: dict[int, float]) -> list[tuple[float, int]]:
+        """Returns the (net worth, member_id) of every member with a balance.
+
+        balances: dict[int, float]
+        """
+        members = {member_id: row for row, member_id in enumerate(balances)}
+        values = np.fromiter(balances.values(), np.float64, len(balances))
+
+        values += self.holdings_value(self.DB.stock_portfolios, self.stocks, members)
+        values += self.holdings_value(self.DB.crypto_portfolios, self.crypto, members)
+
+        return list(zip(values.tolist(), members))
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import collections
 import itertools
 import logging
@@ -411,3 +412,38 @@ class MockReaction(CustomMockMixin, unittest.mock.MagicMock):
         self.users.return_value = user_iterator
 
         self.__str__.return_value = str(self.emoji)
+
+
+class MockResponse:
+    """A stand in for an aiohttp response and its request context."""
+
+    def __init__(self, status=200, body=b"{}", headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.content_type = "application/json"
+
+    async def __aenter__(self):
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def read(self):
+        return self.body
+
+    def release(self):
+        pass
+
+
+class MockSession:
+    """A stand in for an aiohttp session that returns queued responses."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers):
+        self.requests.append((url, headers))
+        return self.responses.pop(0)
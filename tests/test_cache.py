@@ -0,0 +1,101 @@
+import asyncio
+import unittest
+import unittest.mock
+
+from cogs.utils.cache import Cache, LRUCache, RandomPool, SingleFlight
+
+
+class LRUCacheTests(unittest.TestCase):
+    def test_evicts_least_recently_used_by_size(self):
+        cache = LRUCache(10)
+        cache.put("a", "aaaa")
+        cache.put("b", "bbbb")
+        cache.get("a")
+        cache.put("c", "cccc")
+
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertEqual(cache.size, 8)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+        cache.put("d", "d" * 11)
+        self.assertNotIn("d", cache)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.misses, 1)
+
+        cache.put("a", "a")
+        self.assertEqual((cache.pop("a"), cache.size), ("a", 4))
+
+
+class SingleFlightTests(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_calls_are_coalesced(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def fetch(value):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            return value
+
+        results = await asyncio.gather(*(flight.do("key", fetch, 1) for _ in range(5)))
+
+        self.assertEqual((results, calls), ([1] * 5, 1))
+        self.assertEqual(flight.calls, {})
+        self.assertEqual(await flight.do("key", fetch, 2), 2)
+
+    async def test_call_is_cancelled_with_its_last_caller(self):
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def fetch():
+            started.set()
+            await asyncio.sleep(1)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("key", fetch))
+        second = asyncio.ensure_future(flight.do("key", fetch))
+        await started.wait()
+        call = flight.calls["key"]
+
+        first.cancel()
+        await asyncio.sleep(0)
+        self.assertFalse(call.cancelled())
+
+        second.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        await asyncio.sleep(0)
+        self.assertTrue(call.cancelled())
+        self.assertEqual((flight.calls, flight.waiting), ({}, {}))
+
+
+class TTLCacheTests(unittest.TestCase):
+    def test_values_expire_and_are_taken(self):
+        cache = Cache().namespace("test", ttl=300, max_size=2)
+
+        with unittest.mock.patch("cogs.utils.cache.time.monotonic", return_value=0):
+            cache.put("a", [1, 2])
+            cache.put("b", RandomPool("xy"))
+            cache.put("c", [3])
+
+            self.assertNotIn("a", cache)
+            self.assertEqual(cache.evictions, 1)
+            self.assertEqual({cache.take("b"), cache.take("b")}, {"x", "y"})
+            self.assertNotIn("b", cache)
+            self.assertIsNone(cache.take("b"))
+
+        with unittest.mock.patch("cogs.utils.cache.time.monotonic", return_value=300):
+            self.assertIsNone(cache.get("c"))
+            self.assertEqual((cache.expired, len(cache), cache.size), (1, 0, 0))
+
+    def test_take_keeps_the_size_in_sync(self):
+        cache = Cache().namespace("test", ttl=300, max_size=10, sizeof=len)
+        cache.put("a", [1, 2, 3])
+        cache.put("b", RandomPool("xyz"))
+
+        cache.take("a")
+        cache.take("b")
+        self.assertEqual(cache.size, 4)
+
+        cache.take("a")
+        cache.take("a")
+        self.assertEqual(cache.size, 2)
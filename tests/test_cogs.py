@@ -19,6 +19,7 @@ from cogs.misc import misc
 from cogs.moderation import moderation
 from cogs.stocks import stocks
 from cogs.useful import useful
+from cogs.utils.http import CachedSession
 from run_tests import SKIP_API_TESTS, SKIP_IMAGE_TESTS
 
 bot = Bot(helpers.MockBot())
@@ -64,6 +65,7 @@ class AnimalsCogTests(unittest.IsolatedAsyncioTestCase):
     @unittest.skipIf(SKIP_API_TESTS, "Really Slow.")
     async def test_animal_commands(self):
         bot.client_session = aiohttp.ClientSession()
+        bot.http_cache = CachedSession(bot.client_session)
 
         await asyncio.gather(
             *[self.run_command(command) for command in self.cog.walk_commands()]
@@ -78,6 +80,7 @@ class ApisCogTests(unittest.IsolatedAsyncioTestCase):
     @unittest.skipIf(SKIP_API_TESTS, "Really Slow.")
     async def test_api_commands(self):
         bot.client_session = aiohttp.ClientSession()
+        bot.http_cache = CachedSession(bot.client_session)
 
         await asyncio.gather(
             *[getattr(self, name)() for name in dir(self) if name.endswith("command")]
@@ -880,6 +883,7 @@ class ImagesCogTests(unittest.IsolatedAsyncioTestCase):
     @unittest.skipIf(SKIP_IMAGE_TESTS, "Really Slow.")
     async def test_image_commands(self):
         bot.client_session = aiohttp.ClientSession()
+        bot.http_cache = CachedSession(bot.client_session)
 
         await asyncio.gather(
             *[
@@ -907,6 +911,7 @@ class InformationCogTests(unittest.IsolatedAsyncioTestCase):
     @unittest.skipIf(SKIP_API_TESTS, "Really Slow.")
     async def test_message_top_commmand(self):
         bot.client_session = aiohttp.ClientSession()
+        bot.http_cache = CachedSession(bot.client_session)
         context = helpers.MockContext()
 
         await self.cog.message_top(self.cog, context)
@@ -1010,6 +1015,7 @@ class MiscCogTests(unittest.IsolatedAsyncioTestCase):
     @unittest.skipIf(SKIP_API_TESTS, "Really Slow.")
     async def test_misc_commands(self):
         bot.client_session = aiohttp.ClientSession()
+        bot.http_cache = CachedSession(bot.client_session)
 
         await asyncio.gather(
             *[
@@ -1311,6 +1317,7 @@ class UsefulCogTests(unittest.IsolatedAsyncioTestCase):
     @unittest.skipIf(SKIP_API_TESTS, "Really Slow.")
     async def test_useful_cog_api_commands(self):
         bot.client_session = aiohttp.ClientSession()
+        bot.http_cache = CachedSession(bot.client_session)
 
         await asyncio.gather(
             *[
@@ -0,0 +1,634 @@
+import os
+import struct
+import tempfile
+import time
+import types
+import unittest
+
+import orjson
+import plyvel
+
+from cogs.utils.backup import BackupEngine, BackupError
+from cogs.utils.database import (
+    AppendList,
+    AsyncDatabase,
+    Blacklist,
+    BufferedCounter,
+    GuildSettings,
+    Polls,
+)
+from cogs.utils.history import DAY, PriceHistory
+from cogs.utils.invites import InviteTracker
+from cogs.utils.leaderboard import Leaderboard, RateLeaderboard
+from cogs.utils.logs import ChannelIndex
+from cogs.utils.portfolio import Holding, Portfolios
+from cogs.utils.ringlog import RingLog
+from cogs.utils.spam import Thresholds
+from cogs.utils.valuation import Valuation
+
+
+class DatabaseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.main = plyvel.DB(self.directory.name, create_if_missing=True)
+
+    def tearDown(self):
+        self.main.close()
+        self.directory.cleanup()
+
+
+class BufferedCounterTests(DatabaseTestCase):
+    def test_get_merges_pending_increments(self):
+        db = self.main.prefixed_db(b"message_count-")
+        db.put(b"1-1", struct.pack("<q", 5))
+        counter = BufferedCounter(db)
+
+        counter.increment(b"1-1")
+        counter.increment(b"1-1", 2)
+
+        self.assertEqual(counter.get(b"1-1"), 8)
+        self.assertEqual(counter.get(b"1-2"), 0)
+        self.assertEqual(db.get(b"1-1"), struct.pack("<q", 5))
+
+    def test_flush_writes_pending_increments(self):
+        db = self.main.prefixed_db(b"message_count-")
+        counter = BufferedCounter(db)
+
+        for _ in range(3):
+            counter.increment(b"1-1")
+        counter.increment(b"1-2", -1)
+        counter.flush()
+        counter.increment(b"1-1")
+        counter.flush()
+
+        self.assertEqual(counter.pending, {})
+        self.assertEqual(db.get(b"1-1"), struct.pack("<q", 4))
+        self.assertEqual(db.get(b"1-2"), struct.pack("<q", -1))
+
+    def test_iterator_includes_unflushed_keys(self):
+        db = self.main.prefixed_db(b"message_count-")
+        db.put(b"1-1", struct.pack("<q", 5))
+        db.put(b"2-1", struct.pack("<q", 7))
+        counter = BufferedCounter(db)
+
+        counter.increment(b"1-1")
+        counter.increment(b"1-2")
+        counter.increment(b"2-2")
+
+        self.assertEqual(dict(counter.iterator(prefix=b"1-")), {b"1-1": 6, b"1-2": 1})
+
+    def test_multiple_fields(self):
+        db = self.main.prefixed_db(b"trivia_wins-")
+        counter = BufferedCounter(db, fields=2)
+
+        counter.increment(b"1", 1, 0)
+        counter.increment(b"1", 0, 1)
+        counter.flush()
+        counter.increment(b"1", 1, 0)
+
+        self.assertEqual(counter.get(b"1"), (2, 1))
+        self.assertEqual(counter.get(b"2"), (0, 0))
+        self.assertEqual(dict(counter.iterator()), {b"1": (2, 1)})
+
+    def test_migrate_text_counts(self):
+        db = self.main.prefixed_db(b"trivia_wins-")
+        db.put(b"1", b"3:4")
+        counter = BufferedCounter(db, fields=2)
+
+        counter.migrate()
+
+        self.assertEqual(counter.get(b"1"), (3, 4))
+
+    def test_parse_rejects_the_wrong_field_count(self):
+        counter = BufferedCounter(self.main, fields=2)
+
+        self.assertEqual(counter.parse(b"3:4"), struct.pack("<2q", 3, 4))
+        for value in (b"3", b"3:x", b"\xff"):
+            with self.assertRaises(ValueError):
+                counter.parse(value)
+
+
+class GuildSettingsTests(DatabaseTestCase):
+    def test_toggles_update_cache_and_db(self):
+        settings = GuildSettings(self.main)
+
+        self.assertFalse(settings.logging_disabled(1))
+        self.assertTrue(settings.toggle_logging(1))
+        self.assertTrue(settings.logging_disabled(1))
+        self.assertEqual(self.main.get(b"1-logging"), b"1")
+
+        self.assertFalse(settings.toggle_logging(1))
+        self.assertIsNone(self.main.get(b"1-logging"))
+
+    def test_disabled_channels_are_decoded_once(self):
+        settings = GuildSettings(self.main)
+        settings.toggle_channel(1, 10)
+        settings.toggle_channel(1, 20)
+
+        self.assertEqual(settings.disabled_channels(1), {10, 20})
+
+        settings.toggle_channel(1, 10)
+        self.assertEqual(settings.disabled_channels(1), {20})
+
+    def test_invalidate_rereads_db(self):
+        settings = GuildSettings(self.main)
+
+        self.assertIsNone(settings.prefix(1))
+        self.main.put(b"1-prefix", b"!")
+        self.assertIsNone(settings.prefix(1))
+
+        settings.invalidate(b"1-prefix")
+        self.assertEqual(settings.prefix(1), "!")
+
+    def test_spam_thresholds(self):
+        settings = GuildSettings(self.main)
+
+        self.assertIsNone(settings.spam_thresholds(1))
+        self.assertTrue(settings.toggle_anti_spam(1))
+        self.assertEqual(settings.spam_thresholds(1), Thresholds())
+
+        settings.set_spam_threshold(1, "user", 3, 5.0)
+        settings.invalidate(b"anti_spam-1")
+        self.assertEqual(settings.spam_thresholds(1).user, (3, 5.0))
+        self.assertEqual(settings.spam_thresholds(1).content, Thresholds().content)
+
+        self.assertFalse(settings.toggle_anti_spam(1))
+        self.assertFalse(settings.anti_spam(1))
+
+    def test_log_channel(self):
+        settings = GuildSettings(self.main)
+
+        self.assertIsNone(settings.log_channel(1))
+        settings.set_log_channel(1, 20)
+        self.assertEqual(settings.log_channel(1), 20)
+        settings.set_log_channel(1)
+        self.assertIsNone(settings.log_channel(1))
+
+
+class ChannelIndexTests(DatabaseTestCase):
+    def test_index_follows_channel_events(self):
+        guild = types.SimpleNamespace(id=1, channels=[])
+        guild.get_channel = lambda channel_id: next(
+            (c for c in guild.channels if c.id == channel_id), None
+        )
+
+        def channel(channel_id, name):
+            return types.SimpleNamespace(id=channel_id, name=name, guild=guild)
+
+        first, second = channel(10, "logs"), channel(11, "logs")
+        guild.channels += [first, second]
+        index = ChannelIndex(GuildSettings(self.main))
+
+        self.assertIs(index.log_channel(guild), first)
+
+        guild.channels.remove(first)
+        index.remove(first)
+        self.assertIs(index.log_channel(guild), second)
+
+        renamed = channel(11, "general")
+        guild.channels[0] = renamed
+        index.update(second, renamed)
+        self.assertIsNone(index.log_channel(guild))
+
+        created = channel(12, "logs")
+        guild.channels.append(created)
+        index.add(created)
+        self.assertIs(index.get(guild, "logs"), created)
+
+        index.settings.set_log_channel(1, 11)
+        self.assertIs(index.log_channel(guild), renamed)
+
+
+class BlacklistTests(DatabaseTestCase):
+    def test_loads_and_stays_in_sync(self):
+        db = self.main.prefixed_db(b"blacklist-")
+        db.put(b"1", b"2")
+        db.put(b"10-2", b"1")
+        blacklist = Blacklist(db)
+
+        self.assertEqual(blacklist.get(1, 10), b"2")
+        self.assertEqual(blacklist.get(2, 10), b"1")
+        self.assertIsNone(blacklist.get(2, 11))
+        self.assertIsNone(blacklist.get_exact(1, 10))
+
+        blacklist.put(3, b"2", 11)
+        blacklist.delete(2, 10)
+
+        self.assertEqual(db.get(b"11-3"), b"2")
+        self.assertIsNone(db.get(b"10-2"))
+        self.assertEqual(
+            sorted(blacklist.entries(), key=str), [(11, 3, b"2"), (None, 1, b"2")]
+        )
+
+
+class AppendListTests(DatabaseTestCase):
+    def test_append_index_and_tail(self):
+        values = AppendList(self.main.prefixed_db(b"list-"))
+
+        for i in range(5):
+            values.append(i)
+
+        self.assertEqual(len(values), 5)
+        self.assertEqual((values[0], values[-1]), (0, 4))
+        self.assertEqual(values.tail(2), [3, 4])
+        self.assertRaises(IndexError, values.__getitem__, 5)
+
+        values.trim(3)
+        self.assertEqual(list(values), [2, 3, 4])
+        self.assertEqual(values[0], 2)
+
+        self.assertEqual(values.pop(1), 3)
+        self.assertEqual(list(AppendList(values.db)), [2, 4])
+
+    def test_migrate(self):
+        self.main.put(b"old", orjson.dumps(["a", "b"]))
+        values = AppendList(self.main.prefixed_db(b"old-"))
+
+        values.migrate(self.main, b"old")
+        values.append("c")
+
+        self.assertIsNone(self.main.get(b"old"))
+        self.assertEqual(list(values), ["a", "b", "c"])
+
+
+class PollsTests(DatabaseTestCase):
+    def test_votes_are_flushed_and_reloaded(self):
+        db = self.main.prefixed_db(b"polls-")
+        polls = Polls(db)
+        polls.start(1, 2, 3, {"a": "Cat", "b": "Dog"}, 100.0)
+
+        self.assertTrue(polls.vote(1, 3, "b"))
+        self.assertFalse(polls.vote(1, 3, "c"))
+        self.assertFalse(polls.vote(1, 4, "a"))
+        self.assertEqual(orjson.loads(db.get(b"1-3"))["options"]["b"]["count"], 0)
+
+        polls.flush()
+        self.assertEqual(Polls(db).get(1, 3)["options"]["b"]["count"], 1)
+
+        polls.vote(1, 3, "b")
+        self.assertEqual(polls.end(1, 3)["options"]["b"]["count"], 2)
+        polls.flush()
+        self.assertIsNone(db.get(b"1-3"))
+        self.assertIsNone(polls.end(1, 3))
+
+
+class InviteTrackerTests(DatabaseTestCase):
+    def test_joins_are_attributed_by_diffing_uses(self):
+        db = self.main.prefixed_db(b"invites-")
+        db.put(b"abc-1", b"3")
+        tracker = InviteTracker(db)
+        tracker.created(1, "def")
+
+        self.assertEqual(tracker.update(1, {"abc": 3, "def": 2}, [10, 11]), "def")
+        self.assertEqual(tracker.joined_from(11, 1), "def")
+        self.assertIsNone(db.get(b"11-1"))
+
+        tracker.flush()
+        self.assertEqual(db.get(b"11-1"), b"def")
+        self.assertEqual(db.get(b"def-1"), b"2")
+        self.assertEqual(InviteTracker(db).uses, {1: {"abc": 3, "def": 2}})
+
+    def test_ambiguous_and_unseen_guilds_are_not_attributed(self):
+        tracker = InviteTracker(self.main.prefixed_db(b"invites-"))
+
+        self.assertIsNone(tracker.update(1, {"abc": 1, "def": 1}, [10]))
+        self.assertIsNone(tracker.update(1, {"abc": 2, "def": 2}, [11, 12]))
+        self.assertIsNone(tracker.joined_from(11, 1))
+
+        tracker.deleted(1, "abc")
+        self.assertEqual(tracker.update(1, {"def": 3}, [13]), "def")
+
+
+class LeaderboardTests(unittest.TestCase):
+    def test_updates_keep_board_sorted(self):
+        board = Leaderboard()
+        board.begin_load()
+        board.load([(1, 10), (2, 30), (3, 20)])
+
+        board.update(1, 40)
+        board.add(3, -25)
+        board.add(4, 5)
+
+        self.assertEqual(list(board.top()), [(40, 1), (30, 2), (5, 4), (-5, 3)])
+        self.assertEqual(len(board), 4)
+
+    def test_updates_while_loading_win_over_scan(self):
+        board = Leaderboard()
+        board.update(1, 100)  # Idle boards ignore updates
+        board.begin_load()
+        board.update(2, 50)
+        board.add(3, 2)
+        board.load([(1, 10), (2, 20), (3, 30)])
+
+        self.assertEqual(list(board.top()), [(50, 2), (32, 3), (10, 1)])
+
+    def test_rate_leaderboard_ranks_at_time(self):
+        board = RateLeaderboard()
+        board.begin_load()
+        board.load([(1, (100, 0)), (2, (0, 1))])
+
+        self.assertEqual(board.top(1, 50), [(100, 1)])
+        self.assertEqual(board.top(1, 200), [(200, 2)])
+        self.assertEqual(board.top(2, 200, key=lambda member: member != 2), [(100, 1)])
+        self.assertFalse(hasattr(board, "add") or hasattr(board, "bottom"))
+
+
+class PortfoliosTests(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.portfolios = Portfolios(
+            self.main.prefixed_db(b"stock_holdings-"),
+            self.main.prefixed_db(b"stock_trades-"),
+            trade_limit=3,
+        )
+
+    def test_running_cost_basis(self):
+        self.portfolios.buy(1, "AAPL", 2, 100)
+        self.portfolios.buy(1, "AAPL", 2, 300)
+        holding = self.portfolios.sell(1, "AAPL", 1, 150)
+
+        self.assertEqual(holding, Holding(3, 300, 3))
+        self.assertEqual(self.portfolios.get(1, "AAPL").average_price, 100)
+
+        self.portfolios.sell(1, "AAPL", 3, 300)
+        self.assertIsNone(self.portfolios.get(1, "AAPL"))
+        self.assertEqual(self.portfolios.get_trades(1, "AAPL"), [])
+
+    def test_zero_amounts_and_free_holdings(self):
+        with self.assertRaises(ValueError):
+            self.portfolios.buy(1, "AAPL", 0, 0)
+
+        self.portfolios.buy(1, "AAPL", 2, 0)
+        with self.assertRaises(ValueError):
+            self.portfolios.sell(1, "AAPL", 0, 0)
+
+        holding = self.portfolios.get(1, "AAPL")
+        self.assertEqual((holding.average_price, holding.change(150)), (0.0, 0.0))
+        self.assertEqual(self.portfolios.sell(1, "AAPL", 1, 150).cost, 0)
+        self.assertEqual(Holding(2, 100, 1).change(75), 50)
+
+    def test_trade_log_is_capped(self):
+        for cash in range(1, 6):
+            self.portfolios.buy(1, "BRK", 1, cash)
+        self.portfolios.buy(1, "BRK-A", 1, 10)
+
+        trades = self.portfolios.get_trades(1, "BRK", 10)
+
+        self.assertEqual([trade[1] for trade in trades], [5, 4, 3])
+        self.assertEqual(list(self.portfolios.get_all(1)), ["BRK", "BRK-A"])
+
+    def test_migrate_json(self):
+        old = self.main.prefixed_db(b"stockbal-")
+        history = [(2, 100), (2, 300), (-1, 150)]
+        old.put(b"1", orjson.dumps({"AAPL": {"total": 3, "history": history}}))
+
+        self.portfolios.migrate(old)
+
+        self.assertEqual(self.portfolios.get(1, "AAPL"), Holding(3, 300, 3))
+        self.assertEqual(len(self.portfolios.get_trades(1, "AAPL")), 3)
+        self.assertIsNone(old.get(b"1"))
+
+
+class ValuationTests(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.DB = types.SimpleNamespace(
+            **{
+                name: self.main.prefixed_db(f"{name}-".encode())
+                for name in ("stocks", "crypto")
+            }
+        )
+        self.DB.stock_portfolios = Portfolios(
+            self.main.prefixed_db(b"stock_holdings-"),
+            self.main.prefixed_db(b"stock_trades-"),
+        )
+        self.DB.crypto_portfolios = Portfolios(
+            self.main.prefixed_db(b"crypto_holdings-"),
+            self.main.prefixed_db(b"crypto_trades-"),
+        )
+        self.DB.stocks.put(b"AAPL", orjson.dumps({"price": "150.5"}))
+        self.DB.stocks.put(b"TSLA", orjson.dumps({"price": "200"}))
+        self.DB.crypto.put(b"BTC", orjson.dumps({"price": 30000.0}))
+
+    def test_value_ignores_unknown_symbols(self):
+        valuation = Valuation(self.DB)
+        holdings = {"AAPL": Holding(2, 0, 1), "GONE": Holding(5, 0, 1)}
+
+        self.assertEqual(valuation.stocks.value(holdings), 301.0)
+        self.assertEqual(valuation.stocks.value({}), 0.0)
+
+    def test_prices_are_parsed_like_the_other_columns(self):
+        self.DB.stocks.put(b"BRK", orjson.dumps({"price": "1,234.5"}))
+        self.DB.stocks.put(b"NONE", orjson.dumps({"price": None}))
+        self.DB.stocks.put(b"NAN", orjson.dumps({"price": "nan"}))
+        valuation = Valuation(self.DB)
+
+        self.assertEqual(valuation.stocks.value({"BRK": Holding(2, 0, 1)}), 2469.0)
+        self.assertEqual(valuation.stocks.names, ["AAPL", "BRK", "TSLA"])
+
+    def test_net_worths(self):
+        self.DB.stock_portfolios.buy(1, "AAPL", 2, 0)
+        self.DB.stock_portfolios.buy(1, "TSLA", 1, 0)
+        self.DB.stock_portfolios.buy(3, "AAPL", 100, 0)
+        self.DB.crypto_portfolios.buy(2, "BTC", 0.5, 0)
+        valuation = Valuation(self.DB)
+
+        self.assertEqual(
+            valuation.net_worths({1: 100.0, 2: 0.0}), [(601.0, 1), (15000.0, 2)]
+        )
+
+    def test_select_filters_and_sorts(self):
+        self.DB.stocks.put(b"AAPB", orjson.dumps({"price": "1", "cap": "1,000"}))
+        self.DB.stocks.put(b"AAPL", orjson.dumps({"price": "150.5", "cap": "NA"}))
+        self.DB.stocks.put(b"TSLA", orjson.dumps({"price": "200", "cap": "5,000"}))
+        prices = Valuation(self.DB).stocks
+
+        def names(indices):
+            return [prices.names[index] for index in indices]
+
+        self.assertEqual(names(prices.select(prefix="AAP")), ["AAPB", "AAPL"])
+        self.assertEqual(names(prices.select("price")), ["TSLA", "AAPL", "AAPB"])
+        self.assertEqual(names(prices.select("cap")), ["TSLA", "AAPB", "AAPL"])
+        self.assertEqual(names(prices.select(prefix="X")), [])
+
+    def test_refresh_swaps_prices(self):
+        valuation = Valuation(self.DB)
+        prices = valuation.stocks
+        holdings = {"AAPL": Holding(1, 0, 1)}
+
+        self.DB.stocks.put(b"AAPL", orjson.dumps({"price": "1"}))
+        valuation.refresh_stocks()
+
+        self.assertEqual(prices.value(holdings), 150.5)
+        self.assertEqual(valuation.stocks.value(holdings), 1.0)
+
+
+class RingLogTests(DatabaseTestCase):
+    def test_append_caps_and_pages_newest_first(self):
+        log = RingLog(self.main.prefixed_db(b"deleted-"), cap=5)
+        now = time.time()
+
+        for i in range(8):
+            log.append(1, 2, f"message {i}", now + i)
+        log.append(1, 3, "other", now)
+
+        self.assertEqual(log.count(1, 2), 5)
+        self.assertEqual(
+            [entry for _, entry in log.page(1, 2, 0, per_page=3)],
+            ["message 7", "message 6", "message 5"],
+        )
+        self.assertEqual(len(log.page(1, 2, 1, per_page=3)), 2)
+        self.assertEqual(RingLog(log.db).count(1, 2), 5)
+
+    def test_same_timestamp_and_expiry(self):
+        log = RingLog(self.main.prefixed_db(b"edited-"), max_age=DAY)
+        now = time.time()
+
+        log.append(1, 2, ["a", "b"], now - 2 * DAY)
+        log.append(1, 2, ["b", "c"], now)
+        log.append(1, 2, ["c", "d"], now)
+
+        self.assertEqual(log.count(1, 2), 2)
+        self.assertEqual(log.page(1, 2, 0)[0][1], ["c", "d"])
+
+        log.append(1, 3, "kept", now + 2 * DAY)
+        log.count(1, 3)
+        prefixes = log.expire(now + 2 * DAY, chunk=1)
+        self.assertEqual(prefixes, {b"1-2-"})
+        self.assertEqual(log.counts, {b"1-2-": 2, b"1-3-": 1})
+
+        log.forget(prefixes)
+        self.assertEqual(log.counts, {b"1-3-": 1})
+        self.assertEqual(log.count(1, 2), 0)
+
+    def test_migrate(self):
+        db = self.main.prefixed_db(b"deleted-")
+        db.put(b"1-2", orjson.dumps({"100": "first", "200": "second"}))
+        log = RingLog(db, max_age=float("inf"))
+
+        log.migrate()
+
+        self.assertIsNone(db.get(b"1-2"))
+        self.assertEqual(log.page(1, 2, 0), [(200.0, "second"), (100.0, "first")])
+
+
+class PriceHistoryTests(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.history = PriceHistory(self.main.prefixed_db(b"stock_ticks-"))
+
+    def test_summary_over_periods(self):
+        now = time.time()
+        self.history.append([("AAPL", 10.0, 0.0)], now - 3 * DAY)
+        self.history.append([("AAPL", 20.0, 0.0), ("TSLA", 1.0, 0.0)], now - 60)
+        self.history.append([("AAPL", 30.0, 0.0)], now - 30)
+
+        summary = self.history.summary("AAPL", {"24h": DAY, "7d": 7 * DAY})
+
+        self.assertEqual(summary["24h"], (20.0, 30.0, 25.0))
+        self.assertEqual(summary["7d"], (10.0, 30.0, 20.0))
+        self.assertEqual(self.history.summary("MSFT", {"24h": DAY}), {})
+
+    def test_compact_downsamples_and_expires(self):
+        now = 1000 * DAY
+        old = now - 10 * DAY
+
+        for hour in range(24):
+            self.history.append([("AAPL", hour, 0.0)], old + hour * 3600)
+        self.history.append([("AAPL", 1.0, 0.0)], now - 400 * DAY)
+
+        self.history.compact(now)
+
+        ticks = self.history.range("AAPL", old, old + DAY)
+        self.assertEqual(len(ticks), 6)
+        self.assertEqual(ticks[0][1], 1.5)
+        self.assertEqual(len(self.history.range("AAPL", now - 401 * DAY, old)), 0)
+
+
+class BackupEngineTests(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.backups = BackupEngine(
+            self.main,
+            f"{self.directory.name}/backup",
+            full_every=3,
+            excluded=(b"stocks",),
+        )
+
+    def test_incremental_backups_and_restore(self):
+        self.main.put(b"a", b"1")
+        self.main.put(b"b", b"2")
+        self.main.put(b"stocks-AAPL", b"{}")
+        self.backups.backup()
+
+        self.main.put(b"a", b"3")
+        self.main.delete(b"b")
+        self.main.put(b"c", b"4")
+        self.backups.backup()
+
+        self.assertEqual(self.backups.backups(), [(0, "full"), (1, "incr")])
+
+        self.main.put(b"d", b"5")
+        self.assertEqual(self.backups.restore(), 5)
+        self.assertEqual(
+            dict(self.main),
+            {b"a": b"3", b"c": b"4", b"stocks-AAPL": b"{}"},
+        )
+
+        self.backups.restore(0)
+        self.assertEqual(
+            dict(self.main), {b"a": b"1", b"b": b"2", b"stocks-AAPL": b"{}"}
+        )
+
+    def test_corrupt_backup_isnt_restored(self):
+        self.main.put(b"a", b"1")
+        path = self.backups.backup()
+        self.main.put(b"a", b"2")
+
+        with open(path, "rb") as file:
+            data = file.read()
+        with open(path, "wb") as file:
+            file.write(data[: len(data) // 2])
+
+        with self.assertRaises(BackupError):
+            self.backups.restore()
+        self.assertEqual(self.main.get(b"a"), b"2")
+        self.assertFalse(os.path.exists(self.backups.manifest))
+
+    def test_full_backup_prunes_old_chains(self):
+        for i in range(7):
+            self.main.put(b"a", str(i).encode())
+            self.backups.backup()
+
+        self.assertEqual(
+            self.backups.backups(),
+            [(3, "full"), (4, "incr"), (5, "incr"), (6, "full")],
+        )
+
+
+class AsyncDatabaseTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.main = plyvel.DB(self.directory.name, create_if_missing=True)
+        self.ADB = AsyncDatabase(types.SimpleNamespace(main=self.main))
+
+    def tearDown(self):
+        self.ADB.close()
+        self.main.close()
+        self.directory.cleanup()
+
+    async def test_batch_and_get(self):
+        await self.ADB.batch([(b"a", b"1"), (b"b", b"2")])
+        await self.ADB.batch([(b"a", None)])
+
+        self.assertIsNone(await self.ADB.get(b"a"))
+        self.assertEqual(await self.ADB.get(b"b"), b"2")
+
+    async def test_scan_streams_in_chunks(self):
+        db = self.main.prefixed_db(b"bal-")
+        await self.ADB.batch([(str(i).encode(), b"0") for i in range(1234)], db)
+
+        keys = [key async for key, value in self.ADB.scan(db, chunk_size=100)]
+
+        self.assertEqual(len(keys), 1234)
+        self.assertEqual(keys, sorted(keys))
@@ -0,0 +1,55 @@
+import asyncio
+import unittest
+
+from cogs.utils.hedge import Hedger
+
+
+class HedgerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_slow_and_failing_providers_are_hedged(self):
+        hedger = Hedger(default_delay=0.01)
+        cancelled = []
+
+        async def fetch(key):
+            if key == "dead":
+                return None
+
+            if key == "slow":
+                try:
+                    await asyncio.sleep(0.1)
+                except asyncio.CancelledError:
+                    cancelled.append(key)
+                    raise
+
+            return key
+
+        self.assertEqual(await hedger.run(["slow", "fast"], fetch), "fast")
+        await asyncio.sleep(0)
+        self.assertEqual(cancelled, ["slow"])
+
+        self.assertEqual(await hedger.run(["dead", "slow"], fetch), "slow")
+        self.assertIsNone(await hedger.run(["dead"], fetch))
+
+    def test_order_prefers_reliable_providers(self):
+        hedger = Hedger()
+        hedger._stats("a").record(0.5, False)
+        hedger._stats("b").record(0.5, True)
+        hedger._stats("c").record(0.1, True)
+
+        self.assertEqual(hedger.order(["a", "b", "c", "d"]), ["c", "b", "d", "a"])
+        self.assertEqual(hedger.delay("c"), 0.2)
+        self.assertEqual(hedger.delay("d"), 1.0)
+
+    async def test_hanging_provider_is_moved_back(self):
+        hedger = Hedger(default_delay=0.01)
+
+        async def fetch(key):
+            if key == "dead":
+                await asyncio.sleep(1)
+            return key
+
+        self.assertEqual(hedger.order(["dead", "good"]), ["dead", "good"])
+        self.assertEqual(await hedger.run(["dead", "good"], fetch), "good")
+        await asyncio.sleep(0)
+
+        self.assertGreater(hedger.stats["dead"].failure_rate, 0)
+        self.assertEqual(hedger.order(["dead", "good"]), ["good", "dead"])
@@ -0,0 +1,126 @@
+import asyncio
+import types
+import unittest
+import unittest.mock
+
+import tests.helpers as helpers
+from cogs.animals import CATS, DOGS, FOXES
+from cogs.utils.http import (
+    AdaptiveLimit,
+    CachedSession,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientSession,
+    freshness,
+)
+
+
+class CachedSessionTests(unittest.IsolatedAsyncioTestCase):
+    async def test_fresh_responses_are_served_from_memory(self):
+        session = helpers.MockSession(helpers.MockResponse(body=b'{"a": 1}'))
+        http = CachedSession(session)
+        url = "https://restcountries.com/v3.1/name/nz"
+
+        results = await asyncio.gather(*(http.get_json(url) for _ in range(3)))
+        results.append(await http.get_json(url))
+
+        self.assertEqual(results, [{"a": 1}] * 4)
+        self.assertIsNot(results[0], results[1])
+        self.assertEqual(len(session.requests), 1)
+        self.assertEqual((http.hits, http.misses, http.coalesced), (1, 3, 2))
+
+    async def test_stale_responses_are_revalidated(self):
+        session = helpers.MockSession(
+            helpers.MockResponse(body=b"[1]", headers={"ETag": '"v1"'}),
+            helpers.MockResponse(status=304),
+        )
+        http = CachedSession(session, ttls={})
+        url = "https://example.com/data"
+
+        self.assertEqual(await http.get_json(url), [1])
+        self.assertEqual(await http.get_json(url), [1])
+        self.assertEqual(session.requests[1][1], {"If-None-Match": '"v1"'})
+        self.assertEqual(http.revalidated, 1)
+
+    async def test_random_endpoints_are_not_stored(self):
+        session = helpers.MockSession(
+            helpers.MockResponse(headers={"Cache-Control": "max-age=60"}),
+            helpers.MockResponse(),
+        )
+        http = CachedSession(session)
+
+        results = await asyncio.gather(
+            http.get_json("https://api.kanye.rest"),
+            http.get_json("https://api.kanye.rest"),
+        )
+
+        self.assertEqual(results, [{}, {}])
+        self.assertEqual((len(session.requests), len(http.store)), (2, 0))
+        self.assertEqual(http.coalesced, 0)
+
+    async def test_random_image_apis_ignore_max_age(self):
+        urls = [args[0] for args in CATS + DOGS + FOXES]
+        responses = [helpers.MockResponse(headers={"Cache-Control": "max-age=60"})]
+        session = helpers.MockSession(*responses * len(urls) * 2)
+        http = CachedSession(session)
+
+        for url in urls * 2:
+            await http.get_json(url)
+
+        self.assertEqual((len(session.requests), len(http.store)), (len(urls) * 2, 0))
+
+    def test_freshness(self):
+        self.assertEqual(freshness({"Cache-Control": "public, max-age=60"}), 60)
+        self.assertEqual(freshness({"Cache-Control": "max-age=60", "Age": "20"}), 40)
+        self.assertEqual(freshness({"Cache-Control": "no-cache"}), 0)
+        self.assertIsNone(freshness({"Cache-Control": "no-store"}))
+
+
+class ResilientSessionTests(unittest.IsolatedAsyncioTestCase):
+    async def test_breaker_opens_and_fails_fast(self):
+        fail = helpers.MockResponse(status=503)
+        session = ResilientSession(
+            types.SimpleNamespace(request=unittest.mock.AsyncMock(return_value=fail))
+        )
+
+        for _ in range(5):
+            async with session.get("https://emkc.org/api") as response:
+                self.assertEqual(response.status, 503)
+
+        with self.assertRaises(CircuitOpenError):
+            await session.get("https://emkc.org/api")
+
+        host = session.hosts["emkc.org"]
+        self.assertEqual((host.failures, host.rejected), (5, 1))
+        self.assertEqual(host.breaker.state, "open")
+        self.assertEqual(host.limit.limit, 1)
+        self.assertEqual(host.latency.total, 5)
+
+    def test_breaker_half_opens_after_cooldown(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=30)
+        breaker.record(False)
+
+        with unittest.mock.patch("cogs.utils.http.time.monotonic") as monotonic:
+            monotonic.return_value = breaker.opened + 30
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+
+            breaker.record(True)
+            self.assertEqual(breaker.state, "closed")
+
+    async def test_adaptive_limit_queues_past_the_limit(self):
+        limit = AdaptiveLimit(2)
+        await limit.acquire()
+        await limit.acquire()
+        waiter = asyncio.ensure_future(limit.acquire())
+        await asyncio.sleep(0)
+        self.assertFalse(waiter.done())
+
+        limit.record(False)
+        limit.release()
+        await asyncio.sleep(0)
+        self.assertFalse(waiter.done())
+
+        limit.release()
+        await waiter
+        self.assertEqual((limit.inflight, limit.limit), (1, 1))
@@ -0,0 +1,23 @@
+import unittest
+
+import orjson
+
+from cogs.utils.ingest import ArrayStream
+
+
+class ArrayStreamTests(unittest.TestCase):
+    def test_items_split_across_chunks(self):
+        rows = [{"symbol": "A", "name": 'Quote " ] }'}, {"symbol": "B", "n": [1, {}]}]
+        document = orjson.dumps(
+            {"data": {"headers": {"a": "b"}, "table": {"rows": rows}}, "status": 1}
+        )
+
+        for size in (1, 3, 64):
+            stream = ArrayStream(b"rows")
+            items = []
+
+            for i in range(0, len(document), size):
+                items.extend(stream.feed(document[i : i + size]))
+
+            self.assertEqual([orjson.loads(item) for item in items], rows)
+            self.assertTrue(stream.done)
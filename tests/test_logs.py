@@ -0,0 +1,52 @@
+import asyncio
+import types
+import unittest
+import unittest.mock
+
+import discord
+
+from cogs.utils.logs import LogSink
+
+
+class LogSinkTests(unittest.IsolatedAsyncioTestCase):
+    async def test_embeds_are_batched_per_channel(self):
+        sink = LogSink(delay=0, interval=0, max_queue=20)
+        channel = types.SimpleNamespace(id=1, send=unittest.mock.AsyncMock())
+
+        for i in range(25):
+            sink.send(channel, discord.Embed(description=str(i)))
+
+        self.assertEqual((sink.depth(), sink.dropped), (20, 5))
+        await sink.tasks[1]
+
+        sizes = [len(call.kwargs["embeds"]) for call in channel.send.call_args_list]
+        self.assertEqual(sizes, [10, 10])
+        self.assertEqual(channel.send.call_args.kwargs["embeds"][-1].description, "24")
+        self.assertEqual((sink.depth(), sink.sent, sink.tasks), (0, 2, {}))
+
+    async def test_large_embeds_are_split(self):
+        sink = LogSink(delay=0, interval=0)
+        channel = types.SimpleNamespace(id=1, send=unittest.mock.AsyncMock())
+
+        for _ in range(3):
+            sink.send(channel, discord.Embed(description="a" * 2500))
+        await sink.tasks[1]
+
+        sizes = [len(call.kwargs["embeds"]) for call in channel.send.call_args_list]
+        self.assertEqual(sizes, [2, 1])
+
+    async def test_full_batches_and_close_dont_wait(self):
+        sink = LogSink(delay=60, interval=0)
+        channel = types.SimpleNamespace(id=1, send=unittest.mock.AsyncMock())
+
+        for i in range(13):
+            sink.send(channel, discord.Embed(description=str(i)))
+            await asyncio.sleep(0)
+
+        await asyncio.sleep(0)
+        self.assertEqual(channel.send.call_count, 1)
+
+        await asyncio.wait_for(sink.close(), 1)
+        sizes = [len(call.kwargs["embeds"]) for call in channel.send.call_args_list]
+        self.assertEqual(sizes, [10, 3])
+        self.assertEqual(sink.tasks, {})
@@ -0,0 +1,40 @@
+import time
+import unittest
+import unittest.mock
+
+from cogs.utils.prefetch import Pool
+
+
+class PoolTests(unittest.IsolatedAsyncioTestCase):
+    async def test_refills_in_the_background_and_expires(self):
+        items = iter(range(100))
+
+        async def fetch():
+            return next(items)
+
+        pool = Pool(fetch, size=3, low=2, ttl=60)
+
+        self.assertEqual(await pool.get(), 0)
+        await pool.task
+        self.assertEqual(list(item for _, item in pool.items), [1, 2, 3])
+
+        self.assertEqual(await pool.get(), 1)
+        self.assertEqual(await pool.get(), 2)
+        await pool.task
+        self.assertEqual(len(pool), 3)
+        self.assertEqual((pool.hits, pool.misses), (2, 1))
+
+        with unittest.mock.patch(
+            "cogs.utils.prefetch.time.monotonic", return_value=time.monotonic() + 60
+        ):
+            self.assertEqual(len(pool), 0)
+
+    async def test_failed_fetches_return_none(self):
+        async def fetch():
+            raise KeyError("text")
+
+        pool = Pool(fetch)
+
+        self.assertIsNone(await pool.get())
+        await pool.task
+        self.assertEqual(len(pool), 0)
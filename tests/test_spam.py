@@ -0,0 +1,48 @@
+import unittest
+
+from cogs.utils.spam import SpamChecker, Thresholds
+
+
+class SpamCheckerTests(unittest.TestCase):
+    def test_user_window_slides(self):
+        checker = SpamChecker()
+        thresholds = Thresholds(user=(3, 10.0))
+
+        results = [
+            checker.check(1, 2, 3, str(i), 0, now, thresholds)
+            for i, now in enumerate((0, 1, 2, 3, 12, 13))
+        ]
+        self.assertEqual(results, [False, False, False, True, False, False])
+
+    def test_content_is_per_channel(self):
+        checker = SpamChecker()
+        thresholds = Thresholds(content=(2, 10.0))
+
+        self.assertFalse(checker.check(1, 2, 3, "hi", 0, 0, thresholds))
+        self.assertFalse(checker.check(1, 2, 4, "hi", 0, 1, thresholds))
+        self.assertFalse(checker.check(1, 5, 4, "hi", 0, 1, thresholds))
+        self.assertTrue(checker.check(1, 2, 5, "hi", 0, 2, thresholds))
+
+    def test_mentions_are_weighted(self):
+        checker = SpamChecker()
+        thresholds = Thresholds(mentions=(10, 10.0))
+
+        self.assertFalse(checker.check(1, 2, 3, "a", 6, 0, thresholds))
+        self.assertTrue(checker.check(1, 2, 3, "b", 6, 1, thresholds))
+
+    def test_windows_are_capped(self):
+        checker = SpamChecker(max_windows=100)
+
+        for i in range(1000):
+            checker.check(1, 2, i, str(i), 1, 0, Thresholds())
+
+        self.assertEqual(len(checker.windows), 100)
+
+    def test_expired_windows_are_dropped(self):
+        checker = SpamChecker()
+
+        for i in range(100):
+            checker.check(1, 2, i, str(i), 0, i, Thresholds())
+
+        # Only the windows with a message in the last 17 seconds are left
+        self.assertLessEqual(len(checker.windows), 2 * 17)